@@ -15,15 +15,20 @@ CREATE TABLE IF NOT EXISTS user
     salt        binary(32)           null comment '비밀번호 Salt',
     provider_id varchar(64)          null comment 'OAuth 제공 업체',
     is_active   tinyint(1) default 0 not null comment '계정 활성화 여부',
+    token_generation int  default 0 not null comment '토큰 세대(전체 로그아웃 시 증가)',
     created_at  datetime(6)          not null comment '생성일자',
     updated_at  datetime(6)          not null comment '변경일자',
 
     constraint uq_email_key_provider_id
         unique (email_key, provider_id),
+    constraint uq_mobile_key
+        unique (mobile_key),
     constraint uq_uuid
         unique (uuid)
 );
 
+CREATE INDEX idx_token_generation ON user (token_generation);
+
 -- OAuth 사용자 정보 테이블
 CREATE TABLE IF NOT EXISTS social_user
 (
@@ -46,25 +51,30 @@ CREATE TABLE IF NOT EXISTS social_user
 
 
 CREATE INDEX idx_user_id ON social_user (user_id);
-CREATE INDEX idx_provider_id ON social_user (provider_id);
-CREATE INDEX idx_sub ON social_user (sub);
 
 
 -- 사용자 로그인 이력 테이블
+-- login_time의 월 단위 partition 테이블로, partition 컬럼을 포함해야 하므로 PK는 (id, login_time)이다
+-- 다음 월의 partition은 LoginHistoryArchiver(LOGIN_HISTORY_ARCHIVE_ENABLED)가 pmax를 나누어 미리 추가한다
 CREATE TABLE IF NOT EXISTS user_login_history
 (
-    id            bigint auto_increment primary key,
+    id            bigint auto_increment,
     user_id       bigint        null comment '사용자 ID(PK)',
     user_uuid     binary(16)    not null comment '사용자 UUID',
-    login_time    datetime      null comment '마지막 로그인 사간',
+    login_time    datetime      not null comment '로그인 시간',
     login_success tinyint(1) comment '로그인 성공 여부',
     ip_address    varbinary(16) null comment '마지막 로그인 IP',
     created_at    datetime(6)   not null comment '생성일자',
-    updated_at    datetime(6)   not null comment '변경일자'
+    updated_at    datetime(6)   not null comment '변경일자',
+
+    primary key (id, login_time)
+)
+PARTITION BY RANGE COLUMNS (login_time) (
+    PARTITION p202610 VALUES LESS THAN ('2026-11-01 00:00:00'),
+    PARTITION pmax VALUES LESS THAN (MAXVALUE)
 );
 
 CREATE INDEX idx_user_id ON user_login_history (user_id);
-create index idx_user_uuid on user_login_history (user_uuid);
 
 -- JWT Token 테이블
 CREATE TABLE IF NOT EXISTS jwt_token
@@ -72,17 +82,22 @@ CREATE TABLE IF NOT EXISTS jwt_token
     id                bigint auto_increment primary key,
     user_id           bigint       not null comment '사용자 ID',
     user_uuid         binary(16)   not null comment '사용자 UUID',
+    jti               varchar(32)  not null comment 'Token 식별자(세션 ID)',
     access_token      varchar(255) not null comment 'AccessToken',
     refresh_token     text         not null comment 'RefreshToken(AES 256)',
     refresh_token_key varchar(128) not null comment 'RefreshToken(SHA 256)',
     issued_at         datetime     not null comment 'Token 발행일시',
     expires_at        datetime     not null comment 'RefreshToken 만료일시',
+    token_generation  int default 0 not null comment '발급 당시의 사용자 토큰 세대',
+    user_agent        varchar(512) null comment '로그인 기기의 User-Agent',
     created_at        datetime(6)  not null comment '생성일자',
-    updated_at        datetime(6)  not null comment '변경일자'
+    updated_at        datetime(6)  not null comment '변경일자',
+
+    constraint uq_jti
+        unique (jti)
 );
 
 CREATE INDEX idx_user_id ON jwt_token (user_id);
-CREATE INDEX idx_access_token ON jwt_token (access_token);
 CREATE INDEX idx_expires_at ON jwt_token (expires_at);
-CREATE INDEX idx_refresh_token_key ON jwt_token (refresh_token_key);
+CREATE INDEX idx_refresh_token_key_user_id_expires_at ON jwt_token (refresh_token_key, user_id, expires_at);
 create index idx_user_uuid on jwt_token (user_uuid);
\ No newline at end of file
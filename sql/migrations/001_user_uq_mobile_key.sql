@@ -0,0 +1,7 @@
+USE `fastapi-simple-auth`;
+
+-- 회원가입 시 핸드폰 번호 중복을 unique 제약조건으로 판단한다
+-- 적용 전에 중복된 mobile_key가 없는지 확인한다
+-- SELECT mobile_key, COUNT(*) FROM user WHERE mobile_key IS NOT NULL GROUP BY mobile_key HAVING COUNT(*) > 1;
+ALTER TABLE user
+    ADD CONSTRAINT uq_mobile_key UNIQUE (mobile_key);
@@ -0,0 +1,28 @@
+USE `fastapi-simple-auth`;
+
+-- DAL 쿼리에서 사용하지 않거나 다른 인덱스와 중복되는 인덱스를 삭제하고, 토큰 갱신 쿼리를 위한 인덱스를 추가한다
+-- 변경 전/후 비용은 src/benchmarks/index_audit.py로 비교한다
+-- 인덱스 추가/삭제는 INPLACE(LOCK=NONE)로 실행되며, 테이블별로 하나의 ALTER TABLE로 실행하여 테이블을 한 번만 다시 만든다
+
+-- social_user: (provider_id, sub) 조회는 uq_provider_id_sub를 사용하므로 단일 컬럼 인덱스는 중복이다
+-- idx_sub는 sub만으로 조회하는 쿼리가 없다
+ALTER TABLE social_user
+    DROP INDEX idx_provider_id,
+    DROP INDEX idx_sub,
+    ALGORITHM = INPLACE, LOCK = NONE;
+
+-- user_login_history: user_uuid로 조회하는 쿼리가 없으며, 사용자별 조회는 idx_user_id(user_id, id)를 사용한다
+-- 로그인마다 random 16 bytes 값의 인덱스를 갱신하는 비용을 줄인다
+ALTER TABLE user_login_history
+    DROP INDEX idx_user_uuid,
+    ALGORITHM = INPLACE, LOCK = NONE;
+
+-- jwt_token
+-- 토큰 갱신(UPDATE ... WHERE refresh_token_key = ? AND user_id = ? AND expires_at >= ?)의 조건을 모두 포함한다
+-- refresh_token_key로 시작하므로 refreshToken 조회(WHERE refresh_token_key = ?)도 이 인덱스를 사용하며, idx_refresh_token_key는 중복이 된다
+-- idx_access_token(varchar(255))은 accessToken으로 조회하는 쿼리가 없으므로 삭제한다
+ALTER TABLE jwt_token
+    ADD INDEX idx_refresh_token_key_user_id_expires_at (refresh_token_key, user_id, expires_at),
+    DROP INDEX idx_refresh_token_key,
+    DROP INDEX idx_access_token,
+    ALGORITHM = INPLACE, LOCK = NONE;
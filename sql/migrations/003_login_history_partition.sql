@@ -0,0 +1,28 @@
+USE `fastapi-simple-auth`;
+
+-- user_login_history를 login_time의 월 단위 RANGE COLUMNS partition 테이블로 변경한다
+-- 보관 기간이 지난 partition은 LoginHistoryArchiver가 파일로 보관한 후 DROP PARTITION으로 삭제하므로,
+-- 대량 DELETE 없이 테이블과 인덱스 크기가 보관 기간만큼으로 유지된다
+--
+-- partition 테이블의 모든 unique key(PK 포함)는 partition 컬럼을 포함해야 하므로 PK를 (id, login_time)으로 변경한다
+-- id는 AUTO_INCREMENT로 여전히 유일하며, 사용자별 조회는 idx_user_id를 사용한다
+-- partition 변경은 테이블을 다시 만드는 COPY 작업이며 쓰기를 막으므로, 로그인 이력 쓰기를 멈출 수 있는 시간에 실행한다
+-- (LOGIN_HISTORY_WRITE_BEHIND_ENABLED를 사용한다면 쓰기에 실패한 이력은 spill 파일에 기록된 후 다시 저장된다)
+
+-- login_time이 없는 이력은 생성일자로 채운다
+UPDATE user_login_history SET login_time = created_at WHERE login_time IS NULL;
+
+ALTER TABLE user_login_history
+    MODIFY login_time datetime not null comment '로그인 시간',
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (id, login_time);
+
+-- 첫 번째 partition은 이전의 모든 이력을 저장하며, 보관 기간이 지나면 한 번에 보관/삭제된다
+-- 다음 월의 partition은 LoginHistoryArchiver가 pmax를 나누어 미리 추가한다(LOGIN_HISTORY_PARTITION_MONTHS_AHEAD)
+ALTER TABLE user_login_history
+    PARTITION BY RANGE COLUMNS (login_time) (
+        PARTITION p202610 VALUES LESS THAN ('2026-11-01 00:00:00'),
+        PARTITION p202611 VALUES LESS THAN ('2026-12-01 00:00:00'),
+        PARTITION p202612 VALUES LESS THAN ('2027-01-01 00:00:00'),
+        PARTITION pmax VALUES LESS THAN (MAXVALUE)
+    );
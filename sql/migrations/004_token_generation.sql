@@ -0,0 +1,13 @@
+USE `fastapi-simple-auth`;
+
+-- 전체 로그아웃(토큰 세대 증가)에 사용하는 token_generation 컬럼을 추가한다
+-- 기존 사용자와 토큰은 0 세대로 시작하므로, 적용 전에 발급된 토큰도 그대로 사용할 수 있다
+-- DEFAULT가 있으므로 이 컬럼을 모르는 이전 버전의 앱도 계속 INSERT 할 수 있다
+ALTER TABLE user
+    ADD COLUMN token_generation int default 0 not null comment '토큰 세대(전체 로그아웃 시 증가)' AFTER is_active;
+
+ALTER TABLE jwt_token
+    ADD COLUMN token_generation int default 0 not null comment '발급 당시의 사용자 토큰 세대' AFTER expires_at;
+
+-- TokenReaper는 토큰 세대가 증가한 사용자만 조회하여 폐기된 토큰을 삭제한다
+CREATE INDEX idx_token_generation ON user (token_generation);
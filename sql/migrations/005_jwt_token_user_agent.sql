@@ -0,0 +1,6 @@
+USE `fastapi-simple-auth`;
+
+-- 세션(기기) 목록에 표시할 로그인 기기의 User-Agent 컬럼을 추가한다
+-- 적용 전에 발급된 토큰은 User-Agent가 없다(NULL)
+ALTER TABLE jwt_token
+    ADD COLUMN user_agent varchar(512) null comment '로그인 기기의 User-Agent' AFTER token_generation;
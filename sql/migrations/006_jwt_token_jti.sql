@@ -0,0 +1,20 @@
+USE `fastapi-simple-auth`;
+
+-- 로그인 세션을 식별하는 jti 컬럼을 추가한다
+-- 이전 버전의 앱은 jti 없이 INSERT 하므로 두 단계로 나누어 적용한다
+-- UUID()는 행마다 다른 값을 만들며, '-'를 제거하면 generate_jti()와 같은 32자리 16진수 문자열이 된다
+-- 기존 토큰의 accessToken에는 jti claim이 없으므로, 토큰을 갱신하기 전까지는 해당 세션만 로그아웃할 수 없다(전체 로그아웃은 가능하다)
+
+-- 1. 새 버전의 앱을 배포하기 전에 NULL을 허용하는 컬럼으로 추가하고, 기존 토큰의 jti를 채운다
+ALTER TABLE jwt_token
+    ADD COLUMN jti varchar(32) null comment 'Token 식별자(세션 ID)' AFTER user_uuid;
+
+UPDATE jwt_token SET jti = REPLACE(UUID(), '-', '') WHERE jti IS NULL;
+
+-- 2. 모든 앱이 새 버전으로 배포된 후에 배포 중 이전 버전의 앱이 저장한 토큰의 jti를 채우고,
+--    NOT NULL, unique 제약조건을 추가한다
+UPDATE jwt_token SET jti = REPLACE(UUID(), '-', '') WHERE jti IS NULL;
+
+ALTER TABLE jwt_token
+    MODIFY jti varchar(32) not null comment 'Token 식별자(세션 ID)',
+    ADD CONSTRAINT uq_jti UNIQUE (jti);
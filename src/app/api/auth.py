@@ -1,31 +1,82 @@
-import uuid
+import math
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, status, Request
+from fastapi import APIRouter, Depends, Query, Request, status
 from fastapi.responses import JSONResponse
 from loguru import logger
+from pydantic import EmailStr
+from sqlalchemy import Row
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.responses import ErrorJSONResponse, DefaultJSONResponse
 import crud
-from dependencies.auth import AuthorizeToken
-from dependencies.database import get_session
-
+import models
 import schemas
+from core.metrics import metrics
+from core.responses import DefaultJSONResponse, ErrorJSONResponse
+from crud.login_writer import save_login, save_login_failure
+from db.errors import get_violated_constraint
+from dependencies.auth import AuthorizeToken
+from dependencies.database import get_session, release_connection
+from dependencies.token_store import get_token_store
 from utils.constants.oauth import ProviderID
-from utils.security.auth import authenticate
+from utils.random import uuid7
+from utils.security.auth import authenticate, hash_password
+from utils.security.email_filter import registered_email_filter
 from utils.security.encryption import AESCipher, Hasher
-from utils.security.token import create_new_jwt_token
-from utils.strings import masking_str, binary_to_uuid
+from utils.security.lockout import login_lockout
+from utils.security.token import create_new_jwt_token, generate_jti, refresh_token_key
+from utils.strings import binary_to_uuid, masking_str
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+email_filter_rejects = metrics.counter(
+    "email_filter_login_rejects_total", "Bloom filter로 DB 조회 없이 거절한 로그인 요청 수"
+)
+
+# 회원가입 시 위반한 unique 제약조건별 응답 메시지
+REGISTER_CONFLICT_MESSAGES = {
+    "uq_email_key_provider_id": "사용할 수 없는 이메일 주소입니다",
+    "uq_mobile_key": "사용할 수 없는 핸드폰 번호입니다",
+}
+
+
+async def _record_login_failure(
+    session: AsyncSession, login_user: Row, email_key: str, ip_address: str
+) -> None:
+    """
+    비밀번호가 일치하지 않은 로그인을 로그인 이력과 잠금 실패 횟수에 기록한다
+
+    기록에 실패하더라도 로그인 실패 응답은 그대로 반환한다
+    """
+
+    if login_lockout is not None:
+        await login_lockout.fail(email_key, ip_address)
+
+    try:
+        await save_login_failure(
+            session=session,
+            login_history=schemas.LoginHistory(
+                user_id=login_user.id,
+                user_uuid=login_user.uuid,
+                login_time=datetime.now(),
+                login_success=False,
+                ip_address=ip_address,
+            ),
+        )
+    except Exception as e:
+        logger.exception(e)
+        await session.rollback()
+    finally:
+        await session.close()
+
 
 @router.post(
     "/register",
     response_model=schemas.RegisterResponse,
     responses={
         404: {"model": schemas.ErrorResponse},
+        409: {"model": schemas.ErrorResponse},
         500: {"model": schemas.ErrorResponse},
     },
 )
@@ -43,31 +94,13 @@ async def register_user(
 
     # 암호화된 이메일 검색을 위한 Index Key 생성
     email_key: str = Hasher.hmac_sha256(register_request.email)
-    # 이미 등록된 이메일 주소인지 확인한다
-    if await user_dal.exists_email(email_key=email_key):
-        return ErrorJSONResponse(
-            message="사용할 수 없는 이메일 주소입니다",
-            success=False,
-            status_code=status.HTTP_409_CONFLICT,
-            error_code=1409,
-        )
 
     mobile: str | None = None
     # 암호화된 핸드폰 번호 검색을 위한 Index Key 생성
-    mobile_key: str | None = (
-        Hasher.hmac_sha256(register_request.mobile) if register_request.mobile else None
-    )
-    # 핸드폰 번호를 입력하였다면, 이미 등록된 핸드폰 번호인지 확인한다
+    mobile_key: str | None = None
     if register_request.mobile:
-        if await user_dal.exists_mobile(mobile_key=mobile_key):
-            return ErrorJSONResponse(
-                message="사용할 수 없는 핸드폰 번호입니다",
-                success=False,
-                status_code=status.HTTP_409_CONFLICT,
-                error_code=1409,
-            )
-        else:
-            mobile = aes.encrypt(register_request.mobile)
+        mobile = aes.encrypt(register_request.mobile)
+        mobile_key = Hasher.hmac_sha256(register_request.mobile)
 
     salt = Hasher.get_password_salt()
 
@@ -75,21 +108,43 @@ async def register_user(
         name=register_request.name,
         email=aes.encrypt(register_request.email),
         email_key=email_key,
-        uuid=uuid.uuid4().bytes,
+        uuid=uuid7().bytes,
         mobile=mobile,
         mobile_key=mobile_key,
-        password=Hasher.get_password_hash(register_request.password1, salt),
+        password=await hash_password(register_request.password1, salt),
         salt=salt,
         provider_id=ProviderID.LOCAL.name,
         is_active=1,
     )
 
     try:
+        # 이메일 주소, 핸드폰 번호 중복 여부는 unique 제약조건으로 확인한다
         result = await user_dal.insert_user(new_user=new_user)
         new_user_id = result.inserted_primary_key[0]
 
         await session.commit()
 
+    except IntegrityError as e:
+        await session.rollback()
+
+        constraint = get_violated_constraint(e, models.User.__table__)
+        if constraint not in REGISTER_CONFLICT_MESSAGES:
+            logger.exception(e)
+            return ErrorJSONResponse(
+                message="회원가입을 처리하는 도중에 문제가 발생하였습니다",
+                success=False,
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                error_code=1500,
+            )
+
+        logger.info(f'이미 등록된 사용자 정보입니다. { {"constraint": constraint} }')
+        return ErrorJSONResponse(
+            message=REGISTER_CONFLICT_MESSAGES[constraint],
+            success=False,
+            status_code=status.HTTP_409_CONFLICT,
+            error_code=1409,
+        )
+
     except Exception as e:
         logger.exception(e)
         await session.rollback()
@@ -110,6 +165,56 @@ async def register_user(
     return response
 
 
+@router.get(
+    "/email/availability",
+    response_model=schemas.EmailAvailabilityResponse,
+    responses={
+        500: {"model": schemas.ErrorResponse},
+    },
+)
+async def email_availability(
+    *,
+    email: EmailStr = Query(),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Email Availability API
+
+    회원가입에 사용할 수 있는 이메일 주소인지 확인한다
+    - 가입된 이메일 Bloom filter에 없다면 DB를 조회하지 않고 사용 가능으로 응답한다
+    - filter에 있다면 오탐일 수 있으므로 DB에서 확인한다
+    """
+
+    email_key = Hasher.hmac_sha256(email)
+
+    if not registered_email_filter.might_exist(email_key):
+        await session.close()
+        return schemas.EmailAvailabilityResponse(
+            success=True, message="ok", available=True
+        )
+
+    user_dal = crud.UserDAL(session=session)
+
+    try:
+        email_exists = await user_dal.exists_email(
+            email_key=email_key, provider_id=ProviderID.LOCAL.name
+        )
+    except Exception as e:
+        logger.exception(e)
+        return ErrorJSONResponse(
+            message="이메일 주소를 확인하는 도중에 문제가 발생하였습니다",
+            success=False,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            error_code=1500,
+        )
+    finally:
+        await session.close()
+
+    return schemas.EmailAvailabilityResponse(
+        success=True, message="ok", available=not email_exists
+    )
+
+
 ###########################################################################
 # API Authentication
 ###########################################################################
@@ -120,6 +225,7 @@ async def register_user(
         400: {"model": schemas.ErrorResponse},
         403: {"model": schemas.ErrorResponse},
         404: {"model": schemas.ErrorResponse},
+        429: {"model": schemas.ErrorResponse},
         500: {"model": schemas.ErrorResponse},
     },
 )
@@ -128,6 +234,7 @@ async def api_login(
     login_request: schemas.Login,
     request: Request,
     session: AsyncSession = Depends(get_session),
+    token_store: crud.TokenStore = Depends(get_token_store),
 ):
     """
     Login API
@@ -138,12 +245,44 @@ async def api_login(
 
     aes = AESCipher()
     user_dal = crud.UserDAL(session=session)
-    user_login_dal = crud.UserLoginHistoryDAL(session=session)
-    token_dal = crud.TokenDAL(session=session)
+
+    email_key = Hasher.hmac_sha256(login_request.email)
+    ip_address = request.client.host
+
+    # 로그인 실패가 반복되어 잠긴 계정/IP라면 DB 조회와 비밀번호 해싱을 하지 않는다
+    if login_lockout is not None:
+        retry_after = await login_lockout.check(email_key, ip_address)
+        if retry_after > 0:
+            await session.close()
+            logger.info(
+                f'로그인 시도가 잠겨있습니다. { {"email": masking_str(login_request.email), "retry_after": retry_after} }'
+            )
+            return ErrorJSONResponse(
+                message="로그인 시도가 너무 많습니다. 잠시 후 다시 시도해주세요",
+                success=False,
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                error_code=1429,
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+    # 가입되지 않은 이메일이 확실하다면 DB를 조회하지 않는다
+    if not registered_email_filter.might_exist(email_key):
+        email_filter_rejects.inc()
+        await session.close()
+        if login_lockout is not None:
+            await login_lockout.fail(None, ip_address)
+        logger.info(f'사용자를 찾을 수 없습니다. { {"email": masking_str(login_request.email)} }')
+        return ErrorJSONResponse(
+            message="사용자를 찾을 수 없습니다",
+            success=False,
+            status_code=status.HTTP_404_NOT_FOUND,
+            error_code=1404,
+        )
 
     try:
-        login_user = await user_dal.get_by_email(
-            email_key=Hasher.hmac_sha256(login_request.email)
+        login_user = await user_dal.get_login_user_by_email(
+            email_key=email_key,
+            provider_id=ProviderID.LOCAL.name,
         )
 
     except TypeError as e:
@@ -158,7 +297,12 @@ async def api_login(
             error_code=1500,
         )
 
+    # 사용자 조회가 끝났으므로 비밀번호 인증, 토큰 생성/암호화 동안 연결을 pool에 반납한다
+    await release_connection(session)
+
     if not login_user:
+        if login_lockout is not None:
+            await login_lockout.fail(None, ip_address)
         logger.info(f'사용자를 찾을 수 없습니다. { {"email": masking_str(login_request.email)} }')
         return ErrorJSONResponse(
             message="사용자를 찾을 수 없습니다",
@@ -183,6 +327,7 @@ async def api_login(
         user_password=login_user.password,
         salt=login_user.salt,
     ):
+        await _record_login_failure(session, login_user, email_key, ip_address)
         logger.info(f'사용자 인증에 실패하였습니다. { {"email": masking_str(login_request.email)} }')
         return ErrorJSONResponse(
             message="사용자 인증에 실패하였습니다",
@@ -192,35 +337,41 @@ async def api_login(
         )
 
     # JWT Token쌍을 생성한다
-    new_token = await create_new_jwt_token(sub=binary_to_uuid(login_user.uuid))
+    jti = generate_jti()
+    new_token = await create_new_jwt_token(
+        sub=binary_to_uuid(login_user.uuid),
+        jti=jti,
+        generation=login_user.token_generation,
+    )
 
     # 생성한 RefreshToken을 DB에 저장하기 위한 스키마 생성
     new_refresh_token = schemas.TokenInsert(
         user_id=login_user.id,
         user_uuid=login_user.uuid,
+        jti=jti,
         access_token=new_token.access_token,
         refresh_token=aes.encrypt(new_token.refresh_token),
-        refresh_token_key=Hasher.hmac_sha256(new_token.refresh_token),
+        refresh_token_key=refresh_token_key(new_token.refresh_token),
         issued_at=datetime.fromtimestamp(int(new_token.iat)),
         expires_at=datetime.fromtimestamp(int(new_token.refresh_token_expires_in)),
+        token_generation=login_user.token_generation,
+        user_agent=request.headers.get("user-agent"),
     )
 
     try:
-        # Token 정보 저장
-        await token_dal.insert_token(new_token=new_refresh_token)
-
-        # Login 이력 저장
-        await user_login_dal.insert_login_history(
+        # Token 정보와 Login 이력 저장
+        await save_login(
+            session=session,
+            token_store=token_store,
+            new_token=new_refresh_token,
             login_history=schemas.LoginHistory(
                 user_id=login_user.id,
                 user_uuid=login_user.uuid,
                 login_time=datetime.now(),
                 login_success=True,
-                ip_address=request.client.host,
-            )
+                ip_address=ip_address,
+            ),
         )
-
-        await session.commit()
     except Exception as e:
         logger.exception(e)
         await session.rollback()
@@ -233,6 +384,9 @@ async def api_login(
     finally:
         await session.close()
 
+    if login_lockout is not None:
+        await login_lockout.succeed(email_key)
+
     logger.info(
         f'사용자가 로그인하였습니다. { {"user_id": login_user.id, "email": masking_str(login_request.email), "name": masking_str(login_user.name), "provider_id": "LOCAL"} }'
     )
@@ -255,6 +409,7 @@ async def api_logout(
     *,
     user_token: schemas.AuthToken = Depends(AuthorizeToken()),
     session: AsyncSession = Depends(get_session),
+    token_store: crud.TokenStore = Depends(get_token_store),
 ):
     """
     Logout API
@@ -265,16 +420,10 @@ async def api_logout(
     - redis에 blackList를 생성하여 관리하는 방법으로 이를 해결할 수도 있다
     """
 
-    token_dal = crud.TokenDAL(session=session)
-
     try:
-        if await token_dal.exists(
-            user_uuid=str(user_token.sub), access_token=user_token.access_token
+        if user_token.jti and await token_store.delete(
+            user_uuid=str(user_token.sub), jti=user_token.jti
         ):
-            await token_dal.delete(
-                user_uuid=str(user_token.sub), access_token=user_token.access_token
-            )
-
             await session.commit()
         else:
             # Token을 찾을 수 없는 경우에는 Logging만 하고 정상 결과를 반환한다
@@ -296,6 +445,51 @@ async def api_logout(
     return DefaultJSONResponse(message="로그아웃 하였습니다", success=True)
 
 
+@router.post(
+    "/api/logout/all",
+    response_model=schemas.DefaultResponse,
+    responses={
+        401: {"model": schemas.ErrorResponse},
+        403: {"model": schemas.ErrorResponse},
+        500: {"model": schemas.ErrorResponse},
+    },
+)
+async def api_logout_all(
+    *,
+    user_token: schemas.AuthToken = Depends(AuthorizeToken()),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Logout All API
+
+    사용자의 토큰 세대를 증가시켜 모든 기기에서 로그아웃 시킨다
+    - 이전 세대로 발급된 accessToken, refreshToken은 모두 사용할 수 없게 된다
+    - 남아있는 토큰 정보는 TokenReaper가 주기적으로 삭제한다
+    """
+
+    user_dal = crud.UserDAL(session=session)
+
+    try:
+        await user_dal.increase_token_generation(uuid=str(user_token.sub))
+
+        await session.commit()
+    except Exception as e:
+        logger.exception(e)
+        await session.rollback()
+        return ErrorJSONResponse(
+            message="로그아웃을 하는 도중에 문제가 발생하였습니다",
+            success=False,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            error_code=1500,
+        )
+    finally:
+        await session.close()
+
+    logger.info(f'사용자가 모든 기기에서 로그아웃 하였습니다. { {"user_id": user_token.sub} }')
+
+    return DefaultJSONResponse(message="모든 기기에서 로그아웃 하였습니다", success=True)
+
+
 ###########################################################################
 # WEB Authentication
 ###########################################################################
@@ -306,6 +500,7 @@ async def api_logout(
         400: {"model": schemas.ErrorResponse},
         403: {"model": schemas.ErrorResponse},
         404: {"model": schemas.ErrorResponse},
+        429: {"model": schemas.ErrorResponse},
         500: {"model": schemas.ErrorResponse},
     },
 )
@@ -314,6 +509,7 @@ async def web_login(
     login_request: schemas.Login,
     request: Request,
     session: AsyncSession = Depends(get_session),
+    token_store: crud.TokenStore = Depends(get_token_store),
 ):
     """
     Login API
@@ -325,12 +521,44 @@ async def web_login(
 
     aes = AESCipher()
     user_dal = crud.UserDAL(session=session)
-    user_login_dal = crud.UserLoginHistoryDAL(session=session)
-    token_dal = crud.TokenDAL(session=session)
+
+    email_key = Hasher.hmac_sha256(login_request.email)
+    ip_address = request.client.host
+
+    # 로그인 실패가 반복되어 잠긴 계정/IP라면 DB 조회와 비밀번호 해싱을 하지 않는다
+    if login_lockout is not None:
+        retry_after = await login_lockout.check(email_key, ip_address)
+        if retry_after > 0:
+            await session.close()
+            logger.info(
+                f'로그인 시도가 잠겨있습니다. { {"email": masking_str(login_request.email), "retry_after": retry_after} }'
+            )
+            return ErrorJSONResponse(
+                message="로그인 시도가 너무 많습니다. 잠시 후 다시 시도해주세요",
+                success=False,
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                error_code=1429,
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+    # 가입되지 않은 이메일이 확실하다면 DB를 조회하지 않는다
+    if not registered_email_filter.might_exist(email_key):
+        email_filter_rejects.inc()
+        await session.close()
+        if login_lockout is not None:
+            await login_lockout.fail(None, ip_address)
+        logger.info(f'사용자를 찾을 수 없습니다. { {"email": masking_str(login_request.email)} }')
+        return ErrorJSONResponse(
+            message="사용자를 찾을 수 없습니다",
+            success=False,
+            status_code=status.HTTP_404_NOT_FOUND,
+            error_code=1404,
+        )
 
     try:
-        login_user = await user_dal.get_by_email(
-            email_key=Hasher.hmac_sha256(login_request.email)
+        login_user = await user_dal.get_login_user_by_email(
+            email_key=email_key,
+            provider_id=ProviderID.LOCAL.name,
         )
 
     except TypeError as e:
@@ -345,7 +573,12 @@ async def web_login(
             error_code=1500,
         )
 
+    # 사용자 조회가 끝났으므로 비밀번호 인증, 토큰 생성/암호화 동안 연결을 pool에 반납한다
+    await release_connection(session)
+
     if not login_user:
+        if login_lockout is not None:
+            await login_lockout.fail(None, ip_address)
         logger.info(f'사용자를 찾을 수 없습니다. { {"email": masking_str(login_request.email)} }')
         return ErrorJSONResponse(
             message="사용자를 찾을 수 없습니다",
@@ -370,6 +603,7 @@ async def web_login(
         user_password=login_user.password,
         salt=login_user.salt,
     ):
+        await _record_login_failure(session, login_user, email_key, ip_address)
         logger.info(f'사용자 인증에 실패하였습니다. { {"email": masking_str(login_request.email)} }')
         return ErrorJSONResponse(
             message="사용자 인증에 실패하였습니다",
@@ -379,35 +613,41 @@ async def web_login(
         )
 
     # JWT Token쌍을 생성한다
-    new_token = await create_new_jwt_token(sub=binary_to_uuid(login_user.uuid))
+    jti = generate_jti()
+    new_token = await create_new_jwt_token(
+        sub=binary_to_uuid(login_user.uuid),
+        jti=jti,
+        generation=login_user.token_generation,
+    )
 
     # 생성한 RefreshToken을 DB에 저장하기 위한 스키마 생성
     new_refresh_token = schemas.TokenInsert(
         user_id=login_user.id,
         user_uuid=login_user.uuid,
+        jti=jti,
         access_token=new_token.access_token,
         refresh_token=aes.encrypt(new_token.refresh_token),
-        refresh_token_key=Hasher.hmac_sha256(new_token.refresh_token),
+        refresh_token_key=refresh_token_key(new_token.refresh_token),
         issued_at=datetime.fromtimestamp(int(new_token.iat)),
         expires_at=datetime.fromtimestamp(int(new_token.refresh_token_expires_in)),
+        token_generation=login_user.token_generation,
+        user_agent=request.headers.get("user-agent"),
     )
 
     try:
-        # Token 정보 저장
-        await token_dal.insert_token(new_token=new_refresh_token)
-
-        # Login 이력 저장
-        await user_login_dal.insert_login_history(
+        # Token 정보와 Login 이력 저장
+        await save_login(
+            session=session,
+            token_store=token_store,
+            new_token=new_refresh_token,
             login_history=schemas.LoginHistory(
                 user_id=login_user.id,
                 user_uuid=login_user.uuid,
                 login_time=datetime.now(),
                 login_success=True,
-                ip_address=request.client.host,
-            )
+                ip_address=ip_address,
+            ),
         )
-
-        await session.commit()
     except Exception as e:
         logger.exception(e)
         await session.rollback()
@@ -420,6 +660,9 @@ async def web_login(
     finally:
         await session.close()
 
+    if login_lockout is not None:
+        await login_lockout.succeed(email_key)
+
     logger.info(
         f'사용자가 로그인하였습니다. { {"user_id": login_user.id, "email": masking_str(login_request.email), "name": masking_str(login_user.name)}, "provider_id": "LOCAL" }'
     )
@@ -452,6 +695,7 @@ async def web_logout(
     *,
     user_token: schemas.AuthToken = Depends(AuthorizeToken()),
     session: AsyncSession = Depends(get_session),
+    token_store: crud.TokenStore = Depends(get_token_store),
 ):
     """
     Logout API
@@ -463,16 +707,10 @@ async def web_logout(
     - redis에 blackList를 생성하여 관리하는 방법으로 이를 해결할 수도 있다
     """
 
-    token_dal = crud.TokenDAL(session=session)
-
     try:
-        if await token_dal.exists(
-            user_uuid=str(user_token.sub), access_token=user_token.access_token
+        if user_token.jti and await token_store.delete(
+            user_uuid=str(user_token.sub), jti=user_token.jti
         ):
-            await token_dal.delete(
-                user_uuid=str(user_token.sub), access_token=user_token.access_token
-            )
-
             await session.commit()
         else:
             # Token을 찾을 수 없는 경우에는 Logging만 하고 정상 결과를 반환한다
@@ -495,3 +733,50 @@ async def web_logout(
     response.delete_cookie(key="refresh_token")
 
     return response
+
+
+@router.post(
+    "/web/logout/all",
+    response_model=schemas.DefaultResponse,
+    responses={
+        401: {"model": schemas.ErrorResponse},
+        403: {"model": schemas.ErrorResponse},
+        500: {"model": schemas.ErrorResponse},
+    },
+)
+async def web_logout_all(
+    *,
+    user_token: schemas.AuthToken = Depends(AuthorizeToken()),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Logout All API
+
+    사용자의 토큰 세대를 증가시켜 모든 기기에서 로그아웃 시킨다
+    Cookie에 refreshToken을 삭제한다
+    """
+
+    user_dal = crud.UserDAL(session=session)
+
+    try:
+        await user_dal.increase_token_generation(uuid=str(user_token.sub))
+
+        await session.commit()
+    except Exception as e:
+        logger.exception(e)
+        await session.rollback()
+        return ErrorJSONResponse(
+            message="로그아웃을 하는 도중에 문제가 발생하였습니다",
+            success=False,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            error_code=1500,
+        )
+    finally:
+        await session.close()
+
+    logger.info(f'사용자가 모든 기기에서 로그아웃 하였습니다. { {"user_id": user_token.sub} }')
+
+    response = DefaultJSONResponse(message="모든 기기에서 로그아웃 하였습니다", success=True)
+    response.delete_cookie(key="refresh_token")
+
+    return response
@@ -0,0 +1,134 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import crud
+import schemas
+from core.responses import ErrorJSONResponse
+from crud.history_reader import export_login_histories, list_login_histories
+from dependencies.auth import AuthorizeToken
+from dependencies.database import get_session
+from utils.strings import uuid_to_binary
+
+router = APIRouter(prefix="/auth/login-history", tags=["Login History"])
+
+
+@router.get(
+    "",
+    response_model=schemas.LoginHistoryListResponse,
+    responses={
+        400: {"model": schemas.ErrorResponse},
+        401: {"model": schemas.ErrorResponse},
+        404: {"model": schemas.ErrorResponse},
+        500: {"model": schemas.ErrorResponse},
+    },
+)
+async def list_login_history(
+    *,
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=100),
+    user_token: schemas.AuthToken = Depends(AuthorizeToken()),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Login History List API
+
+    로그인(성공/실패) 이력을 최신순으로 반환한다
+    - 다음 페이지는 응답의 next_cursor 값을 cursor로 전달하여 조회한다
+    """
+
+    try:
+        user_id = await crud.UserDAL(session=session).get_user_id_by_uuid(
+            user_token.sub
+        )
+    finally:
+        await session.close()
+
+    if user_id is None:
+        return ErrorJSONResponse(
+            message="사용자를 찾을 수 없습니다",
+            success=False,
+            status_code=status.HTTP_404_NOT_FOUND,
+            error_code=1404,
+        )
+
+    try:
+        histories, next_cursor = await list_login_histories(
+            user_id=user_id,
+            user_uuid=uuid_to_binary(user_token.sub),
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError:
+        logger.info(
+            f'잘못된 cursor 입니다. { {"user_id": user_token.sub, "cursor": cursor} }'
+        )
+        return ErrorJSONResponse(
+            message="잘못된 요청입니다",
+            success=False,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code=1400,
+        )
+    except Exception as e:
+        logger.exception(e)
+        return ErrorJSONResponse(
+            message="로그인 이력을 조회하는 도중에 문제가 발생하였습니다",
+            success=False,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            error_code=1500,
+        )
+
+    return schemas.LoginHistoryListResponse(
+        success=True, message="ok", histories=histories, next_cursor=next_cursor
+    )
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        401: {"model": schemas.ErrorResponse},
+        404: {"model": schemas.ErrorResponse},
+    },
+)
+async def export_login_history(
+    *,
+    since: datetime | None = Query(default=None),
+    until: datetime | None = Query(default=None),
+    user_token: schemas.AuthToken = Depends(AuthorizeToken()),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Login History Export API
+
+    로그인 이력 전체를 오래된 순서로 NDJSON(한 줄에 하나의 JSON)으로 반환한다
+    - 이력을 모두 메모리에 올리지 않고 DB에서 읽는 대로 전송한다
+    """
+
+    try:
+        user_id = await crud.UserDAL(session=session).get_user_id_by_uuid(
+            user_token.sub
+        )
+    finally:
+        await session.close()
+
+    if user_id is None:
+        return ErrorJSONResponse(
+            message="사용자를 찾을 수 없습니다",
+            success=False,
+            status_code=status.HTTP_404_NOT_FOUND,
+            error_code=1404,
+        )
+
+    return StreamingResponse(
+        export_login_histories(
+            user_id=user_id,
+            user_uuid=uuid_to_binary(user_token.sub),
+            since=since,
+            until=until,
+        ),
+        media_type="application/x-ndjson",
+    )
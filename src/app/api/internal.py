@@ -0,0 +1,202 @@
+import os
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import crud
+from core.metrics import metrics
+from core.responses import DefaultJSONResponse, ErrorJSONResponse
+from crud.history_analytics import login_analytics
+from crud.history_reader import export_login_histories, list_login_histories
+from db import base, shard
+from dependencies.auth import AuthorizeInternal
+from dependencies.database import get_session
+
+# 사용자의 로그인 이력, IP 주소 등을 반환하므로 모든 API에서 internal_api_token을 확인한다
+router = APIRouter(
+    prefix="/internal",
+    tags=["Internal"],
+    include_in_schema=False,
+    dependencies=[Depends(AuthorizeInternal())],
+)
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """
+    현재 worker 프로세스의 Metric을 반환한다
+    """
+
+    return DefaultJSONResponse(message=metrics.snapshot(), success=True)
+
+
+def _pool_status(engine, pool_config) -> dict:
+    pool = engine.sync_engine.pool
+
+    return {
+        "pool_size": pool_config.pool_size,
+        "max_overflow": pool_config.max_overflow,
+        "pool_timeout": pool_config.pool_timeout,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
+
+
+@router.get("/pool")
+async def get_pool():
+    """
+    현재 worker 프로세스의 DB connection pool 상태를 반환한다
+
+    - workers, budget: 호스트의 worker 수와 DB 연결 수 예산으로, pool 크기는 예산을 worker 수로 나누어 정한다
+    - checkout 대기 시간과 timeout 횟수는 /internal/metrics의 db_*_checkout_* 값으로 확인한다
+    """
+
+    pools = {"primary": _pool_status(base.engine, base.pool_config)}
+    if base.replica_engine is not None:
+        pools["replica"] = _pool_status(base.replica_engine, base.replica_pool_config)
+    for shard_id, shard_engine in enumerate(shard.shard_engines):
+        pools[f"shard{shard_id}"] = _pool_status(shard_engine, base.pool_config)
+
+    return DefaultJSONResponse(
+        message={
+            "pid": os.getpid(),
+            "workers": base.pool_config.workers,
+            "budget": base.pool_config.budget,
+            "pools": pools,
+        },
+        success=True,
+    )
+
+
+@router.get("/users/{user_id}/login-history")
+async def get_login_history(
+    *,
+    user_id: int,
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=100, ge=1, le=1000),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    사용자의 로그인 이력을 최신순으로 반환한다(보안 점검용)
+
+    - Primary 전체를 조회하지 않고 (user_id, id) keyset으로 페이지를 나누어 조회한다
+    - 다음 페이지는 응답의 next_cursor 값을 cursor로 전달하여 조회한다
+    """
+
+    try:
+        login_user = await crud.UserDAL(session=session).get_login_user_by_id(user_id)
+    finally:
+        await session.close()
+
+    if not login_user:
+        return ErrorJSONResponse(
+            message="사용자를 찾을 수 없습니다",
+            success=False,
+            status_code=status.HTTP_404_NOT_FOUND,
+            error_code=1404,
+        )
+
+    try:
+        histories, next_cursor = await list_login_histories(
+            user_id=user_id, user_uuid=login_user.uuid, cursor=cursor, limit=limit
+        )
+    except ValueError:
+        return ErrorJSONResponse(
+            message="잘못된 요청입니다",
+            success=False,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code=1400,
+        )
+    except Exception as e:
+        logger.exception(e)
+        return ErrorJSONResponse(
+            message="로그인 이력을 조회하는 도중에 문제가 발생하였습니다",
+            success=False,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            error_code=1500,
+        )
+
+    return DefaultJSONResponse(
+        message={
+            "histories": [h.model_dump(mode="json") for h in histories],
+            "next_cursor": next_cursor,
+        },
+        success=True,
+    )
+
+
+@router.get("/users/{user_id}/login-history/export")
+async def export_login_history(
+    *,
+    user_id: int,
+    since: datetime | None = Query(default=None),
+    until: datetime | None = Query(default=None),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    사용자의 로그인 이력을 오래된 순서로 NDJSON으로 반환한다(보안 점검용)
+
+    서버 측 cursor에서 읽는 대로 전송하므로 이력 수와 관계없이 메모리 사용량이 일정하다
+    """
+
+    try:
+        login_user = await crud.UserDAL(session=session).get_login_user_by_id(user_id)
+    finally:
+        await session.close()
+
+    if not login_user:
+        return ErrorJSONResponse(
+            message="사용자를 찾을 수 없습니다",
+            success=False,
+            status_code=status.HTTP_404_NOT_FOUND,
+            error_code=1404,
+        )
+
+    return StreamingResponse(
+        export_login_histories(
+            user_id=user_id, user_uuid=login_user.uuid, since=since, until=until
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/analytics/logins")
+async def get_login_analytics(
+    *,
+    hours: int = Query(default=168, ge=1, le=24 * 366),
+    top: int = Query(default=20, ge=0, le=1000),
+):
+    """
+    로그인 이력의 분석 집계를 반환한다(보안 점검용)
+
+    - hourly: 최근 hours 시간의 시간별 로그인 성공/실패 수
+    - hour_of_day: 시간대(0~23시)별 로그인 성공 수
+    - active_days: 사용자별 활성 일수의 분포
+    - anomalies: 사용자의 평소 로그인 시간대에서 벗어난 정도(score)가 큰 로그인 top 개
+    - 집계는 캐시하며, login_analytics_refresh_seconds가 지났다면 이후에 추가된 이력만 읽어 갱신한다
+    """
+
+    if not login_analytics.available:
+        return ErrorJSONResponse(
+            message="numpy가 설치되어 있지 않아 로그인 분석을 사용할 수 없습니다",
+            success=False,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            error_code=1503,
+        )
+
+    try:
+        snapshot = await login_analytics.snapshot(hours=hours, top=top)
+    except Exception as e:
+        logger.exception(e)
+        return ErrorJSONResponse(
+            message="로그인 분석 집계를 갱신하는 도중에 문제가 발생하였습니다",
+            success=False,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            error_code=1500,
+        )
+
+    return DefaultJSONResponse(message=snapshot, success=True)
@@ -1,8 +1,7 @@
 import json
-import uuid
 from datetime import datetime
 
-from fastapi import APIRouter, Request, Depends, Form, status
+from fastapi import APIRouter, Depends, Form, Request, status
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -10,13 +9,16 @@ import crud
 import schemas
 from core.config import TEMPLATES, Settings, get_settings
 from core.responses import ErrorJSONResponse
-from dependencies.database import get_session
+from crud.login_writer import save_login
+from dependencies.database import get_session, release_connection
 from dependencies.http import get_http_session
+from dependencies.token_store import get_token_store
 from utils.constants.oauth import ProviderID
 from utils.oauth.apple import AppleOAuthClient
+from utils.random import uuid7
 from utils.security.encryption import AESCipher, Hasher
-from utils.security.token import create_new_jwt_token
-from utils.strings import masking_str, binary_to_uuid
+from utils.security.token import create_new_jwt_token, generate_jti, refresh_token_key
+from utils.strings import binary_to_uuid, masking_str
 
 router = APIRouter(prefix="/apple", tags=["OAuth"])
 
@@ -55,16 +57,14 @@ async def apple_login_callback(
     error: str = Form(default=None),
     settings: Settings = Depends(get_settings),
     session: AsyncSession = Depends(get_session),
+    token_store: crud.TokenStore = Depends(get_token_store),
 ):
     """
     Apple OAuth 로그인 콜백 API
     """
 
     aes = AESCipher()
-    user_dal = crud.UserDAL(session=session)
     oauth_user_dal = crud.SocialUserDAL(session=session)
-    user_login_dal = crud.UserLoginHistoryDAL(session=session)
-    token_dal = crud.TokenDAL(session=session)
 
     provider_id = ProviderID.APPLE.name
 
@@ -104,73 +104,61 @@ async def apple_login_callback(
     ############################
     # OAuth User check
     ############################
-    new_user_id = None
-
-    # 연동된 계정이 존재하지 않는다면, 신규 사용자 정보를 추가한다
-    if not await oauth_user_dal.exists_user(provider_id=provider_id, sub=user_info.id):
-        mobile, mobile_key = None, None
-        if user_info.mobile:
-            mobile = aes.encrypt(user_info.mobile)
-            mobile_key = Hasher.hmac_sha256(user_info.mobile)
-
-        email, email_key = None, None
-        if user_info.email:
-            email = aes.encrypt(user_info.email)
-            email_key = Hasher.hmac_sha256(user_info.email)
-
-        # 신규 사용자 정보를 생성한다
-        new_user = schemas.RegisterInsert(
-            name=user_info.name,
-            email=email,
-            email_key=email_key,
-            uuid=uuid.uuid4().bytes,
-            mobile=mobile,
-            mobile_key=mobile_key,
-            password=None,
-            provider_id=provider_id,
-            is_active=1,
-        )
-
-        try:
-            # 신규 사용자를 추가한다
-            result = await user_dal.insert_user(new_user=new_user)
-            new_user_id = result.inserted_primary_key[0]
-
-            # OAuth 사용자 정보를 추가한다
-            new_oauth_user = schemas.OAuthUserInsert(
-                user_id=new_user_id,
-                provider_id=provider_id,
-                sub=user_info.id,
-                name=user_info.name,
-                nickname=user_info.nickname,
-                profile_picture=user_info.profile_image,
-                given_name=given_name,
-                family_name=family_name,
-            )
-            await oauth_user_dal.insert_user(new_user=new_oauth_user)
+    mobile, mobile_key = None, None
+    if user_info.mobile:
+        mobile = aes.encrypt(user_info.mobile)
+        mobile_key = Hasher.hmac_sha256(user_info.mobile)
+
+    email, email_key = None, None
+    if user_info.email:
+        email = aes.encrypt(user_info.email)
+        email_key = Hasher.hmac_sha256(user_info.email)
+
+    # 연동된 계정이 존재하지 않을 때 추가할 신규 사용자 정보를 생성한다
+    new_user = schemas.RegisterInsert(
+        name=user_info.name,
+        email=email,
+        email_key=email_key,
+        uuid=uuid7().bytes,
+        mobile=mobile,
+        mobile_key=mobile_key,
+        password=None,
+        salt=None,
+        provider_id=provider_id,
+        is_active=1,
+    )
+    new_oauth_user = schemas.OAuthUserInsert(
+        provider_id=provider_id,
+        sub=user_info.id,
+        name=user_info.name,
+        nickname=user_info.nickname,
+        profile_picture=user_info.profile_image,
+        given_name=given_name,
+        family_name=family_name,
+    )
 
+    try:
+        # 연동된 계정이 있다면 사용자 정보를 조회하고, 없다면 신규 사용자와 OAuth 사용자 정보를 함께 추가한다
+        login_user, created = await oauth_user_dal.get_or_create(
+            new_user=new_user, new_oauth_user=new_oauth_user
+        )
+        if created:
             await session.commit()
-        except Exception as e:
-            logger.exception(e)
-            await session.rollback()
-            await session.close()
-
-            return ErrorJSONResponse(
-                message="회원가입을 처리하는 도중에 문제가 발생하였습니다",
-                success=False,
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                error_code=1500,
-            )
-
-    # 토큰을 생성하기 위해 사용자 정보를 불러온다
-    if new_user_id:
-        login_user = await user_dal.get_by_user_id(user_id=new_user_id)
-    else:
-        # 이미 추가된 사용자의 경우에는 oauth openid 정보로 사용자를 조회한다
-        login_user = await oauth_user_dal.get_user(
-            provider_id=provider_id, sub=user_info.id
+    except Exception as e:
+        logger.exception(e)
+        await session.rollback()
+        await session.close()
+
+        return ErrorJSONResponse(
+            message="회원가입을 처리하는 도중에 문제가 발생하였습니다",
+            success=False,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            error_code=1500,
         )
 
+    # 사용자 조회가 끝났으므로 토큰 생성/암호화 동안 연결을 pool에 반납한다
+    await release_connection(session)
+
     if not login_user:
         logger.info(
             f'사용자를 찾을 수 없습니다. { {"email": masking_str(user_info.email), "provider_id": provider_id} }'
@@ -197,35 +185,41 @@ async def apple_login_callback(
     # Create AccessToken
     ############################
     # JWT Token 쌍을 생성한다
-    new_token = await create_new_jwt_token(sub=binary_to_uuid(login_user.uuid))
+    jti = generate_jti()
+    new_token = await create_new_jwt_token(
+        sub=binary_to_uuid(login_user.uuid),
+        jti=jti,
+        generation=login_user.token_generation,
+    )
 
     # 생성한 RefreshToken을 DB에 저장하기 위한 스키마 생성
     new_refresh_token = schemas.TokenInsert(
         user_id=login_user.id,
         user_uuid=login_user.uuid,
+        jti=jti,
         access_token=new_token.access_token,
         refresh_token=aes.encrypt(new_token.refresh_token),
-        refresh_token_key=Hasher.hmac_sha256(new_token.refresh_token),
+        refresh_token_key=refresh_token_key(new_token.refresh_token),
         issued_at=datetime.fromtimestamp(int(new_token.iat)),
         expires_at=datetime.fromtimestamp(int(new_token.refresh_token_expires_in)),
+        token_generation=login_user.token_generation,
+        user_agent=request.headers.get("user-agent"),
     )
 
     try:
-        # Token 정보 저장
-        await token_dal.insert_token(new_token=new_refresh_token)
-
-        # Login 이력 저장
-        await user_login_dal.insert_login_history(
+        # Token 정보와 Login 이력 저장
+        await save_login(
+            session=session,
+            token_store=token_store,
+            new_token=new_refresh_token,
             login_history=schemas.LoginHistory(
                 user_id=login_user.id,
                 user_uuid=login_user.uuid,
                 login_time=datetime.now(),
                 login_success=True,
                 ip_address=request.client.host,
-            )
+            ),
         )
-
-        await session.commit()
     except Exception as e:
         logger.exception(e)
         await session.rollback()
@@ -0,0 +1,134 @@
+from fastapi import APIRouter, Depends, Query, status
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import crud
+import schemas
+from core.responses import ErrorJSONResponse
+from dependencies.auth import AuthorizeToken
+from dependencies.database import get_session
+from dependencies.token_store import get_token_store
+from utils.user_agent import parse_user_agent
+
+router = APIRouter(prefix="/auth/sessions", tags=["Session"])
+
+
+@router.get(
+    "",
+    response_model=schemas.SessionListResponse,
+    responses={
+        401: {"model": schemas.ErrorResponse},
+        500: {"model": schemas.ErrorResponse},
+    },
+)
+async def list_sessions(
+    *,
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=100),
+    user_token: schemas.AuthToken = Depends(AuthorizeToken()),
+    session: AsyncSession = Depends(get_session),
+    token_store: crud.TokenStore = Depends(get_token_store),
+):
+    """
+    Session List API
+
+    로그인되어 있는 세션(기기) 목록을 최신순으로 반환한다
+    - 다음 페이지는 응답의 next_cursor 값을 cursor로 전달하여 조회한다
+    """
+
+    try:
+        saved_tokens, next_cursor = await token_store.list_sessions(
+            user_uuid=str(user_token.sub),
+            min_generation=user_token.gen,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError:
+        logger.info(
+            f'잘못된 cursor 입니다. { {"user_id": user_token.sub, "cursor": cursor} }'
+        )
+        return ErrorJSONResponse(
+            message="잘못된 요청입니다",
+            success=False,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code=1400,
+        )
+    except Exception as e:
+        logger.exception(e)
+        return ErrorJSONResponse(
+            message="세션 목록을 조회하는 도중에 문제가 발생하였습니다",
+            success=False,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            error_code=1500,
+        )
+    finally:
+        await session.close()
+
+    sessions = []
+    for saved_token in saved_tokens:
+        device = parse_user_agent(saved_token.user_agent)
+        sessions.append(
+            schemas.SessionInfo(
+                id=saved_token.jti,
+                browser=device.browser,
+                os=device.os,
+                device=device.device,
+                issued_at=saved_token.issued_at,
+                expires_at=saved_token.expires_at,
+                last_active_at=saved_token.updated_at or saved_token.issued_at,
+                current=saved_token.jti == user_token.jti,
+            )
+        )
+
+    return schemas.SessionListResponse(
+        success=True, message="ok", sessions=sessions, next_cursor=next_cursor
+    )
+
+
+@router.post(
+    "/revoke",
+    response_model=schemas.SessionRevokeResponse,
+    responses={
+        401: {"model": schemas.ErrorResponse},
+        500: {"model": schemas.ErrorResponse},
+    },
+)
+async def revoke_sessions(
+    *,
+    revoke_request: schemas.SessionRevokeRequest,
+    user_token: schemas.AuthToken = Depends(AuthorizeToken()),
+    session: AsyncSession = Depends(get_session),
+    token_store: crud.TokenStore = Depends(get_token_store),
+):
+    """
+    Session Revoke API
+
+    선택한 세션(기기)들을 한 번에 로그아웃 시킨다
+    - 삭제된 세션의 refreshToken은 더 이상 사용할 수 없다
+    - accessToken은 만료시킬 수 없으므로 토큰의 남은 시간까지는 사용 가능하다
+    """
+
+    try:
+        revoked = await token_store.delete_sessions(
+            user_uuid=str(user_token.sub),
+            jtis=list(set(revoke_request.session_ids)),
+        )
+
+        await session.commit()
+    except Exception as e:
+        logger.exception(e)
+        await session.rollback()
+        return ErrorJSONResponse(
+            message="세션을 삭제하는 도중에 문제가 발생하였습니다",
+            success=False,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            error_code=1500,
+        )
+    finally:
+        await session.close()
+
+    logger.info(f'사용자 세션을 삭제하였습니다. { {"user_id": user_token.sub, "revoked": revoked} }')
+
+    return schemas.SessionRevokeResponse(
+        success=True, message="선택한 세션을 로그아웃 하였습니다", revoked=revoked
+    )
@@ -7,12 +7,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 import crud
 import schemas
-from core.exceptions import TokenExpiredException
+from core.exceptions import TokenCredentialsException, TokenExpiredException
 from core.responses import ErrorJSONResponse
-from dependencies.auth import AuthorizeRefreshToken, AuthorizeRefreshCookie
-from dependencies.database import get_session
-from utils.security.encryption import Hasher, AESCipher
-from utils.security.token import create_new_jwt_token
+from dependencies.auth import AuthorizeRefreshCookie, AuthorizeRefreshToken
+from dependencies.database import get_session, release_connection
+from dependencies.token_store import get_token_store
+from utils.security.encryption import AESCipher
+from utils.security.token import create_new_jwt_token, refresh_token_key
+from utils.strings import binary_to_uuid
 
 router = APIRouter(prefix="/token", tags=["Token"])
 
@@ -30,6 +32,7 @@ async def api_token_refresh(
     *,
     refresh_token: str = Depends(AuthorizeRefreshToken()),
     session: AsyncSession = Depends(get_session),
+    token_store: crud.TokenStore = Depends(get_token_store),
 ):
     """
     TokenRefresh API
@@ -39,11 +42,10 @@ async def api_token_refresh(
 
     aes = AESCipher()
     user_dal = crud.UserDAL(session=session)
-    token_dal = crud.TokenDAL(session=session)
 
     # 저장되어 있는 refreshToken을 조회한다
-    saved_token = await token_dal.get(
-        refresh_token_key=Hasher.hmac_sha256(refresh_token)
+    saved_token = await token_store.get(
+        refresh_token_key=refresh_token_key(refresh_token)
     )
     if not saved_token:
         return ErrorJSONResponse(
@@ -57,8 +59,19 @@ async def api_token_refresh(
         logger.info(f'토큰이 만료되었습니다 { {"user_id": saved_token.user_id} }')
         raise TokenExpiredException()
 
-    login_user = await user_dal.get_by_user_id(user_id=saved_token.user_id)
-    if not login_user:
+    # 토큰 조회 시 사용자 정보를 함께 가져오지 않는 저장소라면 사용자 정보를 따로 조회한다
+    if saved_token.user_exists is None:
+        login_user = await user_dal.get_login_user_by_id(user_id=saved_token.user_id)
+        saved_token.user_exists = login_user is not None
+        if login_user:
+            saved_token.user_is_active = bool(login_user.is_active)
+            saved_token.user_token_generation = login_user.token_generation
+
+    # 조회가 끝났으므로 토큰 생성/암호화 동안 연결을 pool에 반납한다
+    # 조회 이후에 변경된 토큰, 사용자 상태는 touch의 조건으로 다시 확인한다
+    await release_connection(session)
+
+    if not saved_token.user_exists:
         logger.info(f'사용자를 찾을 수 없습니다. { {"user_id": saved_token.user_id} }')
         return ErrorJSONResponse(
             message="사용자를 찾을 수 없습니다",
@@ -66,15 +79,33 @@ async def api_token_refresh(
             status_code=status.HTTP_404_NOT_FOUND,
             error_code=1404,
         )
+
+    if not saved_token.user_is_active:
+        logger.info(f'사용할 수 없는 아이디 입니다. { {"user_id": saved_token.user_id} }')
+        return ErrorJSONResponse(
+            message="사용할 수 없는 아이디 입니다",
+            success=False,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code=1400,
+        )
+
+    # 전체 로그아웃 이전에 발급된 refreshToken은 사용할 수 없다
+    if saved_token.token_generation < saved_token.user_token_generation:
+        logger.info(f'폐기된 토큰입니다. { {"user_id": saved_token.user_id} }')
+        raise TokenCredentialsException()
+
     # 신규 accessToken을 생성한다
     # refreshToken 값은 갱신하지 않고, 만료 날짜만 늘린다
     new_token: schemas.JWTToken = await create_new_jwt_token(
-        sub=str(saved_token.user_id)
+        sub=binary_to_uuid(saved_token.user_uuid),
+        jti=saved_token.jti,
+        generation=saved_token.user_token_generation,
     )
     new_token.refresh_token = aes.decrypt(saved_token.refresh_token)
 
     update_token = schemas.TokenUpdate(
         user_id=saved_token.user_id,
+        jti=saved_token.jti,
         access_token=new_token.access_token,
         refresh_token=saved_token.refresh_token,
         refresh_token_key=saved_token.refresh_token_key,
@@ -82,7 +113,8 @@ async def api_token_refresh(
     )
 
     try:
-        await token_dal.update(update_token=update_token)
+        # 조회 이후에 만료, 비활성화 또는 전체 로그아웃 되었다면 연장되지 않는다
+        touched = await token_store.touch(update_token=update_token)
 
         await session.commit()
     except Exception as e:
@@ -97,6 +129,10 @@ async def api_token_refresh(
     finally:
         await session.close()
 
+    if not touched:
+        logger.info(f'토큰을 갱신할 수 없습니다. { {"user_id": saved_token.user_id} }')
+        raise TokenExpiredException()
+
     logger.info(f'토큰을 갱신하였습니다. { {"user_id": saved_token.user_id} }')
 
     response = schemas.JWTToken(**new_token.model_dump())
@@ -117,6 +153,7 @@ async def web_token_refresh(
     *,
     refresh_token: str = Depends(AuthorizeRefreshCookie()),
     session: AsyncSession = Depends(get_session),
+    token_store: crud.TokenStore = Depends(get_token_store),
 ):
     """
     TokenRefresh API
@@ -126,11 +163,10 @@ async def web_token_refresh(
 
     aes = AESCipher()
     user_dal = crud.UserDAL(session=session)
-    token_dal = crud.TokenDAL(session=session)
 
     # 저장되어 있는 refreshToken을 조회한다
-    saved_token = await token_dal.get(
-        refresh_token_key=Hasher.hmac_sha256(refresh_token)
+    saved_token = await token_store.get(
+        refresh_token_key=refresh_token_key(refresh_token)
     )
     if not saved_token:
         return ErrorJSONResponse(
@@ -144,8 +180,19 @@ async def web_token_refresh(
         logger.info(f'토큰이 만료되었습니다 { {"user_id": saved_token.user_id} }')
         raise TokenExpiredException()
 
-    login_user = await user_dal.get_by_user_id(user_id=saved_token.user_id)
-    if not login_user:
+    # 토큰 조회 시 사용자 정보를 함께 가져오지 않는 저장소라면 사용자 정보를 따로 조회한다
+    if saved_token.user_exists is None:
+        login_user = await user_dal.get_login_user_by_id(user_id=saved_token.user_id)
+        saved_token.user_exists = login_user is not None
+        if login_user:
+            saved_token.user_is_active = bool(login_user.is_active)
+            saved_token.user_token_generation = login_user.token_generation
+
+    # 조회가 끝났으므로 토큰 생성/암호화 동안 연결을 pool에 반납한다
+    # 조회 이후에 변경된 토큰, 사용자 상태는 touch의 조건으로 다시 확인한다
+    await release_connection(session)
+
+    if not saved_token.user_exists:
         logger.info(f'사용자를 찾을 수 없습니다. { {"user_id": saved_token.user_id} }')
         return ErrorJSONResponse(
             message="사용자를 찾을 수 없습니다",
@@ -153,15 +200,33 @@ async def web_token_refresh(
             status_code=status.HTTP_404_NOT_FOUND,
             error_code=1404,
         )
+
+    if not saved_token.user_is_active:
+        logger.info(f'사용할 수 없는 아이디 입니다. { {"user_id": saved_token.user_id} }')
+        return ErrorJSONResponse(
+            message="사용할 수 없는 아이디 입니다",
+            success=False,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code=1400,
+        )
+
+    # 전체 로그아웃 이전에 발급된 refreshToken은 사용할 수 없다
+    if saved_token.token_generation < saved_token.user_token_generation:
+        logger.info(f'폐기된 토큰입니다. { {"user_id": saved_token.user_id} }')
+        raise TokenCredentialsException()
+
     # 신규 accessToken을 생성한다
     # refreshToken 값은 갱신하지 않고, 만료 날짜만 늘린다
     new_token: schemas.JWTToken = await create_new_jwt_token(
-        sub=str(saved_token.user_id)
+        sub=binary_to_uuid(saved_token.user_uuid),
+        jti=saved_token.jti,
+        generation=saved_token.user_token_generation,
     )
     new_token.refresh_token = aes.decrypt(saved_token.refresh_token)
 
     update_token = schemas.TokenUpdate(
         user_id=saved_token.user_id,
+        jti=saved_token.jti,
         access_token=new_token.access_token,
         refresh_token=saved_token.refresh_token,
         refresh_token_key=saved_token.refresh_token_key,
@@ -169,7 +234,8 @@ async def web_token_refresh(
     )
 
     try:
-        await token_dal.update(update_token=update_token)
+        # 조회 이후에 만료, 비활성화 또는 전체 로그아웃 되었다면 연장되지 않는다
+        touched = await token_store.touch(update_token=update_token)
 
         await session.commit()
     except Exception as e:
@@ -184,6 +250,10 @@ async def web_token_refresh(
     finally:
         await session.close()
 
+    if not touched:
+        logger.info(f'토큰을 갱신할 수 없습니다. { {"user_id": saved_token.user_id} }')
+        raise TokenExpiredException()
+
     logger.info(f'토큰을 갱신하였습니다. { {"user_id": saved_token.user_id} }')
 
     token_response = schemas.TokenAccessOnly(**new_token.model_dump())
@@ -1,14 +1,25 @@
 import os
 
-from fastapi import FastAPI, status, Request
+from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 from starlette.staticfiles import StaticFiles
 
+from app.api import auth, history, internal, oauth, session, token
+from app.middlewares import ConnectionHoldMiddleware
+from app.tasks.email_filter_sync import email_filter_sync
+from app.tasks.history_archiver import history_archiver
+from app.tasks.replica_monitor import replica_monitor
+from app.tasks.token_reaper import token_reaper
+from core.config import settings
 from core.exceptions import TokenCredentialsException, TokenExpiredException
+from core.invalidation import invalidation_bus
 from core.responses import DefaultJSONResponse, ErrorJSONResponse
-from app.api import auth, token, oauth
+from crud.history_recorder import history_recorder
+from crud.login_writer import login_writer
+from dependencies.token_store import TokenStoreProvider
+from utils.security.lockout import login_lockout
 
 
 def create_app() -> FastAPI:
@@ -30,6 +41,7 @@ def create_app() -> FastAPI:
     set_routes(app)
     set_middlewares(app)
     set_custom_exception(app)
+    set_events(app)
 
     return app
 
@@ -47,10 +59,13 @@ def set_routes(app: FastAPI) -> None:
 
     app.include_router(router=auth.router)
     app.include_router(router=token.router)
+    app.include_router(router=session.router)
+    app.include_router(router=history.router)
     app.include_router(router=oauth.google.router, prefix="/oauth")
     app.include_router(router=oauth.naver.router, prefix="/oauth")
     app.include_router(router=oauth.kakao.router, prefix="/oauth")
     app.include_router(router=oauth.apple.router, prefix="/oauth")
+    app.include_router(router=internal.router)
 
 
 def set_middlewares(app: FastAPI) -> None:
@@ -66,6 +81,38 @@ def set_middlewares(app: FastAPI) -> None:
         allow_headers=["*"],
         expose_headers=["Content-Disposition"],
     )
+    app.add_middleware(ConnectionHoldMiddleware)
+
+
+def set_events(app: FastAPI) -> None:
+    """Startup / Shutdown Events Initializing"""
+
+    async def startup():
+        await invalidation_bus.start()
+        replica_monitor.start()
+        token_reaper.start()
+        email_filter_sync.start()
+        if history_recorder is not None:
+            history_recorder.start()
+        if settings.login_history_archive_enabled:
+            history_archiver.start()
+
+    async def shutdown():
+        if login_writer is not None:
+            await login_writer.close()
+        if history_recorder is not None:
+            await history_recorder.stop()
+        await history_archiver.stop()
+        await email_filter_sync.stop()
+        await token_reaper.stop()
+        await replica_monitor.stop()
+        await TokenStoreProvider.close()
+        if login_lockout is not None:
+            await login_lockout.close()
+        await invalidation_bus.close()
+
+    app.add_event_handler("startup", startup)
+    app.add_event_handler("shutdown", shutdown)
 
 
 def set_custom_exception(app: FastAPI) -> None:
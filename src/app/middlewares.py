@@ -0,0 +1,22 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from db.pool_metrics import track_request_hold
+
+
+class ConnectionHoldMiddleware:
+    """
+    요청마다 DB 연결을 사용한 시간과 횟수를 Metric으로 기록한다
+
+    응답을 보낸 이후에 정리되는 의존성(get_session)의 연결 반납까지 포함하도록 ASGI middleware로 구현한다
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_request_hold():
+            await self.app(scope, receive, send)
@@ -0,0 +1,152 @@
+import asyncio
+import time
+
+from loguru import logger
+
+import crud
+from core.config import settings
+from core.metrics import metrics
+from db.base import async_session
+from utils.bloom import ScalableBloomFilter
+from utils.constants.oauth import ProviderID
+from utils.security.email_filter import RegisteredEmailFilter, registered_email_filter
+
+email_filter_items = metrics.gauge("email_filter_items", "Bloom filter에 저장된 이메일 수")
+email_filter_bytes = metrics.gauge("email_filter_bytes", "Bloom filter의 메모리 사용량(byte)")
+email_filter_build_seconds = metrics.histogram(
+    "email_filter_build_seconds",
+    "Bloom filter를 새로 만드는 데 걸린 시간(초)",
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+
+# auto_increment id는 commit 순서와 다를 수 있으므로, 동기화할 때 마지막 id 이전의 사용자도 다시 조회한다
+_SYNC_OVERLAP_IDS = 1000
+
+
+class EmailFilterSync:
+    """
+    가입된 이메일 Bloom filter를 만들고 DB와 동기화하는 백그라운드 작업
+
+    - 시작 시 user 테이블을 id 순서로 나누어 조회하여 filter를 만든다
+    - sync_interval 마다 마지막으로 동기화한 id 이후에 가입한 사용자를 추가한다
+    - rebuild_interval 마다 filter를 새로 만들어 삭제된 사용자를 반영한다
+    """
+
+    def __init__(
+        self,
+        email_filter: RegisteredEmailFilter,
+        sync_interval: int,
+        rebuild_interval: int,
+        batch_size: int,
+    ):
+        self._filter = email_filter
+        self._sync_interval = sync_interval
+        self._rebuild_interval = rebuild_interval
+        self._batch_size = batch_size
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._filter.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _load(self, after_id: int, on_batch) -> int:
+        """
+        after_id 이후에 가입한 사용자의 email_key를 batch_size 만큼씩 나누어 조회한다
+
+        :return: 마지막으로 조회한 사용자 id
+        """
+
+        while True:
+            async with async_session() as session:
+                user_dal = crud.UserDAL(session=session)
+
+                rows = await user_dal.get_email_keys(
+                    provider_id=ProviderID.LOCAL.name,
+                    after_id=after_id,
+                    limit=self._batch_size,
+                )
+
+            if rows:
+                on_batch([row.email_key for row in rows])
+                after_id = rows[-1].id
+
+            if len(rows) < self._batch_size:
+                return after_id
+
+    async def build(self) -> None:
+        started = time.perf_counter()
+
+        new_filter = ScalableBloomFilter(
+            initial_capacity=max(100_000, int(self._filter.count * 1.25)),
+            error_rate=self._filter.error_rate,
+        )
+
+        def add_all(email_keys: list[str]) -> None:
+            for email_key in email_keys:
+                new_filter.add(email_key)
+
+        # 조회가 끝난 후 교체하기 전에 가입한 이메일도 새 filter에 추가되도록 먼저 등록한다
+        self._filter.begin_build(new_filter)
+        try:
+            synced_id = await self._load(after_id=0, on_batch=add_all)
+            self._filter.replace(new_filter, synced_id=synced_id)
+        finally:
+            self._filter.end_build()
+
+        elapsed = time.perf_counter() - started
+        email_filter_build_seconds.observe(elapsed)
+        self._update_metrics()
+
+        logger.info(
+            f"이메일 Bloom filter를 생성하였습니다. { {'items': self._filter.count, 'bytes': self._filter.size_bytes, 'seconds': round(elapsed, 3)} }"
+        )
+
+    async def sync(self) -> None:
+        after_id = max(0, self._filter.synced_id - _SYNC_OVERLAP_IDS)
+
+        email_keys: list[str] = []
+        synced_id = await self._load(after_id=after_id, on_batch=email_keys.extend)
+        self._filter.extend(email_keys, synced_id=synced_id)
+
+        self._update_metrics()
+
+    def _update_metrics(self) -> None:
+        email_filter_items.set(self._filter.count)
+        email_filter_bytes.set(self._filter.size_bytes)
+
+    async def _run(self) -> None:
+        built_at: float | None = None
+
+        while True:
+            try:
+                if (
+                    built_at is None
+                    or time.monotonic() - built_at >= self._rebuild_interval
+                ):
+                    await self.build()
+                    built_at = time.monotonic()
+                else:
+                    await self.sync()
+            except Exception as e:
+                logger.exception(e)
+
+            await asyncio.sleep(self._sync_interval)
+
+
+email_filter_sync = EmailFilterSync(
+    email_filter=registered_email_filter,
+    sync_interval=settings.email_filter_sync_seconds,
+    rebuild_interval=settings.email_filter_rebuild_seconds,
+    batch_size=settings.email_filter_batch_size,
+)
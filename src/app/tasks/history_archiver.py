@@ -0,0 +1,323 @@
+import asyncio
+import fcntl
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+import crud
+from core.config import settings
+from core.metrics import metrics
+from db.base import async_session
+from db.history_archive import ARCHIVE_TABLE, ArchiveWriter, archive_path
+from db.partition import (
+    add_partitions,
+    drop_partition,
+    list_partitions,
+    lock_table,
+    month_start,
+    next_month,
+    partition_name,
+)
+from db.shard import shard_sessions
+
+archived_rows = metrics.counter(
+    "login_history_archived_total", "파일로 보관한 후 DB에서 삭제한 로그인 이력 수"
+)
+archive_skips = metrics.counter(
+    "login_history_archive_skips_total", "보관하는 동안 이력이 추가되어 삭제하지 않은 월(partition) 수"
+)
+
+
+class LoginHistoryArchiver:
+    """
+    보관 기간(retention_days)이 지난 로그인 이력을 월 단위 JSONL.gz 파일로 보관하고 DB에서 삭제하는 백그라운드 작업
+
+    - MySQL partition 테이블(login_time 월 단위 RANGE COLUMNS)이라면 partition을 파일로 보관한 후
+      DROP PARTITION으로 삭제한다
+    - 앞으로 사용할 partition(months_ahead 개월)도 미리 추가한다
+    - partition 테이블이 아니라면(SQLite, PostgreSQL, migration 적용 전) 가장 오래된 월부터 보관한 후 id 구간별로
+      DELETE 한다
+    - 이력은 id 순서로 batch_size 만큼씩 나누어 조회(keyset)하므로, 월의 이력 수와 관계없이 메모리 사용량이 일정하다
+    - 파일을 디스크에 기록(fsync)한 이후에 삭제하며, 보관하는 동안 이력이 추가되었다면 삭제하지 않고 다음 실행에서 다시 보관한다
+    - partition은 테이블 쓰기 lock(LOCK TABLES)을 잡은 상태에서 이력 수를 확인하고 삭제하여, 확인 이후에 추가된 이력이
+      보관되지 않고 삭제되지 않도록 한다
+    - 여러 worker/node에서 동시에 실행하지 않도록 MySQL은 GET_LOCK()을, 그 외에는 archive_dir의 파일 lock을 사용한다
+    - shard를 사용한다면 각 shard에서 실행한다
+    """
+
+    def __init__(
+        self,
+        interval: int,
+        retention_days: int,
+        archive_dir: str,
+        batch_size: int,
+        months_ahead: int,
+    ):
+        self._interval = interval
+        self._retention_days = retention_days
+        self._archive_dir = archive_dir
+        self._batch_size = batch_size
+        self._months_ahead = months_ahead
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def _targets(self) -> list[tuple[str, sessionmaker]]:
+        if not shard_sessions:
+            return [("primary", async_session)]
+
+        return [
+            (f"shard{shard_id}", factory)
+            for shard_id, factory in enumerate(shard_sessions)
+        ]
+
+    async def archive(self) -> int:
+        """
+        모든 DB(Primary 또는 shard)에서 보관 기간이 지난 이력을 보관하고 삭제한다
+
+        :return: 보관 후 삭제한 이력 수
+        """
+
+        cutoff = month_start(datetime.now() - timedelta(days=self._retention_days))
+
+        total = 0
+        for name, session_factory in self._targets():
+            async with self._lock(name, session_factory) as acquired:
+                if not acquired:
+                    continue
+
+                total += await self._archive_db(name, session_factory, cutoff)
+
+        return total
+
+    @asynccontextmanager
+    async def _lock(self, name: str, session_factory: sessionmaker):
+        lock_name = f"{ARCHIVE_TABLE}_archive"
+
+        async with session_factory() as session:
+            if session.get_bind().dialect.name == "mysql":
+                # GET_LOCK은 연결에 유지되므로, 작업이 끝날 때까지 이 Session의 연결을 사용한다
+                acquired = await session.scalar(
+                    text("SELECT GET_LOCK(:name, 0)"), {"name": lock_name}
+                )
+                try:
+                    yield bool(acquired)
+                finally:
+                    if acquired:
+                        await session.execute(
+                            text("SELECT RELEASE_LOCK(:name)"), {"name": lock_name}
+                        )
+                return
+
+        os.makedirs(self._archive_dir, exist_ok=True)
+        with open(os.path.join(self._archive_dir, f".{name}.lock"), "w") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    async def _archive_db(
+        self, name: str, session_factory: sessionmaker, cutoff: datetime
+    ) -> int:
+        async with session_factory() as session:
+            partitions = await list_partitions(session, ARCHIVE_TABLE)
+            if partitions:
+                until = month_start(datetime.now())
+                for _ in range(self._months_ahead):
+                    until = next_month(until)
+
+                added = await add_partitions(
+                    session, ARCHIVE_TABLE, partitions, until=until
+                )
+                if added:
+                    logger.info(
+                        f"로그인 이력 partition을 추가하였습니다. { {'db': name, 'partitions': added} }"
+                    )
+
+        if partitions:
+            return await self._archive_partitions(
+                name, session_factory, partitions, cutoff
+            )
+
+        return await self._archive_months(name, session_factory, cutoff)
+
+    async def _archive_partitions(
+        self,
+        name: str,
+        session_factory: sessionmaker,
+        partitions: list[tuple[str, datetime | None]],
+        cutoff: datetime,
+    ) -> int:
+        total = 0
+        start = None
+        for partition, bound in partitions:
+            if bound is None or bound > cutoff:
+                break
+
+            archived, _ = await self._archive_range(
+                name, session_factory, partition, start, bound
+            )
+
+            async with session_factory() as session:
+                # 확인한 이후 삭제하기 전에 이력이 추가되지 않도록 테이블 쓰기 lock을 잡고 확인과 삭제를 실행한다
+                # lock을 잡은 동안에는 다른 연결의 로그인 이력 INSERT가 대기한다
+                async with lock_table(session, ARCHIVE_TABLE):
+                    count = await crud.UserLoginHistoryDAL(
+                        session=session
+                    ).count_histories(start, bound)
+
+                    # 보관하는 동안 이 구간에 이력이 추가되었다면(spill 파일의 이력 등) 다음 실행에서 다시 보관한다
+                    if count == archived:
+                        await drop_partition(session, ARCHIVE_TABLE, partition)
+
+            if count != archived:
+                archive_skips.inc()
+                start = bound
+                continue
+
+            logger.info(
+                f"로그인 이력 partition을 보관하고 삭제하였습니다. { {'db': name, 'partition': partition, 'rows': archived} }"
+            )
+            archived_rows.inc(archived)
+            total += archived
+            # 삭제한 partition 이전의 값은 다음 partition에 저장되므로 구간의 시작이 없어진다
+            start = None
+
+        return total
+
+    async def _archive_months(
+        self, name: str, session_factory: sessionmaker, cutoff: datetime
+    ) -> int:
+        total = 0
+        while True:
+            async with session_factory() as session:
+                oldest = await crud.UserLoginHistoryDAL(
+                    session=session
+                ).get_oldest_login_time()
+            if oldest is None or oldest >= cutoff:
+                return total
+
+            end = next_month(oldest)
+            label = partition_name(end)
+            # 삭제한 이후에 추가된 이력을 다시 보관할 때 기존 파일을 덮어쓰지 않는다
+            suffix = 0
+            while os.path.exists(archive_path(self._archive_dir, name, label)):
+                suffix += 1
+                label = f"{partition_name(end)}.{suffix}"
+
+            archived, id_ranges = await self._archive_range(
+                name, session_factory, label, None, end
+            )
+
+            async with session_factory() as session:
+                history_dal = crud.UserLoginHistoryDAL(session=session)
+                if await history_dal.count_histories(None, end) != archived:
+                    archive_skips.inc()
+                    return total
+
+            # 한 번에 많은 행을 삭제하지 않도록 조회한 batch 단위로 나누어 삭제한다
+            for first_id, last_id in id_ranges:
+                async with session_factory() as session:
+                    await crud.UserLoginHistoryDAL(session=session).delete_histories(
+                        None, end, first_id, last_id
+                    )
+                    await session.commit()
+
+            logger.info(
+                f"로그인 이력을 보관하고 삭제하였습니다. { {'db': name, 'month': label, 'rows': archived} }"
+            )
+            archived_rows.inc(archived)
+            total += archived
+
+    async def _archive_range(
+        self,
+        name: str,
+        session_factory: sessionmaker,
+        label: str,
+        start: datetime | None,
+        end: datetime,
+    ) -> tuple[int, list[tuple[int, int]]]:
+        """
+        login_time이 [start, end) 구간인 이력을 보관 파일에 기록한다, 이력이 없다면 파일을 만들지 않는다
+
+        :return: 기록한 이력 수, 조회한 batch별 (첫 번째 id, 마지막 id) 목록
+        """
+
+        writer = await asyncio.to_thread(
+            ArchiveWriter, archive_path(self._archive_dir, name, label)
+        )
+
+        archived = 0
+        id_ranges = []
+        after_id = 0
+        try:
+            while True:
+                # batch마다 Session을 새로 만들어 긴 트랜잭션(snapshot)을 유지하지 않는다
+                async with session_factory() as session:
+                    rows = await crud.UserLoginHistoryDAL(
+                        session=session
+                    ).get_histories_for_archive(
+                        start, end, after_id=after_id, limit=self._batch_size
+                    )
+                if not rows:
+                    break
+
+                await asyncio.to_thread(writer.write, rows)
+                id_ranges.append((rows[0].id, rows[-1].id))
+                after_id = rows[-1].id
+                archived += len(rows)
+        except BaseException:
+            await asyncio.to_thread(writer.abort)
+            raise
+
+        if archived:
+            await asyncio.to_thread(writer.commit)
+        else:
+            await asyncio.to_thread(writer.abort)
+
+        return archived, id_ranges
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                archived = await self.archive()
+                if archived:
+                    logger.info(
+                        f"보관 기간이 지난 로그인 이력을 보관하였습니다. { {'archived': archived} }"
+                    )
+            except Exception as e:
+                logger.exception(f"로그인 이력 보관에 실패하였습니다. { {'error': repr(e)} }")
+
+            await asyncio.sleep(self._interval)
+
+
+history_archiver = LoginHistoryArchiver(
+    interval=settings.login_history_archive_interval_seconds,
+    retention_days=settings.login_history_retention_days,
+    archive_dir=settings.login_history_archive_dir,
+    batch_size=settings.login_history_archive_batch_size,
+    months_ahead=settings.login_history_partition_months_ahead,
+)
@@ -0,0 +1,121 @@
+import asyncio
+
+from loguru import logger
+from sqlalchemy import text
+
+from core.config import settings
+from core.metrics import metrics
+from db.base import ReplicaStatus, replica_engine
+
+replica_lag = metrics.gauge(
+    "db_replica_lag_seconds", "Replica 복제 지연 시간(초), 확인할 수 없다면 -1"
+)
+replica_available = metrics.gauge(
+    "db_replica_available", "Replica 사용 가능 여부(1: 사용, 0: 미사용)"
+)
+
+
+class ReplicaMonitor:
+    """
+    Replica의 복제 지연 시간을 주기적으로 확인하는 백그라운드 작업
+
+    복제 지연이 max_lag 초를 넘거나, 복제가 중지되었거나, Replica에 연결할 수 없다면
+    ReplicaStatus.available을 False로 변경하여 조회 쿼리를 Primary에서 실행하도록 한다
+    """
+
+    def __init__(self, interval: int, max_lag: int):
+        self._interval = interval
+        self._max_lag = max_lag
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if replica_engine is not None and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def check(self) -> float | None:
+        """
+        Replica의 복제 지연 시간(초)을 조회한다
+
+        :return: 복제 지연 시간을 반환하고, 복제가 중지되었다면 None을 반환한다
+        """
+
+        async with replica_engine.connect() as conn:
+            if conn.dialect.name == "postgresql":
+                return await self._check_postgresql(conn)
+
+            try:
+                # MySQL 8.0.22 이상
+                result = await conn.execute(text("SHOW REPLICA STATUS"))
+                column = "Seconds_Behind_Source"
+            except Exception:
+                result = await conn.execute(text("SHOW SLAVE STATUS"))
+                column = "Seconds_Behind_Master"
+
+            row = result.mappings().first()
+
+        if row is None:
+            return None
+
+        lag = row.get(column)
+        return float(lag) if lag is not None else None
+
+    @staticmethod
+    async def _check_postgresql(conn) -> float | None:
+        """
+        PostgreSQL Standby의 마지막 트랜잭션 반영 시각으로 복제 지연 시간(초)을 조회한다
+
+        Primary에 쓰기가 없는 동안에는 지연 시간이 계속 늘어나므로, max_lag는 쓰기 주기보다 크게 설정한다
+        """
+
+        result = await conn.execute(
+            text(
+                "SELECT pg_is_in_recovery(), "
+                "EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())"
+            )
+        )
+        in_recovery, lag = result.first()
+
+        if not in_recovery or lag is None:
+            return None
+
+        return max(float(lag), 0.0)
+
+    async def _update(self) -> None:
+        try:
+            lag = await self.check()
+        except Exception as e:
+            logger.warning(f"Replica 상태를 확인할 수 없습니다. { {'error': str(e)} }")
+            lag = None
+
+        available = lag is not None and lag <= self._max_lag
+        if available != ReplicaStatus.available:
+            logger.info(
+                f"Replica 사용 여부를 변경합니다. { {'available': available, 'lag_seconds': lag} }"
+            )
+
+        ReplicaStatus.available = available
+        ReplicaStatus.lag_seconds = lag
+        replica_lag.set(lag if lag is not None else -1)
+        replica_available.set(int(available))
+
+    async def _run(self) -> None:
+        while True:
+            await self._update()
+            await asyncio.sleep(self._interval)
+
+
+replica_monitor = ReplicaMonitor(
+    interval=settings.db_replica_lag_check_interval_seconds,
+    max_lag=settings.db_replica_max_lag_seconds,
+)
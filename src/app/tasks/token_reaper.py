@@ -0,0 +1,89 @@
+import asyncio
+
+from loguru import logger
+
+import crud
+from core.config import settings
+from db.base import async_session
+from db.shard import shard_sessions
+
+
+class TokenReaper:
+    """
+    만료되었거나 폐기된 토큰 정보를 주기적으로 삭제하는 백그라운드 작업
+
+    전체 로그아웃은 사용자의 토큰 세대만 증가시키므로, 남아있는 jwt_token 데이터는 이 작업에서 정리한다
+    만료된 토큰과 폐기된 토큰은 각각의 인덱스를 사용하도록 나누어 삭제한다
+    shard를 사용한다면 shard에는 users 테이블이 없으므로 각 shard에서 만료된 토큰만 삭제한다
+    """
+
+    def __init__(self, interval: int, batch_size: int):
+        self._interval = interval
+        self._batch_size = batch_size
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def reap(self) -> int:
+        """
+        삭제할 토큰이 없을 때까지 batch_size 만큼씩 나누어 삭제한다
+
+        :return: 삭제된 토큰 수
+        """
+
+        if not shard_sessions:
+            total = await self._reap(async_session, crud.TokenDAL.delete_expired)
+            total += await self._reap(
+                async_session, crud.TokenDAL.delete_stale_generation
+            )
+            return total
+
+        total = 0
+        for session_factory in shard_sessions:
+            total += await self._reap(session_factory, crud.TokenDAL.delete_expired)
+
+        return total
+
+    async def _reap(self, session_factory, delete_func) -> int:
+        total = 0
+
+        while True:
+            async with session_factory() as session:
+                token_dal = crud.TokenDAL(session=session)
+
+                deleted = await delete_func(token_dal, limit=self._batch_size)
+                await session.commit()
+
+            total += deleted
+            if deleted < self._batch_size:
+                return total
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+
+            try:
+                deleted = await self.reap()
+                if deleted:
+                    logger.info(f"만료된 토큰을 삭제하였습니다. { {'deleted': deleted} }")
+            except Exception as e:
+                logger.exception(e)
+
+
+token_reaper = TokenReaper(
+    interval=settings.token_reaper_interval_seconds,
+    batch_size=settings.token_reaper_batch_size,
+)
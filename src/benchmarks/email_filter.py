@@ -0,0 +1,53 @@
+"""
+가입된 이메일 Bloom filter 생성 시간, 메모리 사용량, 오탐률 측정
+
+DB 조회 시간은 포함되지 않으며, email_key와 같은 형식(HMAC-SHA256 hex)의 임의 값을 사용한다
+
+실행 방법(src 디렉토리에서 실행한다)
+    $ python -m benchmarks.email_filter --users 1000000 --error-rate 0.001
+"""
+import argparse
+import os
+import time
+
+from utils.bloom import ScalableBloomFilter
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--error-rate", type=float, default=0.001)
+    parser.add_argument("--initial-capacity", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    args = parser.parse_args()
+
+    email_keys = [os.urandom(32).hex() for _ in range(args.users)]
+
+    for initial_capacity in (args.initial_capacity, int(args.users * 1.25)):
+        bloom = ScalableBloomFilter(
+            initial_capacity=initial_capacity, error_rate=args.error_rate
+        )
+
+        started = time.perf_counter()
+        for email_key in email_keys:
+            bloom.add(email_key)
+        elapsed = time.perf_counter() - started
+
+        misses = [os.urandom(32).hex() for _ in range(args.lookups)]
+        started = time.perf_counter()
+        false_positives = sum(1 for k in misses if k in bloom)
+        lookup_elapsed = time.perf_counter() - started
+
+        per_million = 1_000_000 / args.users
+        print(
+            f"initial_capacity={initial_capacity:>9} users={args.users} "
+            f"build={elapsed:.2f}s ({elapsed * per_million:.2f}s/1M) "
+            f"memory={bloom.size_bytes / 1024 / 1024:.2f}MiB "
+            f"({bloom.size_bytes * per_million / 1024 / 1024:.2f}MiB/1M) "
+            f"lookup={lookup_elapsed / args.lookups * 1_000_000:.2f}µs "
+            f"false_positive={false_positives / args.lookups:.5f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+로그인 분석 집계(LoginAggregates) 처리량: 로그인 이력 column 배열을 batch 단위로 반영하는 데 걸리는 시간
+
+- DB 조회와 행 -> 배열 변환(to_columns)은 제외하고, NumPy 집계만 측정한다(to_columns는 --convert-rows 행으로 따로
+  측정한다)
+- --users 명의 사용자가 --days 일 동안 평소 시간대(사용자별 평균 시간 ± 2시간)에 로그인하며, 0.1%는 임의의 시간에 로그인한다
+- numpy를 별도로 설치해야 실행할 수 있다
+
+실행 방법(src 디렉토리에서 실행한다)
+    $ python -m benchmarks.login_analytics --rows 20000000 --batch-size 100000
+"""
+import argparse
+import time
+from datetime import datetime
+
+import numpy as np
+
+from crud.history_analytics import LoginAggregates, to_columns
+
+
+def generate(rng, first_id: int, size: int, users: int, days: int, start: int) -> tuple:
+    ids = np.arange(first_id, first_id + size, dtype=np.int64)
+    user_ids = rng.integers(1, users + 1, size=size, dtype=np.int64)
+
+    # 사용자별 평소 시간대(user_id로 정한다)에 로그인하고, 일부는 임의의 시간에 로그인한다
+    hours = (user_ids * 7 % 24 + rng.integers(-2, 3, size=size)) % 24
+    unusual = rng.random(size) < 0.001
+    hours[unusual] = rng.integers(0, 24, size=int(unusual.sum()))
+
+    seconds = (
+        start
+        + rng.integers(0, days, size=size) * 86400
+        + hours * 3600
+        + rng.integers(0, 3600, size=size)
+    )
+    success = rng.random(size) < 0.9
+
+    return ids, user_ids, seconds, success
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20_000_000)
+    parser.add_argument("--batch-size", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--convert-rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    start = int(datetime(2026, 1, 1).timestamp())
+    aggregates = LoginAggregates(min_logins=10, top_k=1000)
+
+    elapsed = 0.0
+    for offset in range(0, args.rows, args.batch_size):
+        batch = generate(
+            rng,
+            offset + 1,
+            min(args.batch_size, args.rows - offset),
+            args.users,
+            args.days,
+            start,
+        )
+
+        started = time.perf_counter()
+        aggregates.update(*batch)
+        elapsed += time.perf_counter() - started
+
+    started = time.perf_counter()
+    aggregates.compact()
+    compact = time.perf_counter() - started
+
+    started = time.perf_counter()
+    snapshot = aggregates.snapshot(hours=24 * 7, top=20)
+    snapshot_seconds = time.perf_counter() - started
+
+    print(
+        f"rows={args.rows:,} batch_size={args.batch_size:,} "
+        f"users={args.users:,} days={args.days}"
+    )
+    print(f"update   {elapsed:>7.2f} s {args.rows / elapsed:>12,.0f} rows/s")
+    print(
+        f"compact  {compact:>7.2f} s "
+        f"(active user-days {snapshot['active_days']['users']:,} users)"
+    )
+    print(f"snapshot {snapshot_seconds:>7.2f} s")
+
+    # DB에서 읽은 행(tuple, login_time은 초)을 column 배열로 변환하는 비용
+    rows = [
+        (i, i % args.users + 1, start + i, i % 10 != 0)
+        for i in range(args.convert_rows)
+    ]
+    started = time.perf_counter()
+    to_columns(rows)
+    convert = time.perf_counter() - started
+    print(
+        f"convert  {convert:>7.2f} s "
+        f"{args.convert_rows / convert:>12,.0f} rows/s (to_columns)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+DAL 쿼리: 요청마다 생성(build) vs 미리 만든 쿼리와 bind parameter(prebuilt) 비교
+
+- prepare: 쿼리 객체 생성과 compile cache key 계산 시간으로, DB와 관계없이 요청마다 CPU를 사용하는 부분이다
+- execute: 메모리 SQLite에서 Session.execute까지 포함한 시간으로, 네트워크/DB 서버 비용은 포함되지 않는다
+
+실행 방법(src 디렉토리에서 실행한다)
+    $ ENV=local python -m benchmarks.statement_cache --requests 20000
+"""
+import argparse
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import Session
+
+from crud.crud_token import _TOKEN_WITH_USER, _TOUCH_TOKEN
+from crud.crud_user import _LOGIN_USER_BY_EMAIL, LOGIN_USER_COLUMNS
+from db.base import Base
+from models import JWTToken, User
+
+_user = User.__table__
+
+
+def setup(engine) -> tuple[str, str]:
+    Base.metadata.create_all(engine, tables=[User.__table__, JWTToken.__table__])
+
+    email_key = os.urandom(32).hex()
+    refresh_token_key = os.urandom(32).hex()
+    user_uuid = uuid.uuid4().bytes
+
+    with Session(engine) as session:
+        session.add(
+            User(
+                id=1,
+                uuid=user_uuid,
+                email=os.urandom(48).hex(),
+                email_key=email_key,
+                name="user",
+                password=os.urandom(32).hex(),
+                salt=os.urandom(32),
+                is_active=1,
+                provider_id="LOCAL",
+                token_generation=0,
+            )
+        )
+        session.add(
+            JWTToken(
+                id=1,
+                user_id=1,
+                user_uuid=user_uuid,
+                jti=os.urandom(16).hex(),
+                access_token=os.urandom(32).hex(),
+                refresh_token=os.urandom(64).hex(),
+                refresh_token_key=refresh_token_key,
+                issued_at=datetime.now(),
+                expires_at=datetime.now() + timedelta(days=7),
+                token_generation=0,
+            )
+        )
+        session.commit()
+
+    return email_key, refresh_token_key
+
+
+#########################
+# 요청마다 쿼리를 생성한다(변경 전)
+#########################
+def build_login_user(email_key: str):
+    q = select(*LOGIN_USER_COLUMNS).where(
+        _user.c.email_key == email_key, _user.c.provider_id == "LOCAL"
+    )
+    return q, None
+
+
+def build_token_with_user(refresh_token_key: str):
+    q = (
+        select(JWTToken, User.is_active, User.uuid, User.token_generation)
+        .outerjoin(User, User.id == JWTToken.user_id)
+        .where(JWTToken.refresh_token_key == refresh_token_key)
+    )
+    return q, None
+
+
+def build_touch_token(refresh_token_key: str):
+    active_generation = (
+        select(User.token_generation)
+        .where(User.id == JWTToken.user_id, User.is_active == 1)
+        .scalar_subquery()
+    )
+    q = (
+        update(JWTToken)
+        .where(
+            JWTToken.user_id == 1,
+            JWTToken.refresh_token_key == refresh_token_key,
+            JWTToken.expires_at >= datetime.now(),
+            JWTToken.token_generation >= active_generation,
+        )
+        .values(
+            access_token="access",
+            refresh_token="refresh",
+            expires_at=datetime.now() + timedelta(days=7),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return q, None
+
+
+#########################
+# 미리 만든 쿼리에 값만 전달한다(변경 후)
+#########################
+def prebuilt_login_user(email_key: str):
+    return _LOGIN_USER_BY_EMAIL, {"email_key": email_key, "provider_id": "LOCAL"}
+
+
+def prebuilt_token_with_user(refresh_token_key: str):
+    return _TOKEN_WITH_USER, {"refresh_token_key": refresh_token_key}
+
+
+def prebuilt_touch_token(refresh_token_key: str):
+    return _TOUCH_TOKEN, {
+        "b_user_id": 1,
+        "b_refresh_token_key": refresh_token_key,
+        "b_now": datetime.now(),
+        "b_access_token": "access",
+        "b_refresh_token": "refresh",
+        "b_expires_at": datetime.now() + timedelta(days=7),
+    }
+
+
+def run(name: str, func, engine, key: str, requests: int) -> None:
+    with Session(engine) as session:
+        # warm-up: statement compile cache
+        for _ in range(100):
+            session.execute(*func(key))
+        session.rollback()
+
+        # 쿼리 생성과 compile cache key 계산
+        started = time.perf_counter()
+        for _ in range(requests):
+            q, _ = func(key)
+            q._generate_cache_key()
+        prepare = time.perf_counter() - started
+
+        # Session.execute 포함
+        started = time.perf_counter()
+        for _ in range(requests):
+            session.execute(*func(key))
+        execute = time.perf_counter() - started
+        session.rollback()
+
+    print(
+        f"{name:<30} prepare {prepare / requests * 1_000_000:>7.1f} µs/req "
+        f"execute {execute / requests * 1_000_000:>7.1f} µs/req"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    email_key, refresh_token_key = setup(engine)
+
+    print(f"requests={args.requests}")
+    for name, build, prebuilt, key in (
+        ("login_user_by_email", build_login_user, prebuilt_login_user, email_key),
+        (
+            "token_with_user",
+            build_token_with_user,
+            prebuilt_token_with_user,
+            refresh_token_key,
+        ),
+        ("touch_token", build_touch_token, prebuilt_touch_token, refresh_token_key),
+    ):
+        run(f"{name}(build)", build, engine, key, args.requests)
+        run(f"{name}(prebuilt)", prebuilt, engine, key, args.requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+로그인 사용자 조회: ORM Entity(select(User)) vs 컬럼 Projection(LOGIN_USER_COLUMNS) 비교
+
+ORM 객체 생성(identity map, 속성 상태 관리) 비용을 비교하기 위해 메모리 SQLite를 사용하며,
+네트워크/DB 서버 비용은 포함되지 않는다
+
+실행 방법(src 디렉토리에서 실행한다)
+    $ ENV=local python -m benchmarks.user_projection --users 1000 --requests 20000
+"""
+import argparse
+import os
+import time
+import tracemalloc
+import uuid
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from crud.crud_user import LOGIN_USER_COLUMNS
+from models import User
+
+
+def setup(engine, users: int) -> list[str]:
+    User.__table__.create(engine)
+
+    email_keys = []
+    with Session(engine) as session:
+        for i in range(1, users + 1):
+            email_key = os.urandom(32).hex()
+            email_keys.append(email_key)
+            session.add(
+                User(
+                    id=i,
+                    uuid=uuid.uuid4().bytes,
+                    email=os.urandom(48).hex(),
+                    email_key=email_key,
+                    name=f"user{i}",
+                    mobile=os.urandom(48).hex(),
+                    mobile_key=os.urandom(32).hex(),
+                    password=os.urandom(32).hex(),
+                    salt=os.urandom(32),
+                    is_active=1,
+                    provider_id="LOCAL",
+                    token_generation=0,
+                )
+            )
+        session.commit()
+
+    return email_keys
+
+
+def entity_path(session: Session, email_key: str):
+    # 요청마다 새로운 세션을 사용하는 것과 같도록 identity map을 비운다
+    session.expunge_all()
+    q = select(User).where(User.email_key == email_key, User.provider_id == "LOCAL")
+    return session.execute(q).scalars().first()
+
+
+def projection_path(session: Session, email_key: str):
+    session.expunge_all()
+    q = select(*LOGIN_USER_COLUMNS).where(
+        User.__table__.c.email_key == email_key, User.__table__.c.provider_id == "LOCAL"
+    )
+    return session.execute(q).first()
+
+
+def run(name: str, func, engine, email_keys: list[str], requests: int) -> None:
+    with Session(engine) as session:
+        # warm-up: statement compile cache
+        for email_key in email_keys[:100]:
+            func(session, email_key)
+
+        # latency
+        started = time.perf_counter()
+        for i in range(requests):
+            user = func(session, email_keys[i % len(email_keys)])
+            assert user.is_active
+        elapsed = time.perf_counter() - started
+
+        # 요청 하나를 처리하는 동안 사용한 최대 메모리
+        peaks = []
+        tracemalloc.start()
+        for i in range(min(requests, 2000)):
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            func(session, email_keys[i % len(email_keys)])
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - base)
+        tracemalloc.stop()
+
+    print(
+        f"{name:<12} {elapsed / requests * 1_000_000:>8.1f} µs/req "
+        f"{sum(peaks) / len(peaks) / 1024:>8.1f} KiB/req(peak)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    email_keys = setup(engine, args.users)
+
+    print(f"users={args.users} requests={args.requests}")
+    run("entity", entity_path, engine, email_keys, args.requests)
+    run("projection", projection_path, engine, email_keys, args.requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import uuid
+from abc import ABCMeta
+from typing import Callable
+
+from loguru import logger
+
+from core.config import settings
+from core.metrics import metrics
+from utils.resp import RESPClient
+
+published_events = metrics.counter("invalidation_published_total", "발행한 캐시 무효화 이벤트 수")
+received_events = metrics.counter(
+    "invalidation_received_total", "다른 worker/node에서 수신한 캐시 무효화 이벤트 수"
+)
+
+EventHandler = Callable[[dict], None]
+
+
+class InvalidationBus(metaclass=ABCMeta):
+    """
+    프로세스 메모리 캐시의 무효화 이벤트를 전달하는 Bus
+
+    - LocalInvalidationBus: 현재 프로세스의 구독자에게만 전달한다(기본값)
+    - RESPInvalidationBus: Redis 프로토콜 서버의 Pub/Sub으로 다른 worker, node에도 전달한다
+
+    이벤트는 dict이며, 'type' 키로 종류를 구분한다
+    - user_changed: 사용자 정보(is_active, token_generation)가 변경되었다(user_id 또는 uuid)
+    - user_inserted: 사용자가 가입하였다(user_id, uuid, provider_id, email_key)
+    - social_user_inserted: OAuth 계정이 연동되었다(user_id, provider_id, sub)
+    """
+
+    def __init__(self):
+        self._handlers: list[EventHandler] = []
+
+    def subscribe(self, handler: EventHandler) -> None:
+        self._handlers.append(handler)
+
+    def publish(self, event: dict) -> None:
+        """
+        현재 프로세스의 구독자에게 이벤트를 바로 전달한다
+        """
+
+        published_events.inc()
+        self._dispatch(event)
+
+    def _dispatch(self, event: dict) -> None:
+        for handler in self._handlers:
+            try:
+                handler(event)
+            except Exception as e:
+                logger.exception(e)
+
+    async def start(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class LocalInvalidationBus(InvalidationBus):
+    """
+    현재 프로세스에만 이벤트를 전달하는 Bus
+
+    다른 worker의 캐시는 TTL이 지난 후에 갱신된다
+    """
+
+    pass
+
+
+class RESPInvalidationBus(InvalidationBus):
+    """
+    Redis 프로토콜 서버의 Pub/Sub을 사용하는 Bus
+
+    - 이벤트는 현재 프로세스에 바로 전달한 후, channel로 발행한다
+    - 자신이 발행한 이벤트는 origin으로 구분하여 다시 처리하지 않는다
+    - 서버와 연결이 끊긴 동안의 이벤트는 유실되며, 캐시의 TTL이 지난 후에 갱신된다
+    """
+
+    def __init__(self, url: str, channel: str):
+        super().__init__()
+        self._client = RESPClient(url, max_connections=2)
+        self._channel = channel
+        self._origin = uuid.uuid4().hex
+        self._listener: asyncio.Task | None = None
+        self._pending: set[asyncio.Task] = set()
+
+    def publish(self, event: dict) -> None:
+        super().publish(event)
+
+        message = json.dumps({**event, "origin": self._origin})
+        task = asyncio.get_running_loop().create_task(self._send(message))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _send(self, message: str) -> None:
+        try:
+            await self._client.execute("PUBLISH", self._channel, message)
+        except Exception as e:
+            logger.warning(f"캐시 무효화 이벤트를 발행하지 못했습니다. { {'error': str(e)} }")
+
+    async def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async for message in self._client.subscribe(self._channel):
+                    event = json.loads(message)
+                    if event.pop("origin", None) == self._origin:
+                        continue
+
+                    received_events.inc()
+                    self._dispatch(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"캐시 무효화 channel 구독이 끊어졌습니다. { {'error': str(e)} }")
+
+            await asyncio.sleep(1)
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+        await self._client.close()
+
+
+def create_invalidation_bus() -> InvalidationBus:
+    if settings.invalidation_bus == "redis":
+        if not settings.invalidation_bus_url:
+            raise ValueError(
+                "invalidation_bus_url is required for redis invalidation bus"
+            )
+
+        return RESPInvalidationBus(
+            url=settings.invalidation_bus_url, channel=settings.invalidation_bus_channel
+        )
+
+    if settings.invalidation_bus == "local":
+        return LocalInvalidationBus()
+
+    raise ValueError(f"unknown invalidation bus: {settings.invalidation_bus}")
+
+
+invalidation_bus = create_invalidation_bus()
@@ -0,0 +1,129 @@
+import os
+from bisect import bisect_left
+
+
+class Counter:
+    """단조 증가하는 값을 기록하는 Metric"""
+
+    def __init__(self, name: str, description: str = ""):
+        self.name = name
+        self.description = description
+        self.value = 0
+
+    def inc(self, amount: int | float = 1) -> None:
+        self.value += amount
+
+    def snapshot(self) -> int | float:
+        return self.value
+
+
+class Gauge:
+    """현재 상태 값을 기록하는 Metric"""
+
+    def __init__(self, name: str, description: str = ""):
+        self.name = name
+        self.description = description
+        self.value = 0
+
+    def set(self, value: int | float) -> None:
+        self.value = value
+
+    def inc(self, amount: int | float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: int | float = 1) -> None:
+        self.value -= amount
+
+    def snapshot(self) -> int | float:
+        return self.value
+
+
+class Histogram:
+    """관측 값의 분포를 기록하는 Metric"""
+
+    DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+    def __init__(
+        self,
+        name: str,
+        description: str = "",
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min: float | None = None
+        self.max: float | None = None
+
+    def observe(self, value: int | float) -> None:
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+
+    def snapshot(self) -> dict:
+        buckets = {str(le): c for le, c in zip(self.buckets, self.bucket_counts)}
+        buckets["+Inf"] = self.bucket_counts[-1]
+
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "avg": self.sum / self.count if self.count else 0,
+            "min": self.min,
+            "max": self.max,
+            "buckets": buckets,
+        }
+
+
+class MetricsRegistry:
+    """
+    Worker 프로세스 단위로 Metric을 관리한다
+
+    - 같은 이름으로 다시 요청하면 이미 등록된 Metric을 반환한다
+    - gunicorn worker마다 별도의 값을 가지므로, snapshot에 pid를 함께 반환한다
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, Counter | Gauge | Histogram] = {}
+
+    def _get_or_create(self, metric_cls, name: str, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = metric_cls(name, **kwargs)
+            self._metrics[name] = metric
+        elif not isinstance(metric, metric_cls):
+            raise ValueError(f"metric '{name}' is already registered as {type(metric)}")
+
+        return metric
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        return self._get_or_create(Counter, name, description=description)
+
+    def gauge(self, name: str, description: str = "") -> Gauge:
+        return self._get_or_create(Gauge, name, description=description)
+
+    def histogram(
+        self,
+        name: str,
+        description: str = "",
+        buckets: tuple[float, ...] = Histogram.DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(
+            Histogram, name, description=description, buckets=buckets
+        )
+
+    def snapshot(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "metrics": {
+                name: metric.snapshot()
+                for name, metric in sorted(self._metrics.items())
+            },
+        }
+
+
+metrics = MetricsRegistry()
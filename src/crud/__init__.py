@@ -1,2 +1,9 @@
-from .crud_user import UserDAL, UserLoginHistoryDAL, SocialUserDAL
 from .crud_token import TokenDAL
+from .crud_user import SocialUserDAL, UserDAL, UserLoginHistoryDAL
+from .token_store import (
+    MemoryTokenStore,
+    RedisTokenStore,
+    ShardedTokenStore,
+    SQLTokenStore,
+    TokenStore,
+)
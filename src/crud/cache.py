@@ -0,0 +1,65 @@
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.invalidation import invalidation_bus
+from db.base import RoutingSession
+from utils.cache import TTLCache
+from utils.strings import binary_to_uuid
+
+# Session.info에 저장하는 commit 이후에 발행할 무효화 이벤트 목록 키
+PENDING_INVALIDATIONS = "pending_invalidations"
+
+# 로그인에 필요한 사용자 정보(LOGIN_USER_COLUMNS Row) 캐시
+# - ('id', user_id): UserDAL.get_login_user_by_id
+# - ('social', provider_id, sub): SocialUserDAL.get_login_user
+user_cache = TTLCache(
+    name="user", ttl=settings.user_cache_seconds, max_size=settings.user_cache_max_size
+)
+
+
+def user_owners(row) -> tuple[str, ...]:
+    """
+    사용자 id, uuid로 캐시 항목을 무효화할 수 있도록 owner 목록을 반환한다
+    """
+
+    return f"id:{row.id}", f"uuid:{binary_to_uuid(row.uuid)}"
+
+
+def queue_invalidation(session: AsyncSession, invalidation_event: dict) -> None:
+    """
+    commit 이후에 발행할 무효화 이벤트를 등록한다
+
+    commit 이전에 무효화하면, 다른 요청이 변경 전의 값을 다시 캐싱할 수 있으므로 commit 이후에 발행한다
+    rollback 되면 등록된 이벤트는 삭제된다
+    """
+
+    session.info.setdefault(PENDING_INVALIDATIONS, []).append(invalidation_event)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _publish_pending(session) -> None:
+    for invalidation_event in session.info.pop(PENDING_INVALIDATIONS, ()):
+        invalidation_bus.publish(invalidation_event)
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _discard_pending(session) -> None:
+    session.info.pop(PENDING_INVALIDATIONS, None)
+
+
+def _on_invalidation(invalidation_event: dict) -> None:
+    event_type = invalidation_event.get("type")
+
+    if event_type in ("user_changed", "user_inserted"):
+        if invalidation_event.get("user_id") is not None:
+            user_cache.invalidate_owner(f"id:{invalidation_event['user_id']}")
+        if invalidation_event.get("uuid"):
+            user_cache.invalidate_owner(f"uuid:{invalidation_event['uuid']}")
+    elif event_type == "social_user_inserted":
+        user_cache.invalidate(
+            ("social", invalidation_event["provider_id"], invalidation_event["sub"])
+        )
+
+
+invalidation_bus.subscribe(_on_invalidation)
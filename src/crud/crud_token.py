@@ -1,12 +1,86 @@
-from sqlalchemy import select, insert, delete, update, func
+from datetime import datetime
+
+from sqlalchemy import and_, bindparam, delete, insert, select, update
 
 import models
 import schemas
+from core.config import settings
+from core.metrics import metrics
 from crud.abstract import DalABC
-from models import JWTToken
+from crud.routing import write
+from db.shard import shard_sessions
+from models import JWTToken, User
+from utils.strings import uuid_to_binary
+
+session_cap = metrics.gauge("session_cap", "사용자별 최대 동시 세션 수")
+session_cap.set(settings.max_active_sessions)
+session_evictions = metrics.counter("session_evictions_total", "최대 세션 수를 초과하여 삭제된 세션 수")
+
+_jwt_token = JWTToken.__table__
+
+# 로그인, 토큰 갱신, 로그아웃마다 실행되는 쿼리는 한 번만 만들고, 값은 bind parameter로 전달한다
+_TOKEN_WITH_USER = (
+    select(JWTToken, User.is_active, User.uuid, User.token_generation)
+    .outerjoin(User, User.id == JWTToken.user_id)
+    .where(JWTToken.refresh_token_key == bindparam("refresh_token_key"))
+)
+_INSERT_TOKEN = insert(_jwt_token)
+
+# 비활성화된 사용자라면 서브쿼리 결과가 NULL이 되므로 조건을 만족하지 않는다
+_active_generation = (
+    select(User.token_generation)
+    .where(User.id == _jwt_token.c.user_id, User.is_active == 1)
+    .scalar_subquery()
+)
+# SET 절의 컬럼 이름은 bind parameter 이름으로 사용할 수 없으므로 b_ 접두사를 붙인다
+_TOUCH_TOKEN = (
+    update(_jwt_token)
+    .where(
+        _jwt_token.c.user_id == bindparam("b_user_id"),
+        _jwt_token.c.refresh_token_key == bindparam("b_refresh_token_key"),
+        _jwt_token.c.expires_at >= bindparam("b_now"),
+        _jwt_token.c.token_generation >= _active_generation,
+    )
+    .values(
+        access_token=bindparam("b_access_token"),
+        refresh_token=bindparam("b_refresh_token"),
+        expires_at=bindparam("b_expires_at"),
+    )
+)
+# shard에는 users 테이블이 없으므로 사용자 상태(토큰 세대)는 호출한 쪽에서 확인한다
+_EXTEND_TOKEN = (
+    update(_jwt_token)
+    .where(
+        _jwt_token.c.user_id == bindparam("b_user_id"),
+        _jwt_token.c.refresh_token_key == bindparam("b_refresh_token_key"),
+        _jwt_token.c.expires_at >= bindparam("b_now"),
+    )
+    .values(
+        access_token=bindparam("b_access_token"),
+        refresh_token=bindparam("b_refresh_token"),
+        expires_at=bindparam("b_expires_at"),
+    )
+)
+_DELETE_BY_JTI = delete(_jwt_token).where(
+    _jwt_token.c.jti == bindparam("jti"),
+    _jwt_token.c.user_uuid == bindparam("user_uuid"),
+)
+
+# 최대 세션 수를 확인하기 전에 사용자별로 잠근다
+# shard에는 user 테이블이 없으므로 사용자의 세션 행을 잠근다
+_LOCK_USER = select(User.id).where(User.id == bindparam("user_id")).with_for_update()
+_LOCK_USER_TOKENS = (
+    select(_jwt_token.c.id)
+    .where(_jwt_token.c.user_id == bindparam("user_id"))
+    .with_for_update()
+)
 
 
 class TokenDAL(DalABC):
+    """
+    로그인 직후의 토큰 갱신, 로그아웃이 복제 지연의 영향을 받지 않도록 모든 쿼리를 Primary에서 실행한다
+    """
+
     async def get(self, refresh_token_key: str) -> models.JWTToken:
         """
         refreshToken으로 저장된 토큰 정보를 조회한다
@@ -20,77 +94,314 @@ class TokenDAL(DalABC):
         result = await self.session.execute(q)
         return result.scalars().first()
 
+    async def get_with_user(self, refresh_token_key: str):
+        """
+        refreshToken으로 저장된 토큰 정보와 사용자의 상태를 한 번의 조회로 가져온다
+
+        User 객체 전체를 불러오지 않고, 토큰 갱신에 필요한 is_active, uuid, token_generation 컬럼만 조회한다
+        사용자가 존재하지 않는다면 사용자 컬럼은 None으로 반환된다
+
+        :param refresh_token_key: SHA-256으로 해싱된 refreshToken 값이다
+        :return: (JWTToken, is_active, uuid, token_generation) Row를 반환한다
+        """
+
+        result = await self.session.execute(
+            _TOKEN_WITH_USER, {"refresh_token_key": refresh_token_key}
+        )
+        return result.first()
+
+    @write
     async def insert_token(self, new_token: schemas.TokenInsert) -> None:
         """
         생성된 Token 정보를 DB에 저장한다
 
+        최대 세션 수(max_active_sessions)가 설정되어 있다면, 같은 트랜잭션에서 오래된 세션을 먼저 삭제한다
+
         :param new_token: 새로 생성된 JWT Token 정보를 담고 있는 스키마
         :return:
         """
-        q = insert(JWTToken).values(**new_token.model_dump())
 
-        await self.session.execute(q)
+        if settings.max_active_sessions > 0:
+            await self.evict_oldest_sessions(
+                user_id=new_token.user_id, keep=settings.max_active_sessions - 1
+            )
+
+        await self.session.execute(_INSERT_TOKEN, new_token.model_dump())
+
+    @write
+    async def insert_tokens(self, new_tokens: list[schemas.TokenInsert]) -> None:
+        """
+        여러 사용자의 Token 정보를 하나의 multi-row INSERT로 저장한다
+
+        최대 세션 수(max_active_sessions)가 설정되어 있다면, 사용자별로 추가할 토큰 수 만큼 오래된 세션을 먼저 삭제한다
+
+        :param new_tokens: 새로 생성된 JWT Token 정보 목록
+        :return:
+        """
+
+        if not new_tokens:
+            return
+
+        if settings.max_active_sessions > 0:
+            counts: dict[int, int] = {}
+            for new_token in new_tokens:
+                counts[new_token.user_id] = counts.get(new_token.user_id, 0) + 1
+
+            # 잠금 순서를 일정하게 유지하여 동시에 실행된 batch 사이의 deadlock을 피한다
+            for user_id in sorted(counts):
+                await self.evict_oldest_sessions(
+                    user_id=user_id,
+                    keep=max(settings.max_active_sessions - counts[user_id], 0),
+                )
+
+        # 여러 파라미터로 실행하면 executemany로 처리되며, asyncmy는 이를 multi-row INSERT로 전송한다
+        await self.session.execute(_INSERT_TOKEN, [t.model_dump() for t in new_tokens])
+
+    @write
+    async def evict_oldest_sessions(self, user_id: int, keep: int) -> int:
+        """
+        최근 세션 keep개만 남기고 오래된 세션(토큰)을 삭제한다
+
+        - 먼저 사용자 행(user)을 FOR UPDATE로 잠궈서 같은 사용자의 동시 로그인을 직렬화한다
+          (삭제할 세션이 없더라도 잠그므로, 동시에 로그인해도 최대 세션 수를 넘지 않는다)
+        - shard에는 user 테이블이 없으므로 사용자의 세션 행을 잠그며, 세션이 없는 사용자의 동시 로그인은 직렬화되지 않는다
+        - idx_user_id 인덱스로 (user_id, id) 역순으로 keep번째 다음 세션의 id를 찾는다
+        - 찾은 id보다 오래된 세션을 한 번에 삭제하므로 세션 수와 관계없이 세 개의 쿼리로 처리한다
+
+        :param user_id: 사용자 Id
+        :param keep: 남겨둘 최근 세션 수
+        :return: 삭제된 세션 수
+        """
+
+        await self.session.execute(
+            _LOCK_USER_TOKENS if shard_sessions else _LOCK_USER, {"user_id": user_id}
+        )
+
+        q = (
+            select(JWTToken.id)
+            .where(JWTToken.user_id == user_id)
+            .order_by(JWTToken.id.desc())
+            .offset(keep)
+            .limit(1)
+            .with_for_update()
+        )
+
+        result = await self.session.execute(q)
+        boundary_id = result.scalar()
+        if boundary_id is None:
+            return 0
+
+        q = (
+            delete(JWTToken)
+            .where(JWTToken.user_id == user_id, JWTToken.id <= boundary_id)
+            .execution_options(synchronize_session=False)
+        )
+
+        result = await self.session.execute(q)
+        session_evictions.inc(result.rowcount)
+
+        return result.rowcount
+
+    @write
+    async def delete_by_jti(self, user_uuid: str, jti: str) -> int:
+        """
+        Token 식별자(jti)로 저장된 토큰 정보를 삭제한다
+
+        :param user_uuid: 사용자 UUID로 JWT Token에 저장된 sub claim를 전달 받는다
+        :param jti: accessToken의 jti claim 값이다
+        :return: 삭제된 토큰 수
+        """
+
+        result = await self.session.execute(
+            _DELETE_BY_JTI, {"jti": jti, "user_uuid": uuid_to_binary(user_uuid)}
+        )
+        return result.rowcount
+
+    @write
+    async def update(self, update_token) -> int:
+        """
+        새로 생성한 Token 정보를 업데이트한다
+
+        만료되지 않았고, 활성화된 사용자의 현재 토큰 세대로 발급된 토큰만 만료일자를 연장한다
+        조회 이후에 토큰이 만료되거나 사용자가 비활성화/전체 로그아웃 되었다면 업데이트되지 않는다
+
+        :param update_token: 새로 갱신한 accessToken, refreshToken과 만료일자가 포함된 데이터
+        :return: 업데이트된 row 수를 반환한다
+        """
+
+        result = await self.session.execute(
+            _TOUCH_TOKEN,
+            {
+                "b_user_id": update_token.user_id,
+                "b_refresh_token_key": update_token.refresh_token_key,
+                "b_now": datetime.now(),
+                "b_access_token": update_token.access_token,
+                "b_refresh_token": update_token.refresh_token,
+                "b_expires_at": update_token.expires_at,
+            },
+        )
+        return result.rowcount
+
+    @write
+    async def extend(self, update_token) -> int:
+        """
+        새로 생성한 Token 정보를 업데이트한다
+
+        update와 같지만 사용자의 활성화 여부와 토큰 세대를 확인하지 않으므로, users 테이블이 없는 shard에서 사용한다
+
+        :param update_token: 새로 갱신한 accessToken, refreshToken과 만료일자가 포함된 데이터
+        :return: 업데이트된 row 수를 반환한다
+        """
+
+        result = await self.session.execute(
+            _EXTEND_TOKEN,
+            {
+                "b_user_id": update_token.user_id,
+                "b_refresh_token_key": update_token.refresh_token_key,
+                "b_now": datetime.now(),
+                "b_access_token": update_token.access_token,
+                "b_refresh_token": update_token.refresh_token,
+                "b_expires_at": update_token.expires_at,
+            },
+        )
+        return result.rowcount
+
+    @write
+    async def delete_stale_generation(self, limit: int) -> int:
+        """
+        폐기된(이전 토큰 세대로 발급된) 토큰을 삭제한다
+
+        전체 로그아웃으로 토큰 세대가 증가한 사용자(token_generation > 0)만 idx_token_generation으로 조회하고,
+        사용자별 토큰은 idx_user_id로 조회하므로 jwt_token 전체를 읽지 않는다
+
+        :param limit: 한 번에 삭제할 최대 토큰 수
+        :return: 삭제된 토큰 수
+        """
+
+        q = (
+            select(JWTToken.id)
+            .select_from(User)
+            .join(
+                JWTToken,
+                and_(
+                    JWTToken.user_id == User.id,
+                    JWTToken.token_generation < User.token_generation,
+                ),
+            )
+            .where(User.token_generation > 0)
+            .limit(limit)
+        )
+
+        result = await self.session.execute(q)
+        token_ids = result.scalars().all()
+        if not token_ids:
+            return 0
+
+        q = (
+            delete(JWTToken)
+            .where(JWTToken.id.in_(token_ids))
+            .execution_options(synchronize_session=False)
+        )
+
+        result = await self.session.execute(q)
+        return result.rowcount
+
+    @write
+    async def delete_expired(self, limit: int) -> int:
+        """
+        만료된 토큰을 idx_expires_at으로 조회하여 삭제한다
+
+        users 테이블이 없는 shard에서는 이 메서드만 사용하며, 이전 토큰 세대로 발급된 토큰은 토큰 갱신 시 거부되고 만료 이후에 삭제된다
 
-    async def exists(self, user_uuid: str, access_token: str) -> bool:
+        :param limit: 한 번에 삭제할 최대 토큰 수
+        :return: 삭제된 토큰 수
         """
-        사용자 AccessToken이 존재하는지 확인하고 결과를 반환한다
+
+        q = select(JWTToken.id).where(JWTToken.expires_at < datetime.now()).limit(limit)
+
+        result = await self.session.execute(q)
+        token_ids = result.scalars().all()
+        if not token_ids:
+            return 0
+
+        q = (
+            delete(JWTToken)
+            .where(JWTToken.id.in_(token_ids))
+            .execution_options(synchronize_session=False)
+        )
+
+        result = await self.session.execute(q)
+        return result.rowcount
+
+    async def list_sessions(
+        self, user_uuid: str, min_generation: int, cursor: int | None, limit: int
+    ) -> list[models.JWTToken]:
+        """
+        사용자의 유효한 세션(토큰) 목록을 최신순으로 조회한다
+
+        - OFFSET 대신 (user_uuid, id) 기준의 keyset pagination을 사용하므로 페이지 위치와 관계없이 일정한 비용으로
+          조회한다
+        - users 테이블을 참조하지 않으므로 shard에서도 같은 쿼리로 조회한다
+        - 만료되었거나 이전 토큰 세대로 발급된 세션은 제외한다
 
         :param user_uuid: 사용자 UUID로 JWT Token에 저장된 sub claim를 전달 받는다
-        :param access_token: JWT Token의 accessToken이다
-        :return: 토큰 정보가 존재한다면 'True'를 반환하고, 그렇지 않다면 'False'를 반환한다
+        :param min_generation: 사용자의 현재 토큰 세대로, 이보다 이전 세대의 세션은 제외한다
+        :param cursor: 이전 페이지의 마지막 세션 id로, 이 값보다 작은 id의 세션을 조회한다
+        :param limit: 조회할 최대 세션 수
+        :return: 세션(토큰) 목록
         """
 
-        exists_criteria = (
+        q = (
             select(JWTToken)
-            .where(JWTToken.user_uuid == func.UUID_TO_BIN(user_uuid))
-            .where(JWTToken.access_token == access_token)
-            .exists()
+            .where(JWTToken.user_uuid == uuid_to_binary(user_uuid))
+            .where(JWTToken.token_generation >= min_generation)
+            .where(JWTToken.expires_at >= datetime.now())
+            .order_by(JWTToken.id.desc())
+            .limit(limit)
         )
 
-        q = select(JWTToken).where(exists_criteria)
+        if cursor is not None:
+            q = q.where(JWTToken.id < cursor)
 
         result = await self.session.execute(q)
-        return bool(result.all())
+        return result.scalars().all()
 
-    async def delete(self, user_uuid: str, access_token: str) -> None:
+    @write
+    async def delete_sessions(self, user_uuid: str, jtis: list[str]) -> int:
         """
-        저장된 사용자 accessToken 정보를 삭제한다
+        사용자의 세션(토큰)을 한 번에 삭제한다
+
+        다른 사용자의 세션이 삭제되지 않도록 user_uuid 조건을 함께 사용한다
 
         :param user_uuid: 사용자 UUID로 JWT Token에 저장된 sub claim를 전달 받는다
-        :param access_token: JWT Token의 accessToken이다
-        :return:
+        :param jtis: 삭제할 세션의 Token 식별자(jti) 목록
+        :return: 삭제된 세션 수
         """
 
         q = (
             delete(JWTToken)
-            .where(JWTToken.user_uuid == func.UUID_TO_BIN(user_uuid))
-            .where(JWTToken.access_token == access_token)
-            .execution_options(synchronize_session="fetch")
+            .where(JWTToken.user_uuid == uuid_to_binary(user_uuid))
+            .where(JWTToken.jti.in_(jtis))
+            .execution_options(synchronize_session=False)
         )
 
-        await self.session.execute(q)
+        result = await self.session.execute(q)
+        return result.rowcount
 
-    async def update(self, update_token):
+    @write
+    async def delete_by_user(self, user_uuid: str) -> int:
         """
-        새로 생성한 Token 정보를 업데이트한다
+        사용자의 모든 세션(토큰)을 삭제한다
 
-        :param update_token: 새로 갱신한 accessToken, refreshToken과 만료일자가 포함된 데이터
-        :return:
+        :param user_uuid: 사용자 UUID로 JWT Token에 저장된 sub claim를 전달 받는다
+        :return: 삭제된 세션 수
         """
 
         q = (
-            update(JWTToken)
-            .where(
-                JWTToken.user_id == update_token.user_id,
-                JWTToken.refresh_token_key == update_token.refresh_token_key,
-            )
-            .values(
-                access_token=update_token.access_token,
-                refresh_token=update_token.refresh_token,
-                refresh_token_key=update_token.refresh_token_key,
-                expires_at=update_token.expires_at,
-            )
-            .execution_options(synchronize_session="fetch")
+            delete(JWTToken)
+            .where(JWTToken.user_uuid == uuid_to_binary(user_uuid))
+            .execution_options(synchronize_session=False)
         )
 
-        await self.session.execute(q)
+        result = await self.session.execute(q)
+        return result.rowcount
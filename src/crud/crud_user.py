@@ -1,13 +1,155 @@
-from sqlalchemy import select, insert, func
-from sqlalchemy.engine import cursor
-
-from crud.abstract import DalABC
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy import (
+    BigInteger,
+    Integer,
+    bindparam,
+    cast,
+    delete,
+    exists,
+    extract,
+    func,
+    insert,
+    literal_column,
+    select,
+    update,
+)
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.engine import Row, cursor
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncResult
 
 import schemas
-from models import User, UserLoginHistory, SocialUser
+from crud.abstract import DalABC
+from crud.cache import queue_invalidation, user_cache, user_owners
+from crud.loader import create_batch_loader
+from crud.routing import read_only, write
+from db.base import WROTE, async_session
+from models import SocialUser, User, UserLoginHistory
+from utils.strings import binary_to_uuid, ip_to_binary, uuid_to_binary
+
+# 로그인, 토큰 갱신, OAuth 로그인에 필요한 사용자 컬럼
+# 암호화된 이메일/핸드폰 번호, 생성/변경일자는 사용하지 않으므로 조회하지 않는다
+# ORM 속성(User.id) 대신 Table 컬럼을 사용하면 ORM 처리 과정 없이 Core 쿼리로 실행된다
+_user = User.__table__
+_social_user = SocialUser.__table__
+
+LOGIN_USER_COLUMNS = (
+    _user.c.id,
+    _user.c.uuid,
+    _user.c.name,
+    _user.c.password,
+    _user.c.salt,
+    _user.c.is_active,
+    _user.c.token_generation,
+)
+
+
+class LoginUser(NamedTuple):
+    """
+    LOGIN_USER_COLUMNS와 같은 속성을 가진 값으로, 방금 저장한 사용자를 다시 조회하지 않고 반환할 때 사용한다
+    """
+
+    id: int
+    uuid: bytes
+    name: str
+    password: str | None
+    salt: bytes | None
+    is_active: int
+    token_generation: int
+
+
+_login_history = UserLoginHistory.__table__
+
+# 요청마다 실행되는 쿼리는 모듈을 불러올 때 한 번만 만들고, 값은 bind parameter로 전달한다
+# 요청마다 쿼리 객체를 만들고 compile cache key를 계산하는 비용이 없어진다(benchmarks.statement_cache)
+_LOGIN_USER_BY_ID = select(*LOGIN_USER_COLUMNS).where(
+    _user.c.id == bindparam("user_id")
+)
+_LOGIN_USERS_BY_IDS = select(*LOGIN_USER_COLUMNS).where(
+    _user.c.id.in_(bindparam("user_ids", expanding=True))
+)
+_LOGIN_USER_BY_EMAIL = select(*LOGIN_USER_COLUMNS).where(
+    _user.c.email_key == bindparam("email_key"),
+    _user.c.provider_id == bindparam("provider_id"),
+)
+_LOGIN_USERS_BY_EMAIL_KEYS = select(*LOGIN_USER_COLUMNS, _user.c.email_key).where(
+    _user.c.email_key.in_(bindparam("email_keys", expanding=True)),
+    _user.c.provider_id == bindparam("provider_id"),
+)
+_EXISTS_EMAIL = select(
+    exists().where(
+        _user.c.email_key == bindparam("email_key"),
+        _user.c.provider_id == bindparam("provider_id"),
+    )
+)
+_TOKEN_GENERATION_BY_UUID = select(_user.c.token_generation).where(
+    _user.c.uuid == bindparam("uuid")
+)
+_USER_ID_BY_UUID = select(_user.c.id).where(_user.c.uuid == bindparam("uuid"))
+_SOCIAL_LOGIN_USER = (
+    select(*LOGIN_USER_COLUMNS)
+    .join(_social_user, _social_user.c.user_id == _user.c.id)
+    .where(
+        _social_user.c.provider_id == bindparam("provider_id"),
+        _social_user.c.sub == bindparam("sub"),
+    )
+)
+_EXISTS_SOCIAL_USER = select(
+    exists().where(
+        _social_user.c.provider_id == bindparam("provider_id"),
+        _social_user.c.sub == bindparam("sub"),
+    )
+)
+# 다른 요청이 먼저 추가한 계정을 조회할 때는 트랜잭션의 snapshot이 아닌 최신 값을 읽는다(FOR SHARE)
+_SOCIAL_LOGIN_USER_LOCKED = _SOCIAL_LOGIN_USER.with_for_update(read=True)
+
+# uq_provider_id_sub가 중복되면 추가하지 않는 INSERT로, 추가되었다면 rowcount가 1이다
+# MySQL은 CLIENT_FOUND_ROWS로 연결하므로 중복일 때도 1이 될 수 있어, updated_at을 갱신하여 2가 되도록 한다
+_mysql_insert_social_user = mysql.insert(_social_user)
+_UPSERT_SOCIAL_USER = {
+    "mysql": _mysql_insert_social_user.on_duplicate_key_update(
+        updated_at=_mysql_insert_social_user.inserted.updated_at
+    ),
+    "postgresql": postgresql.insert(_social_user).on_conflict_do_nothing(
+        index_elements=["provider_id", "sub"]
+    ),
+    "sqlite": sqlite.insert(_social_user).on_conflict_do_nothing(
+        index_elements=["provider_id", "sub"]
+    ),
+}
+
+# IP 주소는 INET6_ATON() 대신 Python에서 변환하므로 모든 값이 bind parameter로 전달된다
+_INSERT_LOGIN_HISTORY = insert(_login_history)
+
+# login_time을 1970-01-01 00:00:00부터의 초로 변환하는 식으로, 시간대를 변환하지 않으므로 저장된 시각 그대로의 시/일을 계산한다
+# (MySQL UNIX_TIMESTAMP()는 session time_zone으로 변환한다)
+_LOGIN_TIME_SECONDS = {
+    "mysql": func.timestampdiff(
+        literal_column("SECOND"), "1970-01-01 00:00:00", _login_history.c.login_time
+    ),
+    "postgresql": cast(extract("epoch", _login_history.c.login_time), BigInteger),
+    "sqlite": cast(func.strftime("%s", _login_history.c.login_time), Integer),
+}
+
+# 로그인 이력 조회 API에서 반환하는 컬럼
+_LOGIN_HISTORY_COLUMNS = (
+    _login_history.c.id,
+    _login_history.c.login_time,
+    _login_history.c.login_success,
+    _login_history.c.ip_address,
+)
+
+
+class _SocialUserExists(Exception):
+    """
+    추가하려던 OAuth 계정이 이미 존재한다
+    """
 
 
 class UserDAL(DalABC):
+    @read_only
     async def get_by_user_id(self, user_id: int) -> User:
         """
         사용자 Id로 사용자를 검색하여 결과를 반환한다
@@ -21,6 +163,44 @@ class UserDAL(DalABC):
         result = await self.session.execute(q)
         return result.scalars().first()
 
+    @read_only
+    async def get_login_user_by_id(self, user_id: int) -> Row | None:
+        """
+        사용자 Id로 로그인에 필요한 사용자 정보만 조회한다
+
+        ORM 객체를 생성하지 않고 필요한 컬럼만 가진 Row를 반환한다
+        사용자 캐시를 사용하며, 쓰기를 실행한 Session에서는 캐시를 사용하지 않는다
+
+        :param user_id: 사용자 Id 이다
+        :return: LOGIN_USER_COLUMNS 속성을 가진 Row를 반환한다
+        """
+
+        async def load() -> Row | None:
+            # 쓰기를 실행한 Session은 별도 Session에서 실행되는 batch loader를 사용하지 않는다
+            if login_user_by_id_loader is not None and not self.session.info.get(WROTE):
+                return await login_user_by_id_loader.load(user_id)
+
+            result = await self.session.execute(_LOGIN_USER_BY_ID, {"user_id": user_id})
+            return result.first()
+
+        if self.session.info.get(WROTE):
+            return await load()
+
+        return await user_cache.get(("id", user_id), load, owners=user_owners)
+
+    @read_only
+    async def get_login_users_by_ids(self, user_ids: list[int]) -> list[Row]:
+        """
+        여러 사용자의 로그인에 필요한 사용자 정보를 한 번에 조회한다
+
+        :param user_ids: 사용자 Id 목록
+        :return: LOGIN_USER_COLUMNS 속성을 가진 Row 목록을 반환한다
+        """
+
+        result = await self.session.execute(_LOGIN_USERS_BY_IDS, {"user_ids": user_ids})
+        return result.all()
+
+    @read_only
     async def get_by_user_uuid(self, uuid: str) -> User:
         """
         사용자 UUID로 사용자를 조회한다
@@ -28,41 +208,126 @@ class UserDAL(DalABC):
         :param uuid: 문자열 타입의 UUID
         :return:
         """
-        q = select(User).where(User.uuid == func.UUID_TO_BIN(uuid))
+        q = select(User).where(User.uuid == uuid_to_binary(uuid))
 
         result = await self.session.execute(q)
         return result.scalars().first()
 
-    async def get_by_email(self, email_key: str) -> User:
+    @read_only
+    async def get_user_id_by_uuid(self, uuid: str) -> int | None:
+        """
+        사용자 UUID로 사용자 Id만 조회한다
+
+        개인정보(암호화된 컬럼)가 포함된 User 객체를 만들지 않는다
+
+        :param uuid: 문자열 타입의 UUID
+        :return: 사용자 Id를 반환하고, 사용자가 없다면 None을 반환한다
+        """
+
+        result = await self.session.execute(
+            _USER_ID_BY_UUID, {"uuid": uuid_to_binary(uuid)}
+        )
+        return result.scalar()
+
+    @read_only
+    async def get_by_email(self, email_key: str, provider_id: str) -> User:
         """
         이메일 주소로 사용자를 검색하여 결과를 반환한다
 
+        이메일 주소는 가입 경로(provider_id)별로 unique 하므로 가입 경로를 함께 조건으로 사용한다
+
         :param: email_key: 이메일 주소를 SHA-256으로 변환한 해시값
+        :param provider_id: 가입 경로(LOCAL, GOOGLE, ...)
         :return: 사용자 User 데이터를 반환한다
         """
 
-        q = select(User).where(User.email_key == email_key)
+        q = select(User).where(
+            User.email_key == email_key, User.provider_id == provider_id
+        )
 
         result = await self.session.execute(q)
         return result.scalars().first()
 
-    async def exists_email(self, email_key: str) -> bool:
+    @read_only
+    async def get_login_user_by_email(
+        self, email_key: str, provider_id: str
+    ) -> Row | None:
+        """
+        이메일 주소로 로그인에 필요한 사용자 정보만 조회한다
+
+        ORM 객체를 생성하지 않고 필요한 컬럼만 가진 Row를 반환한다
+
+        :param email_key: 이메일 주소를 SHA-256으로 변환한 해시값
+        :param provider_id: 가입 경로(LOCAL, GOOGLE, ...)
+        :return: LOGIN_USER_COLUMNS 속성을 가진 Row를 반환한다
+        """
+
+        if login_user_by_email_loader is not None and not self.session.info.get(WROTE):
+            return await login_user_by_email_loader.load((email_key, provider_id))
+
+        result = await self.session.execute(
+            _LOGIN_USER_BY_EMAIL, {"email_key": email_key, "provider_id": provider_id}
+        )
+        return result.first()
+
+    @read_only
+    async def get_login_users_by_email_keys(
+        self, email_keys: list[str], provider_id: str
+    ) -> list[Row]:
+        """
+        여러 이메일 주소의 로그인에 필요한 사용자 정보를 한 번에 조회한다
+
+        :param email_keys: 이메일 주소를 SHA-256으로 변환한 해시값 목록
+        :param provider_id: 가입 경로(LOCAL, GOOGLE, ...)
+        :return: LOGIN_USER_COLUMNS, email_key 속성을 가진 Row 목록을 반환한다
+        """
+
+        result = await self.session.execute(
+            _LOGIN_USERS_BY_EMAIL_KEYS,
+            {"email_keys": email_keys, "provider_id": provider_id},
+        )
+        return result.all()
+
+    @read_only
+    async def exists_email(self, email_key: str, provider_id: str) -> bool:
         """
         Email 주소가 등록되어 있는지 확인한 후, 존재 여부를 반환한다
 
         :param email_key: 이메일 주소를 SHA-256으로 변환한 해시값
+        :param provider_id: 가입 경로(LOCAL, GOOGLE, ...)
         :return: email 주소가 등록되어 있다면 True, 없다면 False를 반환한다
         """
 
-        exists_criteria = (
-            select(User.email_key).where(User.email_key == email_key).exists()
+        result = await self.session.execute(
+            _EXISTS_EMAIL, {"email_key": email_key, "provider_id": provider_id}
         )
+        return bool(result.scalar())
+
+    async def get_email_keys(
+        self, provider_id: str, after_id: int, limit: int
+    ) -> list[Row]:
+        """
+        가입 경로별 사용자의 email_key를 id 순서로 나누어 조회한다
+
+        가입 직후의 사용자도 조회할 수 있도록 Primary에서 조회한다
 
-        q = select(User.id).where(exists_criteria)
+        :param provider_id: 가입 경로(LOCAL, GOOGLE, ...)
+        :param after_id: 이전 조회의 마지막 사용자 id로, 이후의 사용자만 조회한다
+        :param limit: 최대 조회 개수
+        :return: id, email_key 속성을 가진 Row 목록을 반환한다
+        """
+
+        q = (
+            select(_user.c.id, _user.c.email_key)
+            .where(_user.c.provider_id == provider_id, _user.c.id > after_id)
+            .order_by(_user.c.id)
+            .limit(limit)
+        )
 
         result = await self.session.execute(q)
-        return bool(result.all())
+        return result.all()
 
+    @read_only
     async def exists_mobile(self, mobile_key: str) -> bool:
         """
         핸드폰 번호가 등록되어 있는지 확인한 후, 존재 여부를 반환한다
@@ -71,21 +336,20 @@ class UserDAL(DalABC):
         :return: 핸드폰 번호가 등록되어 있다면 True, 없다면 False를 반환한다
         """
 
-        exists_criteria = (
-            select(User.mobile_key).where(User.mobile_key == mobile_key).exists()
-        )
-
-        q = select(User.id).where(exists_criteria)
+        q = select(exists().where(User.mobile_key == mobile_key))
 
         result = await self.session.execute(q)
-        return bool(result.all())
+        return bool(result.scalar())
 
+    @write
     async def insert_user(
         self, new_user: schemas.RegisterInsert
     ) -> cursor.CursorResult:
         """
         회원가입 정보를 테이블에 저장한다
 
+        이메일, 핸드폰 번호가 중복되면 unique 제약조건에 의해 IntegrityError가 발생한다
+
         :param new_user: 회원가입 정보가 포함된 스키마 정보
         :return:
         """
@@ -93,24 +357,265 @@ class UserDAL(DalABC):
         q = insert(User).values(**new_user.model_dump())
 
         result = await self.session.execute(q)
+
+        queue_invalidation(
+            self.session,
+            {
+                "type": "user_inserted",
+                "user_id": result.inserted_primary_key[0],
+                "uuid": binary_to_uuid(new_user.uuid),
+                "provider_id": new_user.provider_id,
+                "email_key": new_user.email_key,
+            },
+        )
+
         return result
 
+    async def get_token_generation(self, uuid: str) -> int | None:
+        """
+        사용자의 현재 토큰 세대를 조회한다
+
+        복제 지연으로 전체 로그아웃 이전 토큰이 허용되지 않도록 Primary에서 조회한다
+
+        :param uuid: 문자열 타입의 UUID
+        :return: 사용자의 토큰 세대를 반환하고, 사용자가 없다면 None을 반환한다
+        """
+
+        result = await self.session.execute(
+            _TOKEN_GENERATION_BY_UUID, {"uuid": uuid_to_binary(uuid)}
+        )
+        return result.scalar()
+
+    @write
+    async def increase_token_generation(self, uuid: str) -> None:
+        """
+        사용자의 토큰 세대를 1 증가시킨다
+
+        이전 세대로 발급된 accessToken, refreshToken은 모두 사용할 수 없게 된다
+
+        :param uuid: 문자열 타입의 UUID
+        :return:
+        """
+
+        q = (
+            update(User)
+            .where(User.uuid == uuid_to_binary(uuid))
+            .values(token_generation=User.token_generation + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+        await self.session.execute(q)
+
+        queue_invalidation(self.session, {"type": "user_changed", "uuid": uuid})
+
+    @write
+    async def update_is_active(self, user_id: int, is_active: bool) -> None:
+        """
+        계정 활성화 여부를 변경한다
+
+        commit 이후에 모든 worker의 사용자 캐시가 무효화된다
+
+        :param user_id: 사용자 Id 이다
+        :param is_active: 활성화 여부
+        :return:
+        """
+
+        q = (
+            update(User)
+            .where(User.id == user_id)
+            .values(is_active=int(is_active))
+            .execution_options(synchronize_session=False)
+        )
+
+        await self.session.execute(q)
+
+        queue_invalidation(self.session, {"type": "user_changed", "user_id": user_id})
+
 
 class UserLoginHistoryDAL(DalABC):
+    @write
     async def insert_login_history(self, login_history: schemas.LoginHistory) -> None:
         """
         로그인 접속 기록을 DB에 저장한다
         """
 
         _login_dict = login_history.model_dump()
-        _login_dict["ip_address"] = func.inet6_aton(_login_dict.get("ip_address"))
+        _login_dict["ip_address"] = ip_to_binary(_login_dict.get("ip_address"))
 
-        q = insert(UserLoginHistory).values(**_login_dict)
+        await self.session.execute(_INSERT_LOGIN_HISTORY, _login_dict)
 
-        await self.session.execute(q)
+    @write
+    async def insert_login_histories(
+        self, login_histories: list[schemas.LoginHistory]
+    ) -> None:
+        """
+        여러 로그인 접속 기록을 하나의 multi-row INSERT로 저장한다
+        """
+
+        if not login_histories:
+            return
+
+        values = []
+        for login_history in login_histories:
+            _login_dict = login_history.model_dump()
+            _login_dict["ip_address"] = ip_to_binary(_login_dict.get("ip_address"))
+            values.append(_login_dict)
+
+        # 여러 파라미터로 실행하면 executemany로 처리되며, asyncmy는 이를 multi-row INSERT로 전송한다
+        await self.session.execute(_INSERT_LOGIN_HISTORY, values)
+
+    @read_only
+    async def get_login_histories(
+        self, user_id: int, before_id: int | None, limit: int
+    ) -> list[Row]:
+        """
+        사용자의 로그인 이력을 최신순으로 조회한다
+
+        (user_id, id) keyset으로 페이지를 나누므로 idx_user_id(user_id, id)에서 이전 페이지의 위치부터 읽는다
+
+        :param user_id: 사용자 ID
+        :param before_id: 이전 페이지의 마지막 id로, 첫 페이지라면 None
+        :param limit: 조회할 개수
+        """
+
+        q = select(*_LOGIN_HISTORY_COLUMNS).where(_login_history.c.user_id == user_id)
+        if before_id is not None:
+            q = q.where(_login_history.c.id < before_id)
+        q = q.order_by(_login_history.c.id.desc()).limit(limit)
+
+        return (await self.session.execute(q)).all()
+
+    @read_only
+    async def stream_login_histories(
+        self,
+        user_id: int,
+        since: datetime | None,
+        until: datetime | None,
+        batch_size: int,
+    ) -> AsyncResult:
+        """
+        사용자의 로그인 이력을 id 순서로 조회하는 서버 측 cursor 결과를 반환한다
+
+        결과는 batch_size 개씩 가져오므로(yield_per) 이력 수와 관계없이 메모리 사용량이 일정하다
+        결과를 모두 읽을 때까지 연결을 사용하므로, 다른 쿼리를 실행하지 않는 별도 Session에서 사용한다
+
+        :param user_id: 사용자 ID
+        :param since: login_time 시작(포함)
+        :param until: login_time 끝(포함하지 않는다)
+        :param batch_size: 한 번에 가져올 행 수
+        """
+
+        q = select(*_LOGIN_HISTORY_COLUMNS).where(_login_history.c.user_id == user_id)
+        if since is not None:
+            q = q.where(_login_history.c.login_time >= since)
+        if until is not None:
+            q = q.where(_login_history.c.login_time < until)
+        q = q.order_by(_login_history.c.id).execution_options(yield_per=batch_size)
+
+        return await self.session.stream(q)
+
+    @read_only
+    async def stream_login_history_columns(
+        self, after_id: int, batch_size: int
+    ) -> AsyncResult:
+        """
+        로그인 분석에 사용할 (id, user_id, login_time(초), login_success)를 id 순서로 조회하는 서버 측 cursor
+        결과를 반환한다
+
+        login_time은 datetime 객체를 만들지 않도록 DB에서 1970-01-01 00:00:00부터의 초(정수)로 변환한다
+
+        PK(id)의 keyset으로 이전에 집계한 이력 이후만 읽으며, 결과는 batch_size 개씩 가져온다(yield_per)
+
+        :param after_id: 이전에 집계한 마지막 id
+        :param batch_size: 한 번에 가져올 행 수
+        """
+
+        dialect_name = self.session.get_bind().dialect.name
+
+        q = (
+            select(
+                _login_history.c.id,
+                _login_history.c.user_id,
+                _LOGIN_TIME_SECONDS[dialect_name],
+                _login_history.c.login_success,
+            )
+            .where(
+                _login_history.c.id > after_id, _login_history.c.user_id.is_not(None)
+            )
+            .order_by(_login_history.c.id)
+            .execution_options(yield_per=batch_size)
+        )
+
+        return await self.session.stream(q)
+
+    #########################
+    # 보관(archive)
+    #########################
+    # 보관 후 삭제할 데이터를 확인하므로 Replica가 아닌 Primary에서 조회한다
+    # MySQL partition 테이블이라면 login_time 조건으로 해당 partition만 읽는다(partition pruning)
+
+    @staticmethod
+    def _login_time_range(q, start: datetime | None, end: datetime):
+        q = q.where(_login_history.c.login_time < end)
+        if start is not None:
+            q = q.where(_login_history.c.login_time >= start)
+        return q
+
+    async def get_histories_for_archive(
+        self, start: datetime | None, end: datetime, after_id: int, limit: int
+    ) -> list[Row]:
+        """
+        login_time이 [start, end) 구간인 로그인 이력을 id 순서로 after_id 다음부터 limit 개 조회한다(keyset)
+
+        :param start: 구간 시작(None이면 end 이전의 모든 이력)
+        :param end: 구간 끝(포함하지 않는다)
+        :param after_id: 이전에 조회한 마지막 id
+        :param limit: 조회할 개수
+        """
+
+        q = (
+            self._login_time_range(select(_login_history), start, end)
+            .where(_login_history.c.id > after_id)
+            .order_by(_login_history.c.id)
+            .limit(limit)
+        )
+
+        return (await self.session.execute(q)).all()
+
+    async def count_histories(self, start: datetime | None, end: datetime) -> int:
+        q = self._login_time_range(
+            select(func.count()).select_from(_login_history), start, end
+        )
+
+        return await self.session.scalar(q)
+
+    async def get_oldest_login_time(self) -> datetime | None:
+        return await self.session.scalar(select(func.min(_login_history.c.login_time)))
+
+    @write
+    async def delete_histories(
+        self, start: datetime | None, end: datetime, first_id: int, last_id: int
+    ) -> int:
+        """
+        보관한 로그인 이력을 id 구간([first_id, last_id])으로 삭제한다
+
+        :return: 삭제된 이력 수
+        """
+
+        q = self._login_time_range(
+            delete(_login_history).where(
+                _login_history.c.id.between(first_id, last_id)
+            ),
+            start,
+            end,
+        )
+
+        result = await self.session.execute(q)
+        return result.rowcount
 
 
 class SocialUserDAL(DalABC):
+    @read_only
     async def get_user(self, provider_id: str, sub: str) -> User:
         """
         OAuth 사용자의 계정 정보를 조회하여 반환한다
@@ -129,23 +634,125 @@ class SocialUserDAL(DalABC):
         result = await self.session.execute(q)
         return result.scalars().first()
 
+    @read_only
+    async def get_login_user(self, provider_id: str, sub: str) -> Row | None:
+        """
+        OAuth 사용자의 로그인에 필요한 계정 정보만 조회한다
+
+        ORM 객체를 생성하지 않고 필요한 컬럼만 가진 Row를 반환한다
+        사용자 캐시를 사용하며, 쓰기를 실행한 Session에서는 캐시를 사용하지 않는다
+        """
+
+        async def load() -> Row | None:
+            result = await self.session.execute(
+                _SOCIAL_LOGIN_USER, {"provider_id": provider_id, "sub": sub}
+            )
+            return result.first()
+
+        if self.session.info.get(WROTE):
+            return await load()
+
+        return await user_cache.get(
+            ("social", provider_id, sub), load, owners=user_owners
+        )
+
+    @read_only
     async def exists_user(self, provider_id: str, sub: str) -> bool:
         """
         OAuth와 연동된 계정이 존재하는지 확인한다
+
+        사용자 캐시에 계정 정보가 있다면 DB를 조회하지 않는다
         """
 
-        exists_criteria = (
-            select(SocialUser.id)
-            .where(SocialUser.provider_id == provider_id)
-            .where(SocialUser.sub == sub)
-            .exists()
+        if user_cache.peek(("social", provider_id, sub)) is not None:
+            return True
+
+        result = await self.session.execute(
+            _EXISTS_SOCIAL_USER, {"provider_id": provider_id, "sub": sub}
         )
+        return bool(result.scalar())
 
-        q = select(SocialUser.id).where(exists_criteria)
+    async def get_or_create(
+        self, new_user: schemas.RegisterInsert, new_oauth_user: schemas.OAuthUserInsert
+    ) -> tuple[Row | LoginUser | None, bool]:
+        """
+        OAuth 계정으로 로그인할 사용자를 조회하고, 연동된 계정이 없다면 사용자와 OAuth 계정 정보를 추가한다
 
-        result = await self.session.execute(q)
-        return bool(result.all())
+        - 연동된 계정이 있다면 (provider_id, sub) 인덱스로 JOIN 한 번에 조회한다(사용자 캐시 사용)
+        - 없다면 SAVEPOINT 안에서 사용자와 OAuth 계정 정보를 추가하고, 저장한 값으로 결과를 만들어서 다시 조회하지 않는다
+        - 같은 계정의 요청이 동시에 처리되면 uq_email_key_provider_id, uq_provider_id_sub 중복으로 먼저 처리된
+          요청만 추가되고,
+          나머지 요청은 SAVEPOINT를 rollback 한 뒤 먼저 추가된 계정을 조회한다
+
+        추가되었다면 호출한 쪽에서 commit 해야 한다
+
+        :param new_user: 연동된 계정이 없을 때 추가할 사용자 정보
+        :param new_oauth_user: 연동된 계정이 없을 때 추가할 OAuth 계정 정보로, user_id는 추가한 사용자 id로 채운다
+        :return: (로그인 사용자, 추가 여부)를 반환한다. 다른 사용자와 중복되어 추가할 수 없다면 사용자는 None이다
+        """
 
+        provider_id, sub = new_oauth_user.provider_id, new_oauth_user.sub
+
+        login_user = await self.get_login_user(provider_id=provider_id, sub=sub)
+        if login_user:
+            return login_user, False
+
+        try:
+            async with self.session.begin_nested():
+                result = await UserDAL(session=self.session).insert_user(
+                    new_user=new_user
+                )
+                user_id = result.inserted_primary_key[0]
+
+                if not await self._upsert_user(
+                    new_user=new_oauth_user.model_copy(update={"user_id": user_id})
+                ):
+                    # 다른 요청이 먼저 연동한 계정이므로 추가한 사용자를 취소한다
+                    raise _SocialUserExists()
+        except (IntegrityError, _SocialUserExists):
+            # SAVEPOINT rollback으로는 등록된 무효화 이벤트가 삭제되지 않지만, 캐시를 한 번 더 비울 뿐이다
+            result = await self.session.execute(
+                _SOCIAL_LOGIN_USER_LOCKED, {"provider_id": provider_id, "sub": sub}
+            )
+            return result.first(), False
+
+        login_user = LoginUser(
+            id=user_id,
+            uuid=new_user.uuid,
+            name=new_user.name,
+            password=new_user.password,
+            salt=new_user.salt,
+            is_active=new_user.is_active,
+            token_generation=0,
+        )
+        return login_user, True
+
+    @write
+    async def _upsert_user(self, new_user: schemas.OAuthUserInsert) -> bool:
+        """
+        OAuth 연동 계정 정보를 저장하고, (provider_id, sub)가 이미 존재하여 저장하지 않았다면 False를 반환한다
+        """
+
+        dialect_name = self.session.get_bind().dialect.name
+
+        result = await self.session.execute(
+            _UPSERT_SOCIAL_USER[dialect_name], new_user.model_dump()
+        )
+        if result.rowcount != 1:
+            return False
+
+        queue_invalidation(
+            self.session,
+            {
+                "type": "social_user_inserted",
+                "user_id": new_user.user_id,
+                "provider_id": new_user.provider_id,
+                "sub": new_user.sub,
+            },
+        )
+        return True
+
+    @write
     async def insert_user(self, new_user: schemas.OAuthUserInsert):
         """
         OAuth 연동 계정 정보를 저장한다
@@ -154,3 +761,47 @@ class SocialUserDAL(DalABC):
         q = insert(SocialUser).values(**new_user.model_dump())
 
         await self.session.execute(q)
+
+        queue_invalidation(
+            self.session,
+            {
+                "type": "social_user_inserted",
+                "user_id": new_user.user_id,
+                "provider_id": new_user.provider_id,
+                "sub": new_user.sub,
+            },
+        )
+
+
+async def _load_login_users_by_ids(user_ids: list[int]) -> dict[int, Row]:
+    async with async_session() as session:
+        rows = await UserDAL(session=session).get_login_users_by_ids(user_ids=user_ids)
+
+    return {row.id: row for row in rows}
+
+
+async def _load_login_users_by_email_keys(
+    keys: list[tuple[str, str]]
+) -> dict[tuple[str, str], Row]:
+    email_keys_by_provider: dict[str, list[str]] = {}
+    for email_key, provider_id in keys:
+        email_keys_by_provider.setdefault(provider_id, []).append(email_key)
+
+    results = {}
+    async with async_session() as session:
+        user_dal = UserDAL(session=session)
+        for provider_id, email_keys in email_keys_by_provider.items():
+            rows = await user_dal.get_login_users_by_email_keys(
+                email_keys=email_keys, provider_id=provider_id
+            )
+            results.update({(row.email_key, provider_id): row for row in rows})
+
+    return results
+
+
+login_user_by_id_loader = create_batch_loader(
+    "UserDAL.get_login_user_by_id", _load_login_users_by_ids
+)
+login_user_by_email_loader = create_batch_loader(
+    "UserDAL.get_login_user_by_email", _load_login_users_by_email_keys
+)
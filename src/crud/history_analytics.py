@@ -0,0 +1,450 @@
+import asyncio
+import math
+import time
+from datetime import datetime
+
+from loguru import logger
+from sqlalchemy.orm import sessionmaker
+
+from core.config import settings
+from core.metrics import metrics
+from crud.crud_user import UserLoginHistoryDAL
+from db.base import async_session
+from db.shard import shard_sessions
+
+try:
+    # numpy는 선택 의존성으로, 설치되어 있지 않다면 로그인 분석을 사용할 수 없다
+    import numpy as np
+except ImportError:
+    np = None
+
+analytics_rows = metrics.counter(
+    "login_analytics_rows_total", "로그인 분석 집계에 반영한 로그인 이력 수"
+)
+analytics_refresh_seconds = metrics.histogram(
+    "login_analytics_refresh_seconds", "로그인 분석 집계를 갱신하는 데 걸린 시간(초)"
+)
+
+HOURS_PER_DAY = 24
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 86400
+
+# (user_id, 일) 쌍을 하나의 int64로 저장할 때 일(1970-01-01부터의 일 수)에 사용하는 bit 수
+_DAY_BITS = 16
+
+# 사용자별 로그인 시간대의 표준편차 최솟값(시간)으로, 매일 같은 시간에만 로그인한 사용자의 점수가 과도하게 커지지 않도록 한다
+_MIN_HOUR_STD = 1.0
+
+# 활성 일수 분포의 구간(이상, 미만)
+_ACTIVE_DAYS_BUCKETS = ((1, 2), (2, 4), (4, 8), (8, 15), (15, 31), (31, None))
+
+
+class LoginAggregates:
+    """
+    로그인 이력의 column 배열(NumPy)로 갱신하는 누적 집계
+
+    - 시간(epoch hour)별 로그인 성공/실패 수
+    - 시간대(0~23시)별 로그인 성공 수와, 사용자별 로그인 시각을 원형(circular) 분포로 본 평균 시간/표준편차
+    - 사용자별 활성 일수(로그인 이력이 있는 날의 수)
+    - 사용자의 평소 로그인 시간대에서 벗어난 정도(anomaly score)가 큰 로그인 top_k 개
+
+    모든 계산은 배열 연산으로 처리하며, 행 단위의 Python 반복문을 실행하지 않는다
+    """
+
+    def __init__(self, min_logins: int, top_k: int):
+        self._min_logins = min_logins
+        self._top_k = top_k
+
+        self.rows = 0
+
+        # 시간별 로그인 수, _hour_base(epoch hour)부터의 index
+        self._hour_base: int | None = None
+        self._hourly_success = np.zeros(0, dtype=np.int64)
+        self._hourly_failure = np.zeros(0, dtype=np.int64)
+
+        # 시간대(0~23시)별 로그인 성공 수
+        self._hour_of_day = np.zeros(HOURS_PER_DAY, dtype=np.int64)
+
+        # user_id를 index로 하는 로그인 성공 수와 로그인 시각(각도)의 cos/sin 합
+        # 사용자별 평균 시간/표준편차는 이 값으로 계산하므로, 사용자마다 24 byte(가장 큰 user_id 기준)를 사용한다
+        self._user_logins = np.zeros(0, dtype=np.int64)
+        self._user_cos = np.zeros(0, dtype=np.float64)
+        self._user_sin = np.zeros(0, dtype=np.float64)
+
+        # 정렬된 (user_id << _DAY_BITS | 일) 목록, 갱신 중 추가된 값은 compact()에서 합친다
+        self._user_days = np.zeros(0, dtype=np.int64)
+        self._pending_user_days: list = []
+
+        # anomaly score가 큰 로그인(id, DB 번호, user_id, epoch seconds, score)
+        self._anomaly_ids = np.zeros(0, dtype=np.int64)
+        self._anomaly_sources = np.zeros(0, dtype=np.int64)
+        self._anomaly_users = np.zeros(0, dtype=np.int64)
+        self._anomaly_times = np.zeros(0, dtype=np.int64)
+        self._anomaly_scores = np.zeros(0, dtype=np.float64)
+
+    def update(self, ids, user_ids, seconds, success, source: int = 0) -> None:
+        """
+        로그인 이력 batch를 집계에 반영한다
+
+        :param ids: 로그인 이력 id(int64)
+        :param user_ids: 사용자 ID(int64)
+        :param seconds: login_time의 epoch 초(int64, DB에 저장된 시각 그대로의 시간대)
+        :param success: 로그인 성공 여부(bool)
+        :param source: 이력을 읽은 DB의 번호(shard마다 id가 따로 증가하므로 anomaly 로그인을 구분하는 데 사용한다)
+        """
+
+        if len(ids) == 0:
+            return
+
+        self.rows += len(ids)
+        hours = seconds // SECONDS_PER_HOUR
+
+        self._update_hourly(hours, success)
+        self._update_users(user_ids, seconds, success)
+        self._pending_user_days.append(
+            _sorted_unique((user_ids << _DAY_BITS) | (seconds // SECONDS_PER_DAY))
+        )
+        self._update_anomalies(ids, user_ids, seconds, source)
+
+    def _update_hourly(self, hours, success) -> None:
+        low, high = int(hours.min()), int(hours.max())
+
+        if self._hour_base is None:
+            self._hour_base = low
+        elif low < self._hour_base:
+            # 이전 batch보다 오래된 이력(spill 파일에서 다시 저장된 이력 등)이라면 배열 앞을 늘린다
+            pad = self._hour_base - low
+            self._hourly_success = np.concatenate(
+                [np.zeros(pad, dtype=np.int64), self._hourly_success]
+            )
+            self._hourly_failure = np.concatenate(
+                [np.zeros(pad, dtype=np.int64), self._hourly_failure]
+            )
+            self._hour_base = low
+
+        size = max(high - self._hour_base + 1, len(self._hourly_success))
+        offsets = hours - self._hour_base
+
+        self._hourly_success = _grow(self._hourly_success, size) + np.bincount(
+            offsets[success], minlength=size
+        )
+        self._hourly_failure = _grow(self._hourly_failure, size) + np.bincount(
+            offsets[~success], minlength=size
+        )
+
+    def _update_users(self, user_ids, seconds, success) -> None:
+        size = int(user_ids.max()) + 1
+        if size > len(self._user_logins):
+            # 사용자가 늘어날 때마다 배열을 다시 만들지 않도록 두 배씩 늘린다
+            size = max(size, len(self._user_logins) * 2)
+            self._user_logins = _grow(self._user_logins, size)
+            self._user_cos = _grow(self._user_cos, size)
+            self._user_sin = _grow(self._user_sin, size)
+
+        users = user_ids[success]
+        angles = (seconds[success] % SECONDS_PER_DAY) * (2 * np.pi / SECONDS_PER_DAY)
+
+        np.add.at(self._user_logins, users, 1)
+        np.add.at(self._user_cos, users, np.cos(angles))
+        np.add.at(self._user_sin, users, np.sin(angles))
+
+        self._hour_of_day += np.bincount(
+            (seconds[success] % SECONDS_PER_DAY) // SECONDS_PER_HOUR,
+            minlength=HOURS_PER_DAY,
+        )
+
+    def _hour_profile(self, user_ids):
+        """
+        사용자별 로그인 성공 수, 평균 로그인 시간(원형 평균), 표준편차(원형 표준편차)를 반환한다
+
+        로그인 시각을 하루를 한 바퀴로 하는 각도로 보므로 23시와 1시의 차이는 2시간이다
+        """
+
+        totals = self._user_logins[user_ids]
+        cos = self._user_cos[user_ids]
+        sin = self._user_sin[user_ids]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            resultant = np.clip(np.hypot(cos, sin) / totals, 1e-12, 1.0)
+
+        mean_hours = np.mod(np.arctan2(sin, cos), 2 * np.pi) * (
+            HOURS_PER_DAY / (2 * np.pi)
+        )
+        std_hours = np.sqrt(-2 * np.log(resultant)) * (HOURS_PER_DAY / (2 * np.pi))
+
+        return totals, mean_hours, std_hours
+
+    def _update_anomalies(self, ids, user_ids, seconds, source: int) -> None:
+        totals, mean_hours, std_hours = self._hour_profile(user_ids)
+        hours = (seconds % SECONDS_PER_DAY) / SECONDS_PER_HOUR
+
+        # 평균 시간과의 원형 거리(시간)를 사용자의 표준편차로 나눈 값
+        distance = np.abs(hours - mean_hours)
+        distance = np.minimum(distance, HOURS_PER_DAY - distance)
+        scores = distance / np.maximum(std_hours, _MIN_HOUR_STD)
+        # 로그인 성공 이력이 적은 사용자는 평소 시간대를 알 수 없으므로 점수를 계산하지 않는다
+        scores[totals < self._min_logins] = 0
+
+        self._anomaly_ids = np.concatenate([self._anomaly_ids, ids])
+        self._anomaly_sources = np.concatenate(
+            [self._anomaly_sources, np.full(len(ids), source, dtype=np.int64)]
+        )
+        self._anomaly_users = np.concatenate([self._anomaly_users, user_ids])
+        self._anomaly_times = np.concatenate([self._anomaly_times, seconds])
+        self._anomaly_scores = np.concatenate([self._anomaly_scores, scores])
+
+        if len(self._anomaly_scores) > self._top_k:
+            keep = np.argpartition(self._anomaly_scores, -self._top_k)[-self._top_k :]
+            self._anomaly_ids = self._anomaly_ids[keep]
+            self._anomaly_sources = self._anomaly_sources[keep]
+            self._anomaly_users = self._anomaly_users[keep]
+            self._anomaly_times = self._anomaly_times[keep]
+            self._anomaly_scores = self._anomaly_scores[keep]
+
+    def compact(self) -> None:
+        """
+        갱신 중 추가된 (user_id, 일) 목록을 합친다
+        """
+
+        if self._pending_user_days:
+            self._user_days = _sorted_unique(
+                np.concatenate([self._user_days, *self._pending_user_days])
+            )
+            self._pending_user_days = []
+
+    def snapshot(self, hours: int, top: int) -> dict:
+        """
+        :param hours: 반환할 시간별 로그인 수의 기간(최근 hours 시간)
+        :param top: 반환할 anomaly 로그인 수
+        """
+
+        self.compact()
+
+        hourly = {"start": None, "success": [], "failure": []}
+        if self._hour_base is not None:
+            start = max(len(self._hourly_success) - hours, 0)
+            hourly = {
+                "start": _isoformat((self._hour_base + start) * SECONDS_PER_HOUR),
+                "success": self._hourly_success[start:].tolist(),
+                "failure": self._hourly_failure[start:].tolist(),
+            }
+
+        # _user_days는 정렬되어 있으므로 user_id가 바뀌는 위치로 사용자별 활성 일수를 구한다
+        day_users = self._user_days >> _DAY_BITS
+        boundaries = np.flatnonzero(np.diff(day_users)) + 1
+        active_days = (
+            np.diff(np.concatenate([[0], boundaries, [len(day_users)]]))
+            if len(day_users)
+            else day_users
+        )
+
+        active = {"users": int(len(active_days))}
+        if len(active_days):
+            active.update(
+                mean=float(active_days.mean()),
+                p50=float(np.percentile(active_days, 50)),
+                p90=float(np.percentile(active_days, 90)),
+                p99=float(np.percentile(active_days, 99)),
+                max=int(active_days.max()),
+                buckets={
+                    f"{low}-{high - 1}"
+                    if high
+                    else f"{low}+": int(
+                        np.count_nonzero(
+                            (active_days >= low) & (active_days < (high or math.inf))
+                        )
+                    )
+                    for low, high in _ACTIVE_DAYS_BUCKETS
+                },
+            )
+
+        order = np.argsort(self._anomaly_scores)[::-1][:top]
+        order = order[self._anomaly_scores[order] > 0]
+        _, mean_hours, std_hours = self._hour_profile(self._anomaly_users[order])
+
+        return {
+            "rows": self.rows,
+            "hourly": hourly,
+            "hour_of_day": self._hour_of_day.tolist(),
+            "active_days": active,
+            "anomalies": [
+                {
+                    "id": int(login_id),
+                    "source": int(source),
+                    "user_id": int(user_id),
+                    "login_time": _isoformat(seconds),
+                    "score": round(float(score), 2),
+                    "usual_hour": round(float(usual_hour), 1),
+                    "hour_std": round(float(hour_std), 1),
+                }
+                for (
+                    login_id,
+                    source,
+                    user_id,
+                    seconds,
+                    score,
+                    usual_hour,
+                    hour_std,
+                ) in zip(
+                    self._anomaly_ids[order],
+                    self._anomaly_sources[order],
+                    self._anomaly_users[order],
+                    self._anomaly_times[order],
+                    self._anomaly_scores[order],
+                    mean_hours,
+                    std_hours,
+                )
+            ],
+        }
+
+
+def _sorted_unique(values):
+    # np.unique보다 정렬 후 이전 값과 다른 값만 남기는 것이 빠르다
+    values = np.sort(values)
+    if len(values) == 0:
+        return values
+    return values[np.concatenate([[True], values[1:] != values[:-1]])]
+
+
+def _grow(values, size: int):
+    if len(values) >= size:
+        return values
+    return np.concatenate([values, np.zeros(size - len(values), dtype=values.dtype)])
+
+
+def _isoformat(seconds) -> str:
+    # epoch 초를 DB에 저장된 시각(시간대 변환 없음)의 ISO 8601 문자열로 변환한다
+    return str(np.datetime64(int(seconds), "s"))
+
+
+def to_columns(rows) -> tuple:
+    """
+    (id, user_id, login_time(초), login_success) 행 목록을 column 배열로 변환한다
+    """
+
+    ids, user_ids, seconds, successes = zip(*rows)
+
+    return (
+        np.array(ids, dtype=np.int64),
+        np.array(user_ids, dtype=np.int64),
+        np.array(seconds, dtype=np.int64),
+        np.array(successes, dtype=bool),
+    )
+
+
+class LoginAnalytics:
+    """
+    user_login_history를 column batch로 읽어 LoginAggregates에 누적하는 로그인 분석
+
+    - 이전에 반영한 마지막 id 이후의 이력만 읽어서 집계를 갱신한다(증분 갱신)
+    - 갱신한 지 refresh_interval 초가 지나지 않았다면 DB를 조회하지 않고 집계를 그대로 반환한다
+    - 서버 측 cursor로 batch_size 만큼씩 읽으므로 이력 수와 관계없이 조회 결과의 메모리 사용량이 일정하다
+    - Replica를 사용할 수 있다면 Replica에서, shard를 사용한다면 각 shard에서 읽는다
+    - 집계는 worker 프로세스별로 유지하며, 보관(archive)되어 삭제된 이력도 이미 반영된 집계에는 남아있다
+    """
+
+    def __init__(
+        self, refresh_interval: float, batch_size: int, min_logins: int, top_k: int
+    ):
+        self._refresh_interval = refresh_interval
+        self._batch_size = batch_size
+        self._min_logins = min_logins
+        self._top_k = top_k
+
+        self._aggregates: LoginAggregates | None = None
+        self._last_ids: dict[str, int] = {}
+        self._refreshed_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def available(self) -> bool:
+        return np is not None
+
+    def _targets(self) -> list[tuple[str, sessionmaker]]:
+        if not shard_sessions:
+            return [("primary", async_session)]
+
+        return [
+            (f"shard{shard_id}", factory)
+            for shard_id, factory in enumerate(shard_sessions)
+        ]
+
+    async def refresh(self, force: bool = False) -> int:
+        """
+        마지막으로 반영한 이력 이후의 이력을 집계에 반영한다
+
+        :return: 반영한 이력 수
+        """
+
+        async with self._lock:
+            if (
+                not force
+                and self._refreshed_at is not None
+                and time.monotonic() - self._refreshed_at < self._refresh_interval
+            ):
+                return 0
+
+            if self._aggregates is None:
+                self._aggregates = LoginAggregates(
+                    min_logins=self._min_logins, top_k=self._top_k
+                )
+
+            started = time.perf_counter()
+            total = 0
+            for source, (name, session_factory) in enumerate(self._targets()):
+                total += await self._refresh_target(source, name, session_factory)
+            self._aggregates.compact()
+
+            analytics_refresh_seconds.observe(time.perf_counter() - started)
+            self._refreshed_at = time.monotonic()
+
+            if total:
+                logger.info(
+                    f"로그인 분석 집계를 갱신하였습니다. { {'rows': total, 'seconds': round(time.perf_counter() - started, 3)} }"
+                )
+
+            return total
+
+    async def _refresh_target(
+        self, source: int, name: str, session_factory: sessionmaker
+    ) -> int:
+        total = 0
+
+        async with session_factory() as session:
+            result = await UserLoginHistoryDAL(
+                session=session
+            ).stream_login_history_columns(
+                after_id=self._last_ids.get(name, 0), batch_size=self._batch_size
+            )
+
+            async for rows in result.partitions():
+                ids, user_ids, seconds, success = to_columns(rows)
+                self._aggregates.update(ids, user_ids, seconds, success, source=source)
+
+                self._last_ids[name] = int(ids[-1])
+                total += len(ids)
+                analytics_rows.inc(len(ids))
+
+        return total
+
+    async def snapshot(self, hours: int, top: int) -> dict:
+        await self.refresh()
+
+        snapshot = self._aggregates.snapshot(hours=hours, top=top)
+        names = [name for name, _ in self._targets()]
+        for anomaly in snapshot["anomalies"]:
+            anomaly["db"] = names[anomaly.pop("source")]
+
+        return {
+            **snapshot,
+            "refreshed_at": datetime.now().isoformat(timespec="seconds"),
+            "last_ids": dict(self._last_ids),
+        }
+
+
+login_analytics = LoginAnalytics(
+    refresh_interval=settings.login_analytics_refresh_seconds,
+    batch_size=settings.login_analytics_batch_size,
+    min_logins=settings.login_analytics_min_logins,
+    top_k=settings.login_analytics_top_k,
+)
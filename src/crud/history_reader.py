@@ -0,0 +1,101 @@
+import json
+from datetime import datetime
+from typing import AsyncIterator
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import schemas
+from core.metrics import metrics
+from crud.crud_user import UserLoginHistoryDAL
+from db.base import async_session
+from db.shard import shard_for, shard_session
+from utils.strings import binary_to_ip
+
+exported_rows = metrics.counter(
+    "login_history_exported_rows_total", "NDJSON으로 내보낸 로그인 이력 수"
+)
+
+# 내보내기에서 서버 측 cursor로 한 번에 가져오는 행 수
+EXPORT_BATCH_SIZE = 1000
+
+
+def history_session(user_uuid: bytes) -> AsyncSession:
+    """
+    사용자의 로그인 이력이 저장된 DB의 Session을 생성한다(shard를 사용한다면 사용자의 shard)
+    """
+
+    shard_id = shard_for(user_uuid)
+    if shard_id is None:
+        return async_session()
+
+    return shard_session(shard_id)
+
+
+def to_history_info(row: Row) -> schemas.LoginHistoryInfo:
+    return schemas.LoginHistoryInfo(
+        id=row.id,
+        login_time=row.login_time,
+        login_success=bool(row.login_success),
+        ip_address=binary_to_ip(row.ip_address),
+    )
+
+
+def to_ndjson(row: Row) -> str:
+    # 행마다 pydantic 모델을 만들지 않고 바로 직렬화한다
+    return json.dumps(
+        {
+            "id": row.id,
+            "login_time": row.login_time.isoformat() if row.login_time else None,
+            "login_success": bool(row.login_success),
+            "ip_address": binary_to_ip(row.ip_address),
+        },
+        separators=(",", ":"),
+    )
+
+
+async def list_login_histories(
+    user_id: int, user_uuid: bytes, cursor: str | None, limit: int
+) -> tuple[list[schemas.LoginHistoryInfo], str | None]:
+    """
+    사용자의 로그인 이력을 최신순으로 limit 개 반환한다
+
+    :param cursor: 이전 응답의 next_cursor 값으로, 올바르지 않다면 ValueError를 발생시킨다
+    :return: 로그인 이력 목록, 다음 페이지의 cursor(마지막 페이지라면 None)
+    """
+
+    before_id = int(cursor) if cursor is not None else None
+
+    async with history_session(user_uuid) as session:
+        # 다음 페이지가 존재하는지 확인하기 위해 limit보다 하나 더 조회한다
+        rows = await UserLoginHistoryDAL(session=session).get_login_histories(
+            user_id=user_id, before_id=before_id, limit=limit + 1
+        )
+
+    next_cursor = str(rows[limit - 1].id) if len(rows) > limit else None
+
+    return [to_history_info(r) for r in rows[:limit]], next_cursor
+
+
+async def export_login_histories(
+    user_id: int,
+    user_uuid: bytes,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    사용자의 로그인 이력을 id 순서로 한 줄에 하나씩(NDJSON) 반환하는 async generator
+
+    서버 측 cursor에서 batch_size 만큼씩 읽어 바로 전송하므로, 이력 수와 관계없이 메모리 사용량이 일정하다
+    응답이 끝나거나 연결이 끊어지면 Session을 닫는다
+    """
+
+    async with history_session(user_uuid) as session:
+        result = await UserLoginHistoryDAL(session=session).stream_login_histories(
+            user_id=user_id, since=since, until=until, batch_size=batch_size
+        )
+
+        async for rows in result.partitions():
+            yield "".join(to_ndjson(row) + "\n" for row in rows).encode("utf-8")
+            exported_rows.inc(len(rows))
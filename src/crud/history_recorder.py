@@ -0,0 +1,478 @@
+import asyncio
+import glob
+import json
+import os
+import time
+from collections import deque
+from datetime import datetime
+from typing import TextIO
+
+from loguru import logger
+from sqlalchemy.orm import sessionmaker
+
+import schemas
+from core.config import settings
+from core.metrics import metrics
+from crud.crud_user import UserLoginHistoryDAL
+from crud.loader import BATCH_SIZE_BUCKETS
+from db.base import async_session
+from db.shard import shard_for, shard_sessions
+from utils.strings import binary_to_uuid, uuid_to_binary
+
+history_queue_size = metrics.gauge("login_history_queue_size", "저장 대기 중인 로그인 이력 수")
+history_flush_sizes = metrics.histogram(
+    "login_history_flush_size",
+    "한 번의 INSERT로 저장한 로그인 이력 수",
+    buckets=BATCH_SIZE_BUCKETS + (512, 1024),
+)
+history_spilled = metrics.counter(
+    "login_history_spilled_total", "대기열이 가득 찼거나 저장에 실패하여 spill 파일에 기록한 로그인 이력 수"
+)
+history_replayed = metrics.counter(
+    "login_history_replayed_total", "spill 파일에서 읽어 DB에 저장한 로그인 이력 수"
+)
+history_dropped = metrics.counter(
+    "login_history_dropped_total", "spill 파일 기록이 밀려 대기 한도를 넘어 버린 로그인 이력 수"
+)
+history_corrupted = metrics.counter(
+    "login_history_corrupted_total", "spill 파일에서 읽을 수 없어 격리 파일로 옮긴 줄 수"
+)
+
+# spill 파일 이름: login_history.{pid}.jsonl(기록 중), login_history.{pid}.{n}.replay(다시 저장 중)
+# 읽을 수 없는 줄은 login_history.corrupt.{pid}.jsonl로 옮기며, 다시 저장하지 않는다
+_SPILL_PREFIX = "login_history."
+_CORRUPT_PREFIX = f"{_SPILL_PREFIX}corrupt."
+
+# spill 파일은 이 시간(초)마다 확인하여 다시 저장한다
+_REPLAY_INTERVAL_SECONDS = 5
+
+
+def _encode(login_history: schemas.LoginHistory) -> str:
+    return json.dumps(
+        {
+            "user_id": login_history.user_id,
+            "user_uuid": binary_to_uuid(login_history.user_uuid),
+            "login_time": login_history.login_time.isoformat(),
+            "login_success": login_history.login_success,
+            "ip_address": login_history.ip_address,
+        }
+    )
+
+
+def _decode(line: str) -> schemas.LoginHistory:
+    data = json.loads(line)
+    return schemas.LoginHistory(
+        user_id=data["user_id"],
+        user_uuid=uuid_to_binary(data["user_uuid"]),
+        login_time=datetime.fromisoformat(data["login_time"]),
+        login_success=data["login_success"],
+        ip_address=data["ip_address"],
+    )
+
+
+def _decode_lines(lines: list[str]) -> tuple[list[schemas.LoginHistory], list[str]]:
+    """
+    spill 파일의 줄을 로그인 이력으로 변환하고, 변환하지 못한 줄(기록 중 종료되어 잘린 줄 등)은 따로 반환한다
+    """
+
+    login_histories = []
+    corrupted = []
+    for line in lines:
+        if not line.strip():
+            continue
+
+        try:
+            login_histories.append(_decode(line))
+        except (ValueError, KeyError, TypeError):
+            corrupted.append(line if line.endswith("\n") else line + "\n")
+
+    return login_histories, corrupted
+
+
+def _read_lines(f: TextIO, size: int | None) -> list[str]:
+    if size is None:
+        return f.readlines()
+
+    return [line for _, line in zip(range(size), f)]
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+    return True
+
+
+class LoginHistoryRecorder:
+    """
+    로그인 이력을 메모리 대기열에 모아 로그인 트랜잭션과 별도로 저장하는 write-behind 작업
+
+    - 로그인 요청은 대기열에 추가만 하고 바로 반환하므로, 로그인 트랜잭션에는 user_login_history INSERT가 포함되지 않는다
+    - flush_interval 초마다 또는 flush_size 만큼 모이면 multi-row INSERT로 저장하며, 요청 세션이 아닌 별도
+      세션(연결)을 사용한다
+    - 대기열은 max_queue_size 까지만 메모리에 유지하고, DB가 느려 대기열이 가득 차면 이후의 이력은 로컬 spill 파일에 기록한다
+    - spill 파일에 기록할 이력도 max_queue_size 까지만 유지하며, spill 디렉토리가 느리거나 쓸 수 없어 밀리면
+      로그인 요청을 기다리게 하지 않고 이후의 이력을 버린다(login_history_dropped_total)
+    - 저장에 실패한 이력도 spill 파일에 기록하며, 이후 저장에 성공하면 spill 파일의 이력을 다시 저장한다
+    - spill 파일 읽기/쓰기는 event loop를 막지 않도록 asyncio.to_thread()로 실행한다
+    - spill 파일에서 읽을 수 없는 줄은 격리 파일로 옮기고 나머지 이력을 저장한다
+    - 종료(stop) 시 대기열의 이력을 모두 저장하고, 저장하지 못한 이력은 spill 파일에 남긴다
+    - 종료되지 않은 다른 worker의 spill 파일은 건드리지 않으며, 종료된 worker의 spill 파일은 다른 worker가 이어서 저장한다
+    - shard를 사용한다면 사용자의 shard별로 나누어 저장한다
+    """
+
+    def __init__(
+        self,
+        flush_interval: float,
+        flush_size: int,
+        max_queue_size: int,
+        spill_dir: str,
+    ):
+        self._flush_interval = flush_interval
+        self._flush_size = flush_size
+        self._max_queue_size = max_queue_size
+        self._spill_dir = spill_dir
+
+        self._queue: deque[schemas.LoginHistory] = deque()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+        self._spill_file: TextIO | None = None
+        self._spill_lock = asyncio.Lock()
+        # 대기열이 가득 차서 spill 파일에 기록할 이력으로, max_queue_size 까지만 유지한다
+        self._overflow: list[schemas.LoginHistory] = []
+        self._overflow_task: asyncio.Task | None = None
+        self._replay_count = 0
+        self._next_replay = 0.0
+
+    @property
+    def _spill_path(self) -> str:
+        # gunicorn은 app을 불러온 이후 worker를 fork 할 수 있으므로, pid는 사용하는 시점에 확인한다
+        return os.path.join(self._spill_dir, f"{_SPILL_PREFIX}{os.getpid()}.jsonl")
+
+    @property
+    def _corrupt_path(self) -> str:
+        return os.path.join(self._spill_dir, f"{_CORRUPT_PREFIX}{os.getpid()}.jsonl")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        # 저장 중인 이력을 잃지 않도록 작업을 취소하지 않고, 진행 중인 저장이 끝나면 종료한다
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+
+        await self.flush()
+        if self._overflow_task is not None:
+            await self._overflow_task
+        self._close_spill_file()
+
+    def record(self, login_history: schemas.LoginHistory) -> None:
+        """
+        로그인 이력을 저장 대기열에 추가한다, 대기열이 가득 찼다면 spill 파일에 기록한다
+
+        spill 파일에 기록할 이력도 max_queue_size 만큼 밀려 있다면 버린다
+
+        :param login_history: 로그인 이력
+        """
+
+        if len(self._queue) >= self._max_queue_size:
+            # record()는 로그인 요청에서 호출되므로 spill 파일 기록을 기다리지 않고 버린다
+            if len(self._overflow) >= self._max_queue_size:
+                history_dropped.inc()
+                return
+
+            self._overflow.append(login_history)
+            if self._overflow_task is None:
+                self._overflow_task = asyncio.create_task(self._spill_overflow())
+            return
+
+        self._queue.append(login_history)
+        history_queue_size.set(len(self._queue))
+
+        if len(self._queue) >= self._flush_size:
+            self._wakeup.set()
+
+    async def flush(self) -> bool:
+        """
+        대기열의 로그인 이력을 flush_size 만큼씩 나누어 저장한다
+
+        저장에 실패하면 DB에 문제가 있는 것으로 보고, 남은 대기열을 모두 spill 파일에 기록한다
+
+        :return: 모두 저장되었다면 True
+        """
+
+        while self._queue:
+            batch = [
+                self._queue.popleft()
+                for _ in range(min(self._flush_size, len(self._queue)))
+            ]
+            history_queue_size.set(len(self._queue))
+
+            failed = await self._save(batch)
+            if failed:
+                await self._spill(failed + list(self._queue))
+                self._queue.clear()
+                history_queue_size.set(0)
+                return False
+
+        return True
+
+    async def _save(
+        self, batch: list[schemas.LoginHistory]
+    ) -> list[schemas.LoginHistory]:
+        """
+        로그인 이력을 저장하고, 저장하지 못한 이력을 반환한다
+        """
+
+        if not shard_sessions:
+            groups = {None: batch}
+        else:
+            groups: dict[int | None, list[schemas.LoginHistory]] = {}
+            for login_history in batch:
+                groups.setdefault(shard_for(login_history.user_uuid), []).append(
+                    login_history
+                )
+
+        results = await asyncio.gather(
+            *(
+                self._insert(
+                    async_session if shard_id is None else shard_sessions[shard_id],
+                    group,
+                )
+                for shard_id, group in groups.items()
+            ),
+            return_exceptions=True,
+        )
+
+        failed = []
+        for (shard_id, group), result in zip(groups.items(), results):
+            if isinstance(result, Exception):
+                logger.warning(
+                    f"로그인 이력 저장에 실패하였습니다. { {'shard': shard_id, 'size': len(group), 'error': repr(result)} }"
+                )
+                failed.extend(group)
+
+        return failed
+
+    @staticmethod
+    async def _insert(
+        session_factory: sessionmaker, login_histories: list[schemas.LoginHistory]
+    ) -> None:
+        history_flush_sizes.observe(len(login_histories))
+
+        async with session_factory() as session:
+            try:
+                await UserLoginHistoryDAL(session=session).insert_login_histories(
+                    login_histories
+                )
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+    #########################
+    # spill file
+    #########################
+    async def _spill(self, login_histories: list[schemas.LoginHistory]) -> None:
+        if not login_histories:
+            return
+
+        async with self._spill_lock:
+            await asyncio.to_thread(self._write_spill, login_histories)
+
+        history_spilled.inc(len(login_histories))
+
+    def _write_spill(self, login_histories: list[schemas.LoginHistory]) -> None:
+        if self._spill_file is None:
+            os.makedirs(self._spill_dir, exist_ok=True)
+            self._spill_file = open(self._spill_path, "a", encoding="utf-8")
+
+        self._spill_file.writelines(
+            _encode(login_history) + "\n" for login_history in login_histories
+        )
+        self._spill_file.flush()
+
+    async def _spill_overflow(self) -> None:
+        """
+        대기열이 가득 차서 record()에서 모아 둔 이력을 spill 파일에 기록한다
+        """
+
+        try:
+            while self._overflow:
+                login_histories, self._overflow = self._overflow, []
+                try:
+                    await self._spill(login_histories)
+                except Exception as e:
+                    logger.exception(
+                        f"로그인 이력을 spill 파일에 기록하지 못하였습니다. { {'size': len(login_histories), 'error': repr(e)} }"
+                    )
+        finally:
+            self._overflow_task = None
+
+    async def _quarantine(self, path: str, lines: list[str]) -> None:
+        await asyncio.to_thread(self._write_corrupt, lines)
+        history_corrupted.inc(len(lines))
+
+        logger.warning(
+            f"spill 파일에서 읽을 수 없는 로그인 이력을 격리하였습니다. { {'path': path, 'lines': len(lines), 'corrupt_path': self._corrupt_path} }"
+        )
+
+    def _write_corrupt(self, lines: list[str]) -> None:
+        os.makedirs(self._spill_dir, exist_ok=True)
+        with open(self._corrupt_path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+
+    def _close_spill_file(self) -> None:
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def _claim_spill_files(self) -> list[str]:
+        """
+        다시 저장할 spill 파일(현재 worker의 파일과 종료된 worker의 파일)의 이름을 바꾸어 가져온다
+
+        이름을 바꾼 이후의 spill은 새 파일에 기록되며, 같은 파일을 여러 worker가 가져가지 않는다
+        이전 replay 도중에 실패하여 남아있는 현재 worker의 replay 파일도 다시 가져온다
+        """
+
+        # 현재 worker의 spill 파일은 닫은 이후에 이름을 바꾼다
+        self._close_spill_file()
+
+        own_pid = os.getpid()
+        claimed = []
+        for path in sorted(
+            glob.glob(os.path.join(self._spill_dir, f"{_SPILL_PREFIX}*"))
+        ):
+            name = os.path.basename(path)
+            pid = name[len(_SPILL_PREFIX) :].split(".", 1)[0]
+            if not pid.isdigit():
+                continue
+
+            pid = int(pid)
+            if pid != own_pid and _pid_alive(pid):
+                continue
+
+            self._replay_count += 1
+            target = os.path.join(
+                self._spill_dir, f"{_SPILL_PREFIX}{own_pid}.{self._replay_count}.replay"
+            )
+            try:
+                os.rename(path, target)
+            except FileNotFoundError:
+                # 다른 worker가 먼저 가져갔다
+                continue
+            claimed.append(target)
+
+        return claimed
+
+    async def replay(self) -> int:
+        """
+        spill 파일의 로그인 이력을 flush_size 만큼씩 나누어 다시 저장한다
+
+        저장에 실패하면 남은 이력을 다시 spill 파일에 기록하고, 가져온 spill 파일은 끝까지 처리한 이후에 삭제한다
+        처리하는 도중에 예외가 발생한 파일은 남겨두고 다음 replay에서 다시 가져온다
+
+        :return: 저장한 로그인 이력 수
+        """
+
+        # 현재 worker의 spill 파일을 닫고 이름을 바꾸므로, 기록 중인 spill이 끝난 이후에 가져온다
+        async with self._spill_lock:
+            claimed = await asyncio.to_thread(self._claim_spill_files)
+
+        total = 0
+        saving = True
+        for path in claimed:
+            f = await asyncio.to_thread(open, path, encoding="utf-8")
+            try:
+                while saving and not self._stopping:
+                    lines = await asyncio.to_thread(_read_lines, f, self._flush_size)
+                    if not lines:
+                        break
+
+                    batch, corrupted = _decode_lines(lines)
+                    if corrupted:
+                        await self._quarantine(path, corrupted)
+                    if not batch:
+                        continue
+
+                    failed = await self._save(batch)
+                    if failed:
+                        await self._spill(failed)
+                        saving = False
+                        break
+
+                    history_replayed.inc(len(batch))
+                    total += len(batch)
+
+                # 저장에 실패했거나 종료 중이라면 남은 이력은 저장하지 않고 spill 파일로 옮긴다
+                if not saving or self._stopping:
+                    rest, corrupted = _decode_lines(
+                        await asyncio.to_thread(_read_lines, f, None)
+                    )
+                    if corrupted:
+                        await self._quarantine(path, corrupted)
+                    await self._spill(rest)
+            finally:
+                await asyncio.to_thread(f.close)
+
+            await asyncio.to_thread(os.remove, path)
+
+        return total
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=self._flush_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                if not await self.flush():
+                    self._next_replay = time.monotonic() + _REPLAY_INTERVAL_SECONDS
+                    continue
+
+                if time.monotonic() >= self._next_replay:
+                    self._next_replay = time.monotonic() + _REPLAY_INTERVAL_SECONDS
+
+                    replayed = await self.replay()
+                    if replayed:
+                        logger.info(
+                            f"spill 파일의 로그인 이력을 저장하였습니다. { {'replayed': replayed} }"
+                        )
+            except Exception as e:
+                logger.exception(f"로그인 이력 저장 작업에 실패하였습니다. { {'error': repr(e)} }")
+
+
+def create_history_recorder() -> LoginHistoryRecorder | None:
+    """
+    설정(login_history_write_behind_enabled)이 켜져 있다면 LoginHistoryRecorder를 생성하고, 아니라면
+    None을 반환한다
+    """
+
+    if not settings.login_history_write_behind_enabled:
+        return None
+
+    return LoginHistoryRecorder(
+        flush_interval=settings.login_history_flush_ms / 1000,
+        flush_size=settings.login_history_flush_size,
+        max_queue_size=settings.login_history_queue_max_size,
+        spill_dir=settings.login_history_spill_dir,
+    )
+
+
+history_recorder = create_history_recorder()
@@ -0,0 +1,111 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+from core.config import settings
+from core.metrics import metrics
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class BatchLoader:
+    """
+    같은 worker에서 동시에 요청된 조회를 모아 한 번의 쿼리로 실행한다
+
+    - window가 0이면 현재 event loop tick이 끝날 때까지, 0보다 크면 window 초 동안 key를 모은다
+    - max_batch_size 만큼 모이면 window를 기다리지 않고 바로 실행한다
+    - batch_fn은 key 목록을 받아 {key: 값} dict를 반환하며, 결과에 없는 key는 None을 반환한다
+    - batch_fn은 요청 Session이 아닌 별도의 Session에서 실행되므로 요청 트랜잭션에 포함되지 않는다
+    """
+
+    def __init__(
+        self,
+        name: str,
+        batch_fn: Callable[[list[Hashable]], Awaitable[dict[Hashable, Any]]],
+        window: float = 0.0,
+        max_batch_size: int = 100,
+    ):
+        self._batch_fn = batch_fn
+        self._window = window
+        self._max_batch_size = max_batch_size
+        self._queue: dict[Hashable, list[asyncio.Future]] = {}
+        self._handle: asyncio.Handle | asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+        self._batch_sizes = metrics.histogram(
+            f"batch_loader_{name}_size",
+            f"{name} 한 번의 쿼리로 조회한 key 수",
+            buckets=BATCH_SIZE_BUCKETS,
+        )
+        self._loads = metrics.counter(
+            f"batch_loader_{name}_loads_total", f"{name} 조회 요청 수"
+        )
+
+    async def load(self, key: Hashable) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        self._loads.inc()
+        self._queue.setdefault(key, []).append(future)
+
+        if len(self._queue) >= self._max_batch_size:
+            self._dispatch()
+        elif self._handle is None:
+            if self._window > 0:
+                self._handle = loop.call_later(self._window, self._dispatch)
+            else:
+                self._handle = loop.call_soon(self._dispatch)
+
+        return await future
+
+    def _dispatch(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+        batch, self._queue = self._queue, {}
+        if not batch:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: dict[Hashable, list[asyncio.Future]]) -> None:
+        self._batch_sizes.observe(len(batch))
+
+        try:
+            results = await self._batch_fn(list(batch))
+        except Exception as e:
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        for key, futures in batch.items():
+            value = results.get(key)
+            for future in futures:
+                if not future.done():
+                    future.set_result(value)
+
+
+def create_batch_loader(
+    name: str, batch_fn: Callable[[list[Hashable]], Awaitable[dict[Hashable, Any]]]
+) -> BatchLoader | None:
+    """
+    설정(batch_loaders)에 등록된 DAL 메서드라면 BatchLoader를 생성하고, 아니라면 None을 반환한다
+
+    :param name: DAL 메서드 이름(ex: UserDAL.get_login_user_by_id)
+    :param batch_fn: key 목록을 한 번에 조회하는 함수
+    """
+
+    window_ms = settings.batch_loaders.get(name)
+    if window_ms is None:
+        return None
+
+    return BatchLoader(
+        name=name.replace(".", "_").lower(),
+        batch_fn=batch_fn,
+        window=window_ms / 1000,
+        max_batch_size=settings.batch_loader_max_size,
+    )
@@ -0,0 +1,281 @@
+import asyncio
+from dataclasses import dataclass, field
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+import schemas
+from core.config import settings
+from core.metrics import metrics
+from crud.crud_token import TokenDAL
+from crud.crud_user import UserLoginHistoryDAL
+from crud.history_recorder import history_recorder
+from crud.loader import BATCH_SIZE_BUCKETS
+from crud.token_store.abstract import TokenStore
+from crud.token_store.sql import SQLTokenStore
+from db.base import async_session
+from db.shard import shard_for, shard_session, shard_sessions
+
+group_commit_sizes = metrics.histogram(
+    "login_group_commit_size", "한 번의 트랜잭션으로 저장한 로그인 수", buckets=BATCH_SIZE_BUCKETS
+)
+group_commit_fallbacks = metrics.counter(
+    "login_group_commit_fallbacks_total", "묶음 저장에 실패하여 로그인별로 다시 저장한 횟수"
+)
+
+
+@dataclass
+class _PendingLogin:
+    login_history: schemas.LoginHistory | None
+    new_token: schemas.TokenInsert | None
+    future: asyncio.Future = field(repr=False)
+
+    @property
+    def user_uuid(self) -> bytes:
+        if self.login_history is not None:
+            return self.login_history.user_uuid
+        return self.new_token.user_uuid
+
+
+class LoginGroupCommitWriter:
+    """
+    동시에 처리된 로그인의 토큰/로그인 이력 저장을 모아 하나의 트랜잭션으로 commit 한다
+
+    - window 초 동안 모은 로그인을 jwt_token, user_login_history 각각 하나의 multi-row INSERT로 저장한다
+    - max_batch_size 만큼 모이면 window를 기다리지 않고 바로 저장한다
+    - commit이 완료된 이후에 요청을 반환하므로, 응답을 받은 로그인은 기존과 같이 DB에 저장되어 있다
+    - 묶음 저장이 실패하면 로그인별 트랜잭션으로 다시 저장하여, 하나의 실패가 다른 로그인에 영향을 주지 않도록 한다
+    - shard를 사용한다면 사용자의 shard별로 나누어 각 shard에서 하나의 트랜잭션으로 저장한다
+    """
+
+    def __init__(self, window: float, max_batch_size: int):
+        self._window = window
+        self._max_batch_size = max_batch_size
+        self._queue: list[_PendingLogin] = []
+        self._handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def write(
+        self,
+        login_history: schemas.LoginHistory | None = None,
+        new_token: schemas.TokenInsert | None = None,
+    ) -> None:
+        """
+        로그인 정보를 저장 대기열에 추가하고, commit 될 때까지 기다린다
+
+        :param login_history: 로그인 이력으로, history_recorder에서 저장한다면 None을 전달한다
+        :param new_token: jwt_token 테이블에 저장할 토큰으로, 다른 TokenStore를 사용한다면 None을 전달한다
+        """
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        self._queue.append(
+            _PendingLogin(
+                login_history=login_history, new_token=new_token, future=future
+            )
+        )
+
+        if len(self._queue) >= self._max_batch_size:
+            self._dispatch()
+        elif self._handle is None:
+            self._handle = loop.call_later(self._window, self._dispatch)
+
+        await future
+
+    def _dispatch(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+        batch, self._queue = self._queue, []
+        if not batch:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    async def _save(session_factory: sessionmaker, batch: list[_PendingLogin]) -> None:
+        async with session_factory() as session:
+            try:
+                await TokenDAL(session=session).insert_tokens(
+                    [p.new_token for p in batch if p.new_token is not None]
+                )
+                await UserLoginHistoryDAL(session=session).insert_login_histories(
+                    [p.login_history for p in batch if p.login_history is not None]
+                )
+
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+    async def _run(self, batch: list[_PendingLogin]) -> None:
+        if not shard_sessions:
+            await self._run_group(async_session, batch)
+            return
+
+        groups: dict[int, list[_PendingLogin]] = {}
+        for pending in batch:
+            groups.setdefault(shard_for(pending.user_uuid), []).append(pending)
+
+        await asyncio.gather(
+            *(
+                self._run_group(shard_sessions[shard_id], group)
+                for shard_id, group in groups.items()
+            )
+        )
+
+    async def _run_group(
+        self, session_factory: sessionmaker, batch: list[_PendingLogin]
+    ) -> None:
+        group_commit_sizes.observe(len(batch))
+
+        try:
+            await self._save(session_factory, batch)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0].future.set_exception(e)
+                return
+
+            logger.warning(
+                f"로그인 묶음 저장에 실패하여 로그인별로 다시 저장합니다. { {'size': len(batch), 'error': repr(e)} }"
+            )
+            group_commit_fallbacks.inc()
+
+            for pending in batch:
+                try:
+                    await self._save(session_factory, [pending])
+                except Exception as e:
+                    pending.future.set_exception(e)
+                else:
+                    pending.future.set_result(None)
+            return
+
+        for pending in batch:
+            if not pending.future.done():
+                pending.future.set_result(None)
+
+    async def close(self) -> None:
+        """
+        대기 중인 로그인을 모두 저장한다
+        """
+
+        self._dispatch()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+def create_login_writer() -> LoginGroupCommitWriter | None:
+    """
+    설정(login_group_commit_enabled)이 켜져 있다면 LoginGroupCommitWriter를 생성하고, 아니라면 None을 반환한다
+    """
+
+    if not settings.login_group_commit_enabled:
+        return None
+
+    return LoginGroupCommitWriter(
+        window=settings.login_group_commit_window_ms / 1000,
+        max_batch_size=settings.login_group_commit_max_size,
+    )
+
+
+login_writer = create_login_writer()
+
+
+async def _insert_shard_login_history(
+    shard_id: int, login_history: schemas.LoginHistory
+) -> None:
+    async with shard_session(shard_id) as session:
+        try:
+            await UserLoginHistoryDAL(session=session).insert_login_history(
+                login_history=login_history
+            )
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+
+async def save_login(
+    session: AsyncSession,
+    token_store: TokenStore,
+    new_token: schemas.TokenInsert,
+    login_history: schemas.LoginHistory,
+) -> None:
+    """
+    로그인으로 발급한 토큰과 로그인 이력을 저장한다
+
+    - login_writer를 사용하지 않는다면 요청 세션에서 저장하고 commit 한다
+    - login_writer를 사용한다면 다른 로그인과 함께 하나의 트랜잭션으로 저장되며, SQLTokenStore가 아닌 토큰은 TokenStore에
+      바로 저장한다
+    - shard를 사용한다면 로그인 이력은 사용자의 shard에 저장한다
+    - history_recorder를 사용한다면 로그인 이력은 토큰이 저장된 이후에 대기열에 추가하고, 로그인 트랜잭션과 별도로 저장한다
+    """
+
+    if history_recorder is not None:
+        await _save_token(session, token_store, new_token)
+        history_recorder.record(login_history)
+        return
+
+    if login_writer is None:
+        await token_store.insert(new_token=new_token)
+
+        shard_id = shard_for(login_history.user_uuid)
+        if shard_id is None:
+            await UserLoginHistoryDAL(session=session).insert_login_history(
+                login_history=login_history
+            )
+        else:
+            await _insert_shard_login_history(shard_id, login_history)
+
+        await session.commit()
+        return
+
+    if isinstance(token_store, SQLTokenStore):
+        await login_writer.write(login_history=login_history, new_token=new_token)
+    else:
+        await token_store.insert(new_token=new_token)
+        await login_writer.write(login_history=login_history)
+
+
+async def save_login_failure(
+    session: AsyncSession, login_history: schemas.LoginHistory
+) -> None:
+    """
+    비밀번호가 일치하지 않은 로그인 이력(login_success=False)을 저장한다
+
+    로그인 성공 이력과 같은 경로(history_recorder, login_writer, shard)로 저장하며, 저장할 토큰은 없다
+    """
+
+    if history_recorder is not None:
+        history_recorder.record(login_history)
+        return
+
+    if login_writer is not None:
+        await login_writer.write(login_history=login_history)
+        return
+
+    shard_id = shard_for(login_history.user_uuid)
+    if shard_id is not None:
+        await _insert_shard_login_history(shard_id, login_history)
+        return
+
+    await UserLoginHistoryDAL(session=session).insert_login_history(
+        login_history=login_history
+    )
+    await session.commit()
+
+
+async def _save_token(
+    session: AsyncSession, token_store: TokenStore, new_token: schemas.TokenInsert
+) -> None:
+    if login_writer is not None and isinstance(token_store, SQLTokenStore):
+        await login_writer.write(new_token=new_token)
+        return
+
+    await token_store.insert(new_token=new_token)
+    await session.commit()
@@ -0,0 +1,38 @@
+import functools
+
+from db.base import READ_ONLY, WROTE
+
+
+def read_only(func):
+    """
+    Replica에서 실행해도 되는 조회 메서드에 사용한다
+
+    같은 Session에서 이미 쓰기를 실행하였다면 RoutingSession이 Primary로 실행한다
+    """
+
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        info = self.session.info
+        previous = info.get(READ_ONLY, False)
+        info[READ_ONLY] = True
+        try:
+            return await func(self, *args, **kwargs)
+        finally:
+            info[READ_ONLY] = previous
+
+    return wrapper
+
+
+def write(func):
+    """
+    데이터를 변경하는 메서드에 사용한다
+
+    실행 이후 같은 Session의 조회 쿼리는 모두 Primary에서 실행한다(read-your-writes)
+    """
+
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        self.session.info[WROTE] = True
+        return await func(self, *args, **kwargs)
+
+    return wrapper
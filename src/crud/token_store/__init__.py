@@ -0,0 +1,5 @@
+from .abstract import TokenStore
+from .memory import MemoryTokenStore
+from .redis import RedisTokenStore
+from .sharded import ShardedTokenStore
+from .sql import SQLTokenStore
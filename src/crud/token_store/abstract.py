@@ -0,0 +1,81 @@
+from abc import ABCMeta, abstractmethod
+
+import schemas
+
+
+class TokenStore(metaclass=ABCMeta):
+    """
+    로그인 세션(Token) 저장소 인터페이스
+
+    - SQLTokenStore: jwt_token 테이블에 저장하며, 요청 세션의 트랜잭션에 포함된다(기본값)
+    - RedisTokenStore: Redis 프로토콜 서버에 TTL과 함께 저장하며, 즉시 반영된다
+    - ShardedTokenStore: jwt_token 테이블을 사용자별 shard DB에 나누어 저장하며, 즉시 반영된다
+    - MemoryTokenStore: 프로세스 메모리에 저장하며, 테스트와 벤치마크에서 사용한다
+    """
+
+    @abstractmethod
+    async def insert(self, new_token: schemas.TokenInsert) -> None:
+        """
+        생성된 Token 정보를 저장한다
+
+        최대 세션 수(max_active_sessions)를 초과하면 가장 오래된 세션부터 삭제한다
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get(self, refresh_token_key: str) -> schemas.StoredToken | None:
+        """
+        refreshToken으로 저장된 토큰 정보를 조회한다
+
+        사용자 정보를 함께 조회할 수 있는 저장소는 user_exists, user_is_active, user_token_generation 값을
+        채운다
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, user_uuid: str, jti: str) -> bool:
+        """
+        Token 식별자(jti)로 토큰 정보를 삭제하고, 삭제 여부를 반환한다
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    async def touch(self, update_token: schemas.TokenUpdate) -> bool:
+        """
+        갱신한 accessToken을 저장하고 refreshToken의 만료일시를 연장한다
+
+        토큰이 이미 만료되었거나 삭제되어 연장하지 못했다면 False를 반환한다
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    async def revoke_user(self, user_uuid: str) -> int:
+        """
+        사용자의 모든 토큰 정보를 삭제하고, 삭제된 토큰 수를 반환한다
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_sessions(
+        self, user_uuid: str, min_generation: int, cursor: str | None, limit: int
+    ) -> tuple[list[schemas.StoredToken], str | None]:
+        """
+        사용자의 유효한 세션 목록을 최신순으로 조회한다
+
+        :return: 세션 목록과 다음 페이지 cursor를 반환한다. 마지막 페이지라면 cursor는 None이다
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_sessions(self, user_uuid: str, jtis: list[str]) -> int:
+        """
+        사용자의 세션들을 한 번에 삭제하고, 삭제된 세션 수를 반환한다
+        """
+
+        raise NotImplementedError
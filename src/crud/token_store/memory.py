@@ -0,0 +1,129 @@
+import itertools
+from datetime import datetime
+
+import schemas
+from core.metrics import metrics
+from crud.token_store.abstract import TokenStore
+from utils.strings import binary_to_uuid
+
+
+class MemoryTokenStore(TokenStore):
+    """
+    프로세스 메모리를 사용하는 TokenStore
+
+    - 테스트와 벤치마크를 위한 구현체로, worker 간에 데이터를 공유하지 않는다
+    - Redis와 같이 만료된 토큰은 조회되지 않는다
+    """
+
+    def __init__(self, max_sessions: int = 0):
+        self._max_sessions = max_sessions
+        self._seq = itertools.count(1)
+        # refresh_token_key -> (seq, StoredToken)
+        self._tokens: dict[str, tuple[int, schemas.StoredToken]] = {}
+        # jti -> refresh_token_key
+        self._jtis: dict[str, str] = {}
+        # user_uuid -> {refresh_token_key: None}, 저장 순서(오래된 순)를 유지한다
+        self._users: dict[str, dict[str, None]] = {}
+        self._evictions = metrics.counter("session_evictions_total")
+
+    def _pop(self, refresh_token_key: str) -> schemas.StoredToken | None:
+        item = self._tokens.pop(refresh_token_key, None)
+        if item is None:
+            return None
+
+        token = item[1]
+        self._jtis.pop(token.jti, None)
+        user_tokens = self._users.get(binary_to_uuid(token.user_uuid))
+        if user_tokens is not None:
+            user_tokens.pop(refresh_token_key, None)
+
+        return token
+
+    def _get_alive(
+        self, refresh_token_key: str
+    ) -> tuple[int, schemas.StoredToken] | None:
+        item = self._tokens.get(refresh_token_key)
+        if item and item[1].expires_at < datetime.now():
+            self._pop(refresh_token_key)
+            return None
+
+        return item
+
+    async def insert(self, new_token: schemas.TokenInsert) -> None:
+        user_uuid = binary_to_uuid(new_token.user_uuid)
+        user_tokens = self._users.setdefault(user_uuid, {})
+
+        if self._max_sessions > 0:
+            while len(user_tokens) > self._max_sessions - 1:
+                self._pop(next(iter(user_tokens)))
+                self._evictions.inc()
+
+        now = datetime.now()
+        token = schemas.StoredToken(**new_token.model_dump(), updated_at=now)
+
+        self._tokens[token.refresh_token_key] = (next(self._seq), token)
+        self._jtis[token.jti] = token.refresh_token_key
+        user_tokens[token.refresh_token_key] = None
+
+    async def get(self, refresh_token_key: str) -> schemas.StoredToken | None:
+        item = self._get_alive(refresh_token_key)
+
+        return item[1].model_copy() if item else None
+
+    async def delete(self, user_uuid: str, jti: str) -> bool:
+        refresh_token_key = self._jtis.get(jti)
+        if refresh_token_key is None:
+            return False
+
+        if refresh_token_key not in self._users.get(user_uuid, {}):
+            return False
+
+        return self._pop(refresh_token_key) is not None
+
+    async def touch(self, update_token: schemas.TokenUpdate) -> bool:
+        item = self._get_alive(update_token.refresh_token_key)
+        if not item or item[1].user_id != update_token.user_id:
+            return False
+
+        token = item[1]
+        token.access_token = update_token.access_token
+        token.expires_at = update_token.expires_at
+        token.updated_at = datetime.now()
+
+        return True
+
+    async def revoke_user(self, user_uuid: str) -> int:
+        user_tokens = self._users.pop(user_uuid, {})
+        for refresh_token_key in user_tokens:
+            self._pop(refresh_token_key)
+
+        return len(user_tokens)
+
+    async def list_sessions(
+        self, user_uuid: str, min_generation: int, cursor: str | None, limit: int
+    ) -> tuple[list[schemas.StoredToken], str | None]:
+        before = int(cursor) if cursor is not None else None
+
+        sessions: list[tuple[int, schemas.StoredToken]] = []
+        for refresh_token_key in reversed(list(self._users.get(user_uuid, {}))):
+            item = self._get_alive(refresh_token_key)
+            if not item or item[1].token_generation < min_generation:
+                continue
+            if before is not None and item[0] >= before:
+                continue
+
+            sessions.append(item)
+            if len(sessions) > limit:
+                break
+
+        next_cursor = str(sessions[limit - 1][0]) if len(sessions) > limit else None
+
+        return [t.model_copy() for _, t in sessions[:limit]], next_cursor
+
+    async def delete_sessions(self, user_uuid: str, jtis: list[str]) -> int:
+        deleted = 0
+        for jti in jtis:
+            if await self.delete(user_uuid=user_uuid, jti=jti):
+                deleted += 1
+
+        return deleted
@@ -0,0 +1,372 @@
+import time
+import uuid
+from datetime import datetime
+
+import schemas
+from core.config import settings
+from core.metrics import metrics
+from crud.token_store.abstract import TokenStore
+from utils.resp import RESPClient, RESPError
+from utils.strings import binary_to_uuid
+
+
+def _text(value: bytes | str | None) -> str | None:
+    """
+    RESP 응답 값을 문자열로 변환한다
+
+    서버 구현에 따라 같은 값이 bulk string(bytes) 또는 simple string(str)으로 반환될 수 있다
+    """
+
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return value
+
+
+def _to_timestamp(value: datetime | None) -> str:
+    return "" if value is None else repr(value.timestamp())
+
+
+def _from_timestamp(value: bytes | str) -> datetime | None:
+    return datetime.fromtimestamp(float(value)) if value else None
+
+
+# 만료되어 삭제된 토큰을 HSET으로 다시 생성하지 않도록, 키가 존재할 때만 갱신한다
+# 사용자 세션 목록({ARGV[5]}{user_uuid})도 갱신한 세션보다 먼저 만료되지 않도록 만료일시를 늘리며,
+# 목록에서 빠져있다면(이전에 목록이 만료된 경우) 발급 시각을 score로 다시 추가한다
+_TOUCH_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call(
+    'HSET', KEYS[1],
+    'access_token', ARGV[1], 'expires_at', ARGV[2], 'updated_at', ARGV[3]
+)
+redis.call('EXPIREAT', KEYS[1], ARGV[4])
+redis.call('EXPIREAT', KEYS[2], ARGV[4])
+local user_key = ARGV[5] .. redis.call('HGET', KEYS[1], 'user_uuid')
+if not redis.call('ZSCORE', user_key, ARGV[6]) then
+    local issued_at = tonumber(redis.call('HGET', KEYS[1], 'issued_at'))
+        or tonumber(ARGV[7])
+    redis.call('ZADD', user_key, math.floor(issued_at * 1000000), ARGV[6])
+end
+local ttl = redis.call('TTL', user_key)
+if ttl < tonumber(ARGV[4]) - tonumber(ARGV[7]) then
+    redis.call('EXPIREAT', user_key, ARGV[4])
+end
+return 1
+"""
+
+# KEYS[1]의 남은 유효기간이 ARGV[1]초보다 짧을 때만 늘린다(갱신으로 늘어난 세션 목록의 유효기간을 줄이지 않는다)
+_EXTEND_EXPIRE_SCRIPT = """
+local ttl = redis.call('TTL', KEYS[1])
+if ttl < tonumber(ARGV[1]) then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return 1
+"""
+
+# 사용자 세션 목록(KEYS[1])에서 가장 오래된 세션부터 ARGV[1]개만 남기고 삭제한다
+# 세션 수 확인과 삭제를 하나의 script로 실행하므로, 동시에 로그인하더라도 세션이 더 많이/적게 삭제되지 않는다
+_EVICT_SCRIPT = """
+local overflow = redis.call('ZCARD', KEYS[1]) - tonumber(ARGV[1])
+if overflow <= 0 then
+    return 0
+end
+local members = redis.call('ZRANGE', KEYS[1], 0, overflow - 1)
+for _, member in ipairs(members) do
+    local token_key = ARGV[2] .. member
+    local jti = redis.call('HGET', token_key, 'jti')
+    redis.call('DEL', token_key)
+    if jti then
+        redis.call('DEL', ARGV[3] .. jti)
+    end
+end
+redis.call('ZREM', KEYS[1], unpack(members))
+return #members
+"""
+
+
+class RedisTokenStore(TokenStore):
+    """
+    Redis 프로토콜(RESP) 서버를 사용하는 TokenStore
+
+    - {prefix}token:{refresh_token_key}: 토큰 정보(HASH), refreshToken 만료일시에 자동으로 삭제된다
+    - {prefix}jti:{jti}: jti로 refresh_token_key를 찾기 위한 키(STRING)
+    - {prefix}user:{user_uuid}: 사용자의 세션 목록(ZSET), 저장 시각(µs)을 score로 사용한다
+
+    refreshToken 갱신 시에는 조회(HGETALL)와 갱신(MULTI/EXEC) 두 번의 왕복으로 처리한다
+    """
+
+    def __init__(
+        self, client: RESPClient, max_sessions: int = 0, prefix: str = "auth:"
+    ):
+        self._client = client
+        self._max_sessions = max_sessions
+        self._prefix = prefix
+        # 사용자 세션 목록은 refreshToken의 최대 유효기간 동안 유지한다
+        self._user_ttl = settings.jwt_refresh_token_expire_minutes * 60
+        self._evictions = metrics.counter("session_evictions_total")
+
+    def _token_key(self, refresh_token_key: str) -> str:
+        return f"{self._prefix}token:{refresh_token_key}"
+
+    def _jti_key(self, jti: str) -> str:
+        return f"{self._prefix}jti:{jti}"
+
+    def _user_key(self, user_uuid: str) -> str:
+        return f"{self._prefix}user:{user_uuid}"
+
+    @staticmethod
+    def _decode(values: list[bytes]) -> schemas.StoredToken | None:
+        if not values:
+            return None
+
+        data = {_text(k): _text(v) for k, v in zip(values[::2], values[1::2])}
+
+        return schemas.StoredToken(
+            user_id=int(data["user_id"]),
+            user_uuid=uuid.UUID(data["user_uuid"]).bytes,
+            jti=data["jti"],
+            access_token=data["access_token"],
+            refresh_token=data["refresh_token"],
+            refresh_token_key=data["refresh_token_key"],
+            issued_at=_from_timestamp(data["issued_at"]),
+            expires_at=_from_timestamp(data["expires_at"]),
+            token_generation=int(data["token_generation"]),
+            user_agent=data["user_agent"] or None,
+            updated_at=_from_timestamp(data["updated_at"]),
+        )
+
+    async def _transaction(self, commands: list[tuple]) -> list:
+        replies = await self._client.pipeline([("MULTI",), *commands, ("EXEC",)])
+
+        results = replies[-1] or []
+        for result in results:
+            if isinstance(result, RESPError):
+                raise result
+
+        return results
+
+    async def _delete_keys(self, user_uuid: str, tokens: list[tuple[str, str]]) -> None:
+        """
+        (refresh_token_key, jti) 목록의 토큰 정보를 삭제한다
+        """
+
+        if not tokens:
+            return
+
+        commands = []
+        for refresh_token_key, jti in tokens:
+            commands.append(("DEL", self._token_key(refresh_token_key)))
+            if jti:
+                commands.append(("DEL", self._jti_key(jti)))
+        commands.append(("ZREM", self._user_key(user_uuid), *(t[0] for t in tokens)))
+
+        await self._transaction(commands)
+
+    async def insert(self, new_token: schemas.TokenInsert) -> None:
+        user_uuid = binary_to_uuid(new_token.user_uuid)
+        user_key = self._user_key(user_uuid)
+        token_key = self._token_key(new_token.refresh_token_key)
+        expires_at = int(new_token.expires_at.timestamp())
+
+        commands = [
+            (
+                "HSET",
+                token_key,
+                "user_id",
+                new_token.user_id,
+                "user_uuid",
+                user_uuid,
+                "jti",
+                new_token.jti,
+                "access_token",
+                new_token.access_token,
+                "refresh_token",
+                new_token.refresh_token,
+                "refresh_token_key",
+                new_token.refresh_token_key,
+                "issued_at",
+                _to_timestamp(new_token.issued_at),
+                "expires_at",
+                _to_timestamp(new_token.expires_at),
+                "token_generation",
+                new_token.token_generation,
+                "user_agent",
+                new_token.user_agent or "",
+                "updated_at",
+                _to_timestamp(datetime.now()),
+            ),
+            ("EXPIREAT", token_key, expires_at),
+            (
+                "SET",
+                self._jti_key(new_token.jti),
+                new_token.refresh_token_key,
+                "EXAT",
+                expires_at,
+            ),
+            (
+                "ZADD",
+                user_key,
+                time.time_ns() // 1000,
+                new_token.refresh_token_key,
+            ),
+            ("EVAL", _EXTEND_EXPIRE_SCRIPT, 1, user_key, self._user_ttl),
+        ]
+
+        # 새 세션을 추가한 후 같은 트랜잭션에서 가장 오래된 세션부터 max_sessions 개만 남긴다
+        if self._max_sessions > 0:
+            commands.append(
+                (
+                    "EVAL",
+                    _EVICT_SCRIPT,
+                    1,
+                    user_key,
+                    self._max_sessions,
+                    self._token_key(""),
+                    self._jti_key(""),
+                )
+            )
+
+        results = await self._transaction(commands)
+
+        if self._max_sessions > 0 and results[-1]:
+            self._evictions.inc(results[-1])
+
+    async def get(self, refresh_token_key: str) -> schemas.StoredToken | None:
+        values = await self._client.execute(
+            "HGETALL", self._token_key(refresh_token_key)
+        )
+
+        return self._decode(values)
+
+    async def delete(self, user_uuid: str, jti: str) -> bool:
+        refresh_token_key = await self._client.execute("GET", self._jti_key(jti))
+        if refresh_token_key is None:
+            return False
+
+        refresh_token_key = _text(refresh_token_key)
+
+        # 사용자의 세션 목록에 포함된 토큰만 삭제한다
+        score = await self._client.execute(
+            "ZSCORE", self._user_key(user_uuid), refresh_token_key
+        )
+        if score is None:
+            return False
+
+        await self._delete_keys(user_uuid, [(refresh_token_key, jti)])
+
+        return True
+
+    async def touch(self, update_token: schemas.TokenUpdate) -> bool:
+        expires_at = int(update_token.expires_at.timestamp())
+
+        touched = await self._client.execute(
+            "EVAL",
+            _TOUCH_SCRIPT,
+            2,
+            self._token_key(update_token.refresh_token_key),
+            self._jti_key(update_token.jti),
+            update_token.access_token,
+            _to_timestamp(update_token.expires_at),
+            _to_timestamp(datetime.now()),
+            expires_at,
+            self._user_key(""),
+            update_token.refresh_token_key,
+            int(time.time()),
+        )
+
+        return bool(touched)
+
+    async def revoke_user(self, user_uuid: str) -> int:
+        refresh_token_keys = [
+            _text(k)
+            for k in await self._client.execute(
+                "ZRANGE", self._user_key(user_uuid), 0, -1
+            )
+        ]
+        if not refresh_token_keys:
+            return 0
+
+        jtis = await self._client.pipeline(
+            [("HGET", self._token_key(k), "jti") for k in refresh_token_keys]
+        )
+
+        await self._delete_keys(
+            user_uuid,
+            [(k, _text(j)) for k, j in zip(refresh_token_keys, jtis)],
+        )
+
+        return len(refresh_token_keys)
+
+    async def list_sessions(
+        self, user_uuid: str, min_generation: int, cursor: str | None, limit: int
+    ) -> tuple[list[schemas.StoredToken], str | None]:
+        user_key = self._user_key(user_uuid)
+        now = datetime.now()
+
+        sessions: list[tuple[str, schemas.StoredToken]] = []
+        stale: list[str] = []
+        max_score = f"({int(cursor)}" if cursor is not None else "+inf"
+
+        # 만료되었거나 이전 세대의 세션을 제외하면서 limit + 1개가 채워질 때까지 조회한다
+        while len(sessions) <= limit:
+            members = await self._client.execute(
+                "ZREVRANGEBYSCORE",
+                user_key,
+                max_score,
+                "-inf",
+                "WITHSCORES",
+                "LIMIT",
+                0,
+                limit + 1,
+            )
+            if not members:
+                break
+
+            keys, scores = members[::2], members[1::2]
+            values = await self._client.pipeline(
+                [("HGETALL", self._token_key(_text(k))) for k in keys]
+            )
+
+            for key, score, value in zip(keys, scores, values):
+                token = self._decode(value)
+                if token is None:
+                    stale.append(_text(key))
+                elif (
+                    token.token_generation >= min_generation and token.expires_at >= now
+                ):
+                    sessions.append((_text(score), token))
+
+            max_score = f"({_text(scores[-1])}"
+            if len(keys) <= limit:
+                break
+
+        # TTL로 삭제된 토큰은 세션 목록에서도 정리한다
+        if stale:
+            await self._client.execute("ZREM", user_key, *stale)
+
+        next_cursor = sessions[limit - 1][0] if len(sessions) > limit else None
+
+        return [t for _, t in sessions[:limit]], next_cursor
+
+    async def delete_sessions(self, user_uuid: str, jtis: list[str]) -> int:
+        refresh_token_keys = await self._client.pipeline(
+            [("GET", self._jti_key(jti)) for jti in jtis]
+        )
+
+        candidates = [
+            (_text(k), jti) for k, jti in zip(refresh_token_keys, jtis) if k is not None
+        ]
+        if not candidates:
+            return 0
+
+        # 사용자의 세션 목록에 포함된 토큰만 삭제한다
+        scores = await self._client.pipeline(
+            [("ZSCORE", self._user_key(user_uuid), k) for k, _ in candidates]
+        )
+        owned = [c for c, score in zip(candidates, scores) if score is not None]
+
+        await self._delete_keys(user_uuid, owned)
+
+        return len(owned)
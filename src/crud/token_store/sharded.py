@@ -0,0 +1,114 @@
+import asyncio
+
+import schemas
+from core.metrics import metrics
+from crud.crud_token import TokenDAL
+from crud.token_store.abstract import TokenStore
+from db.shard import parse_shard_prefix, shard_engines, shard_for, shard_session
+
+fanouts = metrics.counter(
+    "token_shard_fanouts_total", "shard id가 없는 refreshToken을 모든 shard에서 조회/갱신한 횟수"
+)
+
+
+class ShardedTokenStore(TokenStore):
+    """
+    jwt_token 테이블을 사용자별 shard DB에 나누어 저장하는 TokenStore
+
+    - 사용자 UUID의 hash로 shard를 정하며, 한 사용자의 토큰은 모두 같은 shard에 저장된다
+    - refreshToken과 조회 키 앞에 shard id가 있으므로, 토큰 갱신도 하나의 shard에서 처리한다
+    - shard id가 없는 refreshToken(shard 적용 이전에 발급)만 모든 shard에서 조회한다
+    - shard에는 users 테이블이 없으므로 사용자 정보는 함께 조회하지 않으며, 호출한 쪽에서 확인한다
+    - 요청 세션과 다른 DB를 사용하므로 변경 사항은 shard의 트랜잭션으로 바로 commit 된다
+    """
+
+    @staticmethod
+    async def _execute(shard_id: int, func):
+        async with shard_session(shard_id) as session:
+            try:
+                result = await func(TokenDAL(session=session))
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+        return result
+
+    def _shards_for_key(self, refresh_token_key: str) -> list[int]:
+        shard_id = parse_shard_prefix(refresh_token_key)
+        if shard_id is not None:
+            return [shard_id]
+
+        fanouts.inc()
+        return list(range(len(shard_engines)))
+
+    async def insert(self, new_token: schemas.TokenInsert) -> None:
+        await self._execute(
+            shard_for(new_token.user_uuid),
+            lambda dal: dal.insert_token(new_token=new_token),
+        )
+
+    async def get(self, refresh_token_key: str) -> schemas.StoredToken | None:
+        saved_tokens = await asyncio.gather(
+            *(
+                self._execute(
+                    shard_id, lambda dal: dal.get(refresh_token_key=refresh_token_key)
+                )
+                for shard_id in self._shards_for_key(refresh_token_key)
+            )
+        )
+
+        for saved_token in saved_tokens:
+            if saved_token is not None:
+                return schemas.StoredToken.model_validate(saved_token)
+
+        return None
+
+    async def delete(self, user_uuid: str, jti: str) -> bool:
+        deleted = await self._execute(
+            shard_for(user_uuid),
+            lambda dal: dal.delete_by_jti(user_uuid=user_uuid, jti=jti),
+        )
+        return bool(deleted)
+
+    async def touch(self, update_token: schemas.TokenUpdate) -> bool:
+        touched = await asyncio.gather(
+            *(
+                self._execute(
+                    shard_id, lambda dal: dal.extend(update_token=update_token)
+                )
+                for shard_id in self._shards_for_key(update_token.refresh_token_key)
+            )
+        )
+        return any(touched)
+
+    async def revoke_user(self, user_uuid: str) -> int:
+        return await self._execute(
+            shard_for(user_uuid), lambda dal: dal.delete_by_user(user_uuid=user_uuid)
+        )
+
+    async def list_sessions(
+        self, user_uuid: str, min_generation: int, cursor: str | None, limit: int
+    ) -> tuple[list[schemas.StoredToken], str | None]:
+        # 다음 페이지가 존재하는지 확인하기 위해 limit보다 하나 더 조회한다
+        rows = await self._execute(
+            shard_for(user_uuid),
+            lambda dal: dal.list_sessions(
+                user_uuid=user_uuid,
+                min_generation=min_generation,
+                cursor=int(cursor) if cursor is not None else None,
+                limit=limit + 1,
+            ),
+        )
+
+        next_cursor = str(rows[limit - 1].id) if len(rows) > limit else None
+
+        return [
+            schemas.StoredToken.model_validate(r) for r in rows[:limit]
+        ], next_cursor
+
+    async def delete_sessions(self, user_uuid: str, jtis: list[str]) -> int:
+        return await self._execute(
+            shard_for(user_uuid),
+            lambda dal: dal.delete_sessions(user_uuid=user_uuid, jtis=jtis),
+        )
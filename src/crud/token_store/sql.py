@@ -0,0 +1,60 @@
+import schemas
+from crud.crud_token import TokenDAL
+from crud.token_store.abstract import TokenStore
+
+
+class SQLTokenStore(TokenStore):
+    """
+    jwt_token 테이블을 사용하는 TokenStore
+
+    모든 변경 사항은 요청 세션의 트랜잭션에 포함되므로, 호출한 쪽에서 commit 해야 한다
+    """
+
+    def __init__(self, token_dal: TokenDAL):
+        self.token_dal = token_dal
+
+    async def insert(self, new_token: schemas.TokenInsert) -> None:
+        await self.token_dal.insert_token(new_token=new_token)
+
+    async def get(self, refresh_token_key: str) -> schemas.StoredToken | None:
+        row = await self.token_dal.get_with_user(refresh_token_key=refresh_token_key)
+        if not row:
+            return None
+
+        saved_token, is_active, user_uuid, token_generation = row
+
+        stored_token = schemas.StoredToken.model_validate(saved_token)
+        stored_token.user_exists = user_uuid is not None
+        stored_token.user_is_active = bool(is_active)
+        stored_token.user_token_generation = token_generation
+
+        return stored_token
+
+    async def delete(self, user_uuid: str, jti: str) -> bool:
+        return bool(await self.token_dal.delete_by_jti(user_uuid=user_uuid, jti=jti))
+
+    async def touch(self, update_token: schemas.TokenUpdate) -> bool:
+        return bool(await self.token_dal.update(update_token=update_token))
+
+    async def revoke_user(self, user_uuid: str) -> int:
+        return await self.token_dal.delete_by_user(user_uuid=user_uuid)
+
+    async def list_sessions(
+        self, user_uuid: str, min_generation: int, cursor: str | None, limit: int
+    ) -> tuple[list[schemas.StoredToken], str | None]:
+        # 다음 페이지가 존재하는지 확인하기 위해 limit보다 하나 더 조회한다
+        rows = await self.token_dal.list_sessions(
+            user_uuid=user_uuid,
+            min_generation=min_generation,
+            cursor=int(cursor) if cursor is not None else None,
+            limit=limit + 1,
+        )
+
+        next_cursor = str(rows[limit - 1].id) if len(rows) > limit else None
+
+        return [
+            schemas.StoredToken.model_validate(r) for r in rows[:limit]
+        ], next_cursor
+
+    async def delete_sessions(self, user_uuid: str, jtis: list[str]) -> int:
+        return await self.token_dal.delete_sessions(user_uuid=user_uuid, jtis=jtis)
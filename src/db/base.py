@@ -1,22 +1,138 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
 
 from core.config import settings
+from core.metrics import metrics
+from db.pool import resolve_pool_config
+from db.pool_metrics import instrument_pool, instrumented_pool_class
 
 #########################
 # SQLALCHEMY
 #########################
-SQLALCHEMY_DATABASE_URL = (
+# db_url을 설정하지 않으면 db_host 등의 설정으로 MySQL(asyncmy) URL을 만든다
+SQLALCHEMY_DATABASE_URL = settings.db_url or (
     f"mysql+asyncmy://{settings.db_user}:{settings.db_password}"
     f"@{settings.db_host}:{settings.db_port}/{settings.db_name}"
 )
 
+
+def connect_args(url: str) -> dict:
+    """
+    DB driver에 전달할 연결 옵션을 반환한다
+
+    asyncmy는 stmt_cache_size가 설정되면 bind parameter가 있는 쿼리를 서버 측 prepared statement(binary
+    protocol)로 실행한다
+    """
+
+    if make_url(url).get_driver_name() == "asyncmy":
+        return {"stmt_cache_size": settings.db_stmt_cache_size}
+
+    return {}
+
+
+# 호스트의 연결 수 예산을 worker 수로 나누어 pool 크기를 정한다
+pool_config = resolve_pool_config(
+    budget=settings.db_connection_budget, workers=settings.web_workers
+)
+
 engine = create_async_engine(
-    SQLALCHEMY_DATABASE_URL, pool_recycle=300, pool_size=40, pool_pre_ping=True
+    SQLALCHEMY_DATABASE_URL,
+    poolclass=instrumented_pool_class("primary"),
+    pool_recycle=300,
+    pool_size=pool_config.pool_size,
+    max_overflow=pool_config.max_overflow,
+    pool_timeout=pool_config.pool_timeout,
+    pool_pre_ping=True,
+    connect_args=connect_args(SQLALCHEMY_DATABASE_URL),
+)
+instrument_pool(engine, name="primary")
+
+#########################
+# READ REPLICA(optional)
+#########################
+replica_engine = None
+replica_pool_config = None
+if settings.db_replica_url or settings.db_replica_host:
+    SQLALCHEMY_REPLICA_URL = settings.db_replica_url or (
+        f"mysql+asyncmy://{settings.db_replica_user or settings.db_user}"
+        f":{settings.db_replica_password or settings.db_password}"
+        f"@{settings.db_replica_host}:{settings.db_replica_port or settings.db_port}"
+        f"/{settings.db_name}"
+    )
+
+    replica_pool_config = resolve_pool_config(
+        budget=settings.db_replica_connection_budget or settings.db_connection_budget,
+        workers=settings.web_workers,
+    )
+
+    replica_engine = create_async_engine(
+        SQLALCHEMY_REPLICA_URL,
+        poolclass=instrumented_pool_class("replica"),
+        pool_recycle=300,
+        pool_size=replica_pool_config.pool_size,
+        max_overflow=replica_pool_config.max_overflow,
+        pool_timeout=replica_pool_config.pool_timeout,
+        pool_pre_ping=True,
+        connect_args=connect_args(SQLALCHEMY_REPLICA_URL),
+    )
+    instrument_pool(replica_engine, name="replica")
+
+replica_reads = metrics.counter("db_replica_reads_total", "Replica에서 실행한 조회 쿼리 수")
+primary_fallback_reads = metrics.counter(
+    "db_primary_fallback_reads_total", "Replica를 사용할 수 없어 Primary에서 실행한 조회 쿼리 수"
 )
+
+# Session.info에 저장하는 라우팅 상태 키
+READ_ONLY = "read_only"
+WROTE = "wrote"
+
+
+class ReplicaStatus:
+    """
+    Replica 사용 가능 여부
+
+    복제 지연 확인 작업(app.tasks.replica_monitor)이 갱신하며, 확인되기 전에는 사용하지 않는다
+    """
+
+    available: bool = False
+    lag_seconds: float | None = None
+
+
+class RoutingSession(Session):
+    """
+    조회 쿼리를 Replica로 보내는 Session
+
+    - crud.routing.read_only 로 표시된 DAL 메서드의 쿼리만 Replica에서 실행한다
+    - 한 번이라도 쓰기(INSERT/UPDATE/DELETE)를 실행한 Session은 이후 조회도 Primary에서
+      실행한다(read-your-writes)
+    - Replica가 없거나 복제 지연이 허용 범위를 넘으면 Primary에서 실행한다
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if isinstance(clause, UpdateBase) or self._flushing:
+            self.info[WROTE] = True
+            return engine.sync_engine
+
+        if not self.info.get(READ_ONLY) or self.info.get(WROTE):
+            return engine.sync_engine
+
+        if replica_engine is None:
+            return engine.sync_engine
+
+        if not ReplicaStatus.available:
+            primary_fallback_reads.inc()
+            return engine.sync_engine
+
+        replica_reads.inc()
+        return replica_engine.sync_engine
+
+
 async_session = sessionmaker(
     bind=engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
     autocommit=False,
     autoflush=False,
     expire_on_commit=False,
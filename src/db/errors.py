@@ -0,0 +1,37 @@
+from sqlalchemy import Table, UniqueConstraint
+from sqlalchemy.exc import IntegrityError
+
+
+def get_violated_constraint(e: IntegrityError, table: Table) -> str | None:
+    """
+    IntegrityError가 테이블의 어떤 unique 제약조건 위반으로 발생하였는지 찾아 제약조건 이름을 반환한다
+
+    - MySQL, PostgreSQL: 에러 메시지에 포함된 제약조건(key) 이름으로 찾는다
+      ex) Duplicate entry '...' for key 'user.uq_email_key_provider_id'
+    - SQLite: 에러 메시지에 제약조건 이름이 없으므로 컬럼 목록으로 찾는다
+      ex) UNIQUE constraint failed: user.email_key, user.provider_id
+
+    :param e: INSERT/UPDATE 실행 중 발생한 IntegrityError
+    :param table: 제약조건을 찾을 테이블(ex: models.User.__table__)
+    :return: 위반한 제약조건 이름을 반환하고, 찾을 수 없다면 None을 반환한다
+    """
+
+    message = str(e.orig)
+
+    constraints = [
+        c for c in table.constraints if isinstance(c, UniqueConstraint) and c.name
+    ]
+
+    for constraint in constraints:
+        if any(
+            f"{quote}{constraint.name}'" in message or f'"{constraint.name}"' in message
+            for quote in ("'", ".")
+        ):
+            return constraint.name
+
+    for constraint in constraints:
+        columns = ", ".join(f"{table.name}.{c.name}" for c in constraint.columns)
+        if message.endswith(columns):
+            return constraint.name
+
+    return None
@@ -0,0 +1,195 @@
+"""
+보관(archive)된 로그인 이력 파일을 읽는다
+
+보관 파일은 LoginHistoryArchiver(app/tasks/history_archiver.py)가 보관 기간이 지난
+user_login_history를 월 단위로 저장한 파일이다
+- 경로: {login_history_archive_dir}/{db}/user_login_history.{partition}[.{n}].jsonl.gz
+  (db: primary, shard0, shard1, ...)
+- 한 줄에 하나의 로그인 이력(JSON)이며, 파일 안에서는 id 순서로 저장되어 있다
+- 파일을 모두 기록한 이후에 이름을 바꾸므로, *.jsonl.gz 파일은 항상 완전한 파일이다
+
+실행 방법(src 디렉토리에서 실행한다)
+    $ python -m db.history_archive ./archive --user-uuid 0190c5a0-... \
+        --since 2026-01-01 --until 2026-02-01
+    $ python -m db.history_archive \
+        ./archive/primary/user_login_history.p202601.jsonl.gz --failed --count
+"""
+import argparse
+import glob
+import gzip
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Iterable, Iterator
+
+from sqlalchemy import Row
+
+from utils.strings import binary_to_ip, binary_to_uuid
+
+ARCHIVE_TABLE = "user_login_history"
+ARCHIVE_SUFFIX = ".jsonl.gz"
+
+
+def archive_path(archive_dir: str, db_name: str, label: str) -> str:
+    return os.path.join(
+        archive_dir, db_name, f"{ARCHIVE_TABLE}.{label}{ARCHIVE_SUFFIX}"
+    )
+
+
+def _isoformat(value: datetime | None) -> str | None:
+    return value.isoformat() if value is not None else None
+
+
+def encode_row(row: Row) -> str:
+    return json.dumps(
+        {
+            "id": row.id,
+            "user_id": row.user_id,
+            "user_uuid": binary_to_uuid(row.user_uuid) if row.user_uuid else None,
+            "login_time": _isoformat(row.login_time),
+            "login_success": bool(row.login_success),
+            "ip_address": binary_to_ip(row.ip_address),
+            "created_at": _isoformat(row.created_at),
+            "updated_at": _isoformat(row.updated_at),
+        },
+        separators=(",", ":"),
+    )
+
+
+class ArchiveWriter:
+    """
+    보관 파일을 임시 파일(.tmp)에 기록하고, commit() 시 디스크에 기록(fsync)한 후 보관 파일 이름으로 바꾼다
+
+    파일 쓰기와 압축은 event loop를 막으므로 asyncio.to_thread()로 호출한다
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._tmp_path = f"{path}.tmp"
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._raw = open(self._tmp_path, "wb")
+        self._file = gzip.GzipFile(fileobj=self._raw, mode="wb", compresslevel=6)
+
+    def write(self, rows: Iterable[Row]) -> None:
+        self._file.write(
+            "".join(encode_row(row) + "\n" for row in rows).encode("utf-8")
+        )
+
+    def commit(self) -> None:
+        self._file.close()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._raw.close()
+
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self) -> None:
+        self._file.close()
+        self._raw.close()
+
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+def archive_files(paths: list[str]) -> list[str]:
+    """
+    경로 목록의 보관 파일을 반환한다, 디렉토리라면 하위의 모든 보관 파일을 반환한다
+    """
+
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                sorted(
+                    glob.glob(
+                        os.path.join(path, "**", f"*{ARCHIVE_SUFFIX}"), recursive=True
+                    )
+                )
+            )
+        else:
+            files.append(path)
+
+    return files
+
+
+def read_archive(
+    paths: list[str],
+    user_id: int | None = None,
+    user_uuid: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    login_success: bool | None = None,
+) -> Iterator[dict]:
+    """
+    보관 파일의 로그인 이력 중 조건에 맞는 이력을 파일 순서대로 반환한다
+
+    :param paths: 보관 파일 또는 디렉토리 목록
+    :param user_id: 사용자 ID
+    :param user_uuid: 사용자 UUID(문자열)
+    :param since: login_time 시작(포함)
+    :param until: login_time 끝(포함하지 않는다)
+    :param login_success: 로그인 성공 여부
+    """
+
+    for path in archive_files(paths):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                history = json.loads(line)
+
+                if user_id is not None and history["user_id"] != user_id:
+                    continue
+                if user_uuid is not None and history["user_uuid"] != user_uuid:
+                    continue
+                if (
+                    login_success is not None
+                    and history["login_success"] != login_success
+                ):
+                    continue
+                if since is not None or until is not None:
+                    login_time = datetime.fromisoformat(history["login_time"])
+                    if since is not None and login_time < since:
+                        continue
+                    if until is not None and login_time >= until:
+                        continue
+
+                yield history
+
+
+def main():
+    parser = argparse.ArgumentParser(description="보관된 로그인 이력을 JSONL로 출력한다")
+    parser.add_argument("paths", nargs="+", help="보관 파일 또는 디렉토리")
+    parser.add_argument("--user-id", type=int)
+    parser.add_argument("--user-uuid")
+    parser.add_argument("--since", type=datetime.fromisoformat)
+    parser.add_argument("--until", type=datetime.fromisoformat)
+    result = parser.add_mutually_exclusive_group()
+    result.add_argument(
+        "--succeeded", dest="login_success", action="store_const", const=True
+    )
+    result.add_argument(
+        "--failed", dest="login_success", action="store_const", const=False
+    )
+    parser.add_argument("--count", action="store_true", help="이력 대신 개수를 출력한다")
+    args = parser.parse_args()
+
+    histories = read_archive(
+        args.paths,
+        user_id=args.user_id,
+        user_uuid=args.user_uuid,
+        since=args.since,
+        until=args.until,
+        login_success=args.login_success,
+    )
+
+    if args.count:
+        print(sum(1 for _ in histories))
+        return
+
+    for history in histories:
+        sys.stdout.write(json.dumps(history, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import re
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+#########################
+# MySQL RANGE COLUMNS partition(월 단위)
+#########################
+# partition 이름은 p{YYYYMM}(해당 월)이며, 다음 달 1일 미만(VALUES LESS THAN)의 행을 저장한다
+# 마지막 partition(pmax)은 VALUES LESS THAN (MAXVALUE)로, 아직 만들지 않은 월의 행을 저장한다
+# 첫 번째 partition은 이름의 월 이전 행도 모두 저장한다
+
+MAX_PARTITION = "pmax"
+
+_PARTITION_NAME = re.compile(r"^p\d{6}$|^pmax$")
+
+
+def month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(value: datetime) -> datetime:
+    return month_start(month_start(value) + timedelta(days=32))
+
+
+def partition_name(bound: datetime) -> str:
+    """
+    VALUES LESS THAN 값(다음 달 1일)으로 partition 이름을 만든다
+    """
+
+    return f"p{bound - timedelta(days=1):%Y%m}"
+
+
+def _is_mysql(session: AsyncSession) -> bool:
+    return session.get_bind().dialect.name == "mysql"
+
+
+def _partition_definition(bound: datetime) -> str:
+    return (
+        f"PARTITION {partition_name(bound)} "
+        f"VALUES LESS THAN ('{bound:%Y-%m-%d %H:%M:%S}')"
+    )
+
+
+async def list_partitions(
+    session: AsyncSession, table: str
+) -> list[tuple[str, datetime | None]]:
+    """
+    테이블의 partition 이름과 VALUES LESS THAN 값(MAXVALUE라면 None)을 순서대로 반환한다
+
+    MySQL이 아니거나 partition 테이블이 아니라면 빈 목록을 반환한다
+    """
+
+    if not _is_mysql(session):
+        return []
+
+    rows = await session.execute(
+        text(
+            "SELECT PARTITION_NAME, PARTITION_DESCRIPTION "
+            "FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table "
+            "AND PARTITION_NAME IS NOT NULL "
+            "ORDER BY PARTITION_ORDINAL_POSITION"
+        ),
+        {"table": table},
+    )
+
+    partitions = []
+    for name, description in rows:
+        if not _PARTITION_NAME.match(name):
+            raise ValueError(f"unexpected partition name: {table}.{name}")
+
+        bound = (
+            None
+            if description == "MAXVALUE"
+            else datetime.fromisoformat(description.strip("'"))
+        )
+        partitions.append((name, bound))
+
+    return partitions
+
+
+async def add_partitions(
+    session: AsyncSession,
+    table: str,
+    partitions: list[tuple[str, datetime | None]],
+    until: datetime,
+) -> list[str]:
+    """
+    until이 포함된 월까지의 partition을 추가하고, 추가한 partition 이름을 반환한다
+
+    pmax가 있다면 REORGANIZE PARTITION으로 pmax를 나누며, pmax에 저장된 행이 없다면 메타데이터만 변경된다
+
+    :param partitions: list_partitions()의 결과
+    """
+
+    bounds = [bound for _, bound in partitions if bound is not None]
+    if not bounds:
+        return []
+
+    new_bounds = []
+    bound = bounds[-1]
+    while bound <= until:
+        bound = next_month(bound)
+        new_bounds.append(bound)
+
+    if not new_bounds:
+        return []
+
+    definitions = ", ".join(_partition_definition(b) for b in new_bounds)
+    if partitions[-1][1] is None:
+        await session.execute(
+            text(
+                f"ALTER TABLE {table} REORGANIZE PARTITION {MAX_PARTITION} INTO "
+                f"({definitions}, "
+                f"PARTITION {MAX_PARTITION} VALUES LESS THAN (MAXVALUE))"
+            )
+        )
+    else:
+        await session.execute(
+            text(f"ALTER TABLE {table} ADD PARTITION ({definitions})")
+        )
+
+    return [partition_name(b) for b in new_bounds]
+
+
+async def drop_partition(session: AsyncSession, table: str, name: str) -> None:
+    if not _PARTITION_NAME.match(name) or name == MAX_PARTITION:
+        raise ValueError(f"invalid partition name: {name}")
+
+    await session.execute(text(f"ALTER TABLE {table} DROP PARTITION {name}"))
+
+
+@asynccontextmanager
+async def lock_table(session: AsyncSession, table: str):
+    """
+    LOCK TABLES ... WRITE로 다른 연결이 테이블을 읽거나 쓰지 못하도록 막는다
+
+    lock은 연결에 유지되므로 Session의 연결로 실행하며, lock을 잡은 동안에는 이 테이블만 사용할 수 있다
+    table lock은 ROLLBACK으로 해제되지 않으므로, UNLOCK TABLES에 실패하면 연결을 pool에 반납하지 않고 닫는다
+    """
+
+    conn = await session.connection()
+    await conn.execute(text(f"LOCK TABLES {table} WRITE"))
+    try:
+        yield
+    finally:
+        try:
+            await conn.execute(text("UNLOCK TABLES"))
+        except Exception:
+            await conn.invalidate()
+            raise
@@ -0,0 +1,60 @@
+from dataclasses import dataclass
+
+from core.config import settings
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """
+    worker 프로세스 하나가 사용하는 connection pool 설정
+    """
+
+    pool_size: int
+    max_overflow: int
+    pool_timeout: float
+    workers: int
+    budget: int | None
+
+    @property
+    def max_connections(self) -> int:
+        return self.pool_size + self.max_overflow
+
+
+def resolve_pool_config(budget: int | None, workers: int) -> PoolConfig:
+    """
+    호스트의 DB 연결 수 예산(budget)을 worker 수로 나누어 worker별 pool 크기를 계산한다
+
+    - 예산이 없다면 db_pool_size, db_max_overflow 설정을 그대로 사용한다
+    - worker별 연결 수 중 db_pool_overflow_ratio 만큼은 max_overflow로 두어, 평소에는 적은 연결만 유지한다
+    - pool_size + max_overflow의 합이 worker별 연결 수를 넘지 않으므로, 모든 worker가 최대로 사용해도 예산을 넘지 않는다
+
+    :param budget: 호스트의 모든 worker가 사용할 수 있는 최대 연결 수
+    :param workers: 호스트의 worker 프로세스 수
+    """
+
+    workers = max(workers, 1)
+
+    if not budget:
+        return PoolConfig(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            workers=workers,
+            budget=None,
+        )
+
+    per_worker = budget // workers
+    if per_worker < 1:
+        raise ValueError(
+            f"DB 연결 수 예산이 worker 수보다 작습니다. (budget={budget}, workers={workers})"
+        )
+
+    pool_size = max(per_worker - int(per_worker * settings.db_pool_overflow_ratio), 1)
+
+    return PoolConfig(
+        pool_size=pool_size,
+        max_overflow=per_worker - pool_size,
+        pool_timeout=settings.db_pool_timeout,
+        workers=workers,
+        budget=budget,
+    )
@@ -0,0 +1,127 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from core.metrics import metrics
+
+connection_hold_seconds = metrics.histogram(
+    "db_connection_hold_seconds", "pool에서 꺼낸 연결을 반납할 때까지 사용한 시간(초)"
+)
+request_connection_hold_seconds = metrics.histogram(
+    "db_request_connection_hold_seconds", "요청 하나가 DB 연결을 사용한 시간의 합(초)"
+)
+request_connection_checkouts = metrics.histogram(
+    "db_request_connection_checkouts",
+    "요청 하나가 pool에서 연결을 꺼낸 횟수",
+    buckets=(0, 1, 2, 3, 4, 8),
+)
+
+
+class RequestConnectionHold:
+    """
+    요청 하나가 DB 연결을 사용한 시간과 횟수
+    """
+
+    __slots__ = ("seconds", "checkouts")
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.checkouts = 0
+
+
+# AsyncSession은 greenlet에서 같은 context를 사용하므로, pool event에서 현재 요청의 값을 갱신할 수 있다
+_request_hold: ContextVar[RequestConnectionHold | None] = ContextVar(
+    "request_connection_hold", default=None
+)
+
+
+@contextmanager
+def track_request_hold():
+    """
+    블록 안에서 사용한 DB 연결 시간을 모아서 요청 단위 Metric으로 기록한다
+    """
+
+    hold = RequestConnectionHold()
+    token = _request_hold.set(hold)
+    try:
+        yield hold
+    finally:
+        _request_hold.reset(token)
+        request_connection_hold_seconds.observe(hold.seconds)
+        request_connection_checkouts.observe(hold.checkouts)
+
+
+def instrumented_pool_class(name: str) -> type[AsyncAdaptedQueuePool]:
+    """
+    연결을 꺼낼 때까지 기다린 시간과 timeout 횟수를 기록하는 pool class를 만든다
+
+    engine.dispose()로 pool이 다시 생성되어도 같은 class를 사용하므로 Metric이 유지된다
+
+    :param name: Metric 이름에 사용할 engine 이름(ex: primary, replica)
+    """
+
+    checkout_wait = metrics.histogram(
+        f"db_{name}_checkout_wait_seconds",
+        f"{name} pool에서 연결을 꺼낼 때까지 기다린 시간(초), 새 연결 생성 시간을 포함한다",
+    )
+    checkout_timeouts = metrics.counter(
+        f"db_{name}_checkout_timeouts_total", f"{name} pool에서 연결을 꺼내지 못하고 timeout된 횟수"
+    )
+
+    class InstrumentedPool(AsyncAdaptedQueuePool):
+        def connect(self):
+            started = time.perf_counter()
+            try:
+                return super().connect()
+            except exc.TimeoutError:
+                checkout_timeouts.inc()
+                raise
+            finally:
+                checkout_wait.observe(time.perf_counter() - started)
+
+    return InstrumentedPool
+
+
+def instrument_pool(engine: AsyncEngine, name: str) -> None:
+    """
+    engine의 connection pool에 연결 사용 시간, 사용 중인 연결 수 Metric을 기록하는 event를 등록한다
+
+    :param engine: Metric을 기록할 engine
+    :param name: Metric 이름에 사용할 engine 이름(ex: primary, replica)
+    """
+
+    checked_out = metrics.gauge(
+        f"db_{name}_connections_checked_out", f"{name} pool에서 사용 중인 연결 수"
+    )
+    overflow = metrics.gauge(
+        f"db_{name}_connections_overflow", f"{name} pool_size를 넘어 추가로 연결한 수"
+    )
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checkout_at"] = time.perf_counter()
+        checked_out.inc()
+        overflow.set(max(engine.sync_engine.pool.overflow(), 0))
+
+        hold = _request_hold.get()
+        if hold is not None:
+            hold.checkouts += 1
+
+    @event.listens_for(engine.sync_engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        checkout_at = connection_record.info.pop("checkout_at", None)
+        if checkout_at is None:
+            return
+
+        elapsed = time.perf_counter() - checkout_at
+        checked_out.dec()
+        overflow.set(max(engine.sync_engine.pool.overflow(), 0))
+        connection_hold_seconds.observe(elapsed)
+
+        hold = _request_hold.get()
+        if hold is not None:
+            hold.seconds += elapsed
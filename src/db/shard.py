@@ -0,0 +1,107 @@
+import hashlib
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.config import settings
+from db.base import connect_args, pool_config
+from db.pool_metrics import instrument_pool, instrumented_pool_class
+from utils.strings import uuid_to_binary
+
+#########################
+# SHARD(optional)
+#########################
+# jwt_token, user_login_history는 사용자 UUID의 hash로 정한 shard DB에 저장한다
+# users 등 나머지 테이블은 Primary에만 있으므로, shard에서는 다른 테이블과 JOIN 할 수 없다
+
+# refreshToken과 조회 키(refresh_token_key) 앞에 shard id를 붙일 때 사용하는 구분자
+# refreshToken의 random 값(hex)과 HMAC 값(hex)에는 포함되지 않는다
+SHARD_SEPARATOR = "."
+
+
+def _create_shard_engine(shard_id: int, url: str) -> AsyncEngine:
+    # shard는 각각 다른 호스트이므로 Primary와 같은 연결 수 예산으로 pool 크기를 정한다
+    shard_engine = create_async_engine(
+        url,
+        poolclass=instrumented_pool_class(f"shard{shard_id}"),
+        pool_recycle=300,
+        pool_size=pool_config.pool_size,
+        max_overflow=pool_config.max_overflow,
+        pool_timeout=pool_config.pool_timeout,
+        pool_pre_ping=True,
+        connect_args=connect_args(url),
+    )
+    instrument_pool(shard_engine, name=f"shard{shard_id}")
+
+    return shard_engine
+
+
+shard_engines: list[AsyncEngine] = [
+    _create_shard_engine(shard_id, url)
+    for shard_id, url in enumerate(settings.db_shard_urls)
+]
+
+shard_sessions: list[sessionmaker] = [
+    sessionmaker(
+        bind=shard_engine,
+        class_=AsyncSession,
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+    for shard_engine in shard_engines
+]
+
+
+def shard_for(user_uuid: bytes | str) -> int | None:
+    """
+    사용자의 토큰, 로그인 이력을 저장할 shard id를 반환한다
+
+    shard를 사용하지 않는다면 None을 반환한다
+
+    :param user_uuid: 사용자 UUID(BINARY(16) 값 또는 문자열)
+    """
+
+    if not shard_engines:
+        return None
+
+    if isinstance(user_uuid, str):
+        user_uuid = uuid_to_binary(user_uuid)
+
+    # UUIDv7은 앞부분이 시간 값이므로, 값을 그대로 나누지 않고 hash를 사용하여 고르게 분산한다
+    digest = hashlib.blake2b(user_uuid, digest_size=8).digest()
+    return int.from_bytes(digest, "big") % len(shard_engines)
+
+
+def shard_session(shard_id: int) -> AsyncSession:
+    """
+    shard DB의 Session을 생성한다
+    """
+
+    return shard_sessions[shard_id]()
+
+
+def add_shard_prefix(value: str, shard_id: int | None) -> str:
+    """
+    값 앞에 shard id를 붙인다(ex: 3.{value}), shard를 사용하지 않는다면 값을 그대로 반환한다
+    """
+
+    if shard_id is None:
+        return value
+
+    return f"{shard_id}{SHARD_SEPARATOR}{value}"
+
+
+def parse_shard_prefix(value: str) -> int | None:
+    """
+    값 앞에 붙은 shard id를 반환한다
+
+    shard id가 없거나(shard 적용 이전에 발급된 값) 현재 shard 수를 벗어나면 None을 반환한다
+    """
+
+    head, separator, _ = value.partition(SHARD_SEPARATOR)
+    if not separator or not head.isdigit():
+        return None
+
+    shard_id = int(head)
+    return shard_id if shard_id < len(shard_engines) else None
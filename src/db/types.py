@@ -0,0 +1,17 @@
+from sqlalchemy import BINARY, BigInteger, Integer
+from sqlalchemy.dialects import postgresql
+
+# SQLite는 INTEGER PRIMARY KEY 컬럼만 자동 증가(rowid)하므로 SQLite에서는 INTEGER로 생성한다
+BigIntegerPK = BigInteger().with_variant(Integer(), "sqlite")
+
+
+def FixedBinary(length: int):
+    """
+    고정 길이 바이너리 컬럼 타입
+
+    MySQL, SQLite는 BINARY(length), BINARY 타입이 없는 PostgreSQL은 BYTEA로 생성한다
+
+    :param length: byte 길이
+    """
+
+    return BINARY(length).with_variant(postgresql.BYTEA(), "postgresql")
@@ -1,12 +1,18 @@
-from fastapi import Depends, Body, Cookie
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+import hmac
+
+from fastapi import Body, Cookie, Depends
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import jwt
 from loguru import logger
 from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 
+import crud
 from core.config import settings
 from core.exceptions import TokenCredentialsException, TokenExpiredException
+from dependencies.database import get_session
 from schemas.token import UserToken
+from utils.security.generation import token_generation_cache
 
 auth_scheme = HTTPBearer(auto_error=False)
 
@@ -21,8 +27,10 @@ def _get_authorization_scheme_param(
 
 
 class AuthorizeToken:
-    def __call__(
-        self, authorization: HTTPAuthorizationCredentials = Depends(auth_scheme)
+    async def __call__(
+        self,
+        authorization: HTTPAuthorizationCredentials = Depends(auth_scheme),
+        session: AsyncSession = Depends(get_session),
     ) -> UserToken:
         scheme, token = _get_authorization_scheme_param(authorization)
 
@@ -37,8 +45,6 @@ class AuthorizeToken:
             )
             try:
                 token_data = UserToken(**payload, access_token=token)
-
-                return token_data
             except ValidationError as e:
                 logger.error(f"token validation error: {e}")
                 logger.exception(e)
@@ -52,6 +58,40 @@ class AuthorizeToken:
             logger.exception(e)
             raise TokenCredentialsException()
 
+        # 전체 로그아웃으로 토큰 세대가 증가했다면, 이전 세대의 토큰은 사용할 수 없다
+        user_dal = crud.UserDAL(session=session)
+        generation = await token_generation_cache.get(
+            token_data.sub, user_dal.get_token_generation
+        )
+        if generation is None or token_data.gen < generation:
+            logger.info(f'폐기된 토큰입니다. { {"user_id": token_data.sub} }')
+            raise TokenCredentialsException()
+
+        return token_data
+
+
+class AuthorizeInternal:
+    """
+    /internal API 호출자를 확인한다
+
+    - Authorization: Bearer 값이 internal_api_token과 일치해야 한다
+    - internal_api_token이 설정되어 있지 않다면 모든 요청을 거절한다
+    """
+
+    def __call__(
+        self, authorization: HTTPAuthorizationCredentials = Depends(auth_scheme)
+    ) -> None:
+        scheme, token = _get_authorization_scheme_param(authorization)
+
+        if (
+            not settings.internal_api_token
+            or scheme.lower() != "bearer"
+            or not hmac.compare_digest(
+                token.encode("utf-8"), settings.internal_api_token.encode("utf-8")
+            )
+        ):
+            raise TokenCredentialsException()
+
 
 class AuthorizeRefreshToken:
     def __call__(self, refresh_token: str = Body(..., embed=True)):
@@ -4,5 +4,26 @@ from db.base import async_session
 
 
 async def get_session() -> AsyncSession:
+    """
+    요청 Session을 생성한다
+
+    Session은 첫 번째 쿼리를 실행할 때 pool에서 연결을 꺼내므로(autobegin),
+    캐시나 Bloom filter로 DB를 조회하지 않고 끝나는 요청은 연결을 사용하지 않는다
+    """
+
     async with async_session() as session:
         yield session
+
+
+async def release_connection(session: AsyncSession) -> None:
+    """
+    조회를 마친 Session의 트랜잭션을 종료하여 연결을 pool에 반납한다
+
+    비밀번호 해싱, 토큰 서명/암호화처럼 오래 걸리는 작업 전에 호출하여 그동안 다른 요청이 연결을 사용할 수 있도록 한다
+    반납한 이후에도 Session은 계속 사용할 수 있으며, 다음 쿼리를 실행할 때 새로운 연결을 꺼낸다
+
+    :param session: 조회 쿼리만 실행한 요청 Session
+    """
+
+    if session.in_transaction():
+        await session.commit()
@@ -0,0 +1,61 @@
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import crud
+from core.config import settings
+from db.shard import shard_engines
+from dependencies.database import get_session
+from utils.resp import RESPClient
+
+
+class TokenStoreProvider:
+    """
+    설정(token_store)에 따라 사용할 TokenStore를 생성한다
+
+    - sql: 요청마다 요청 세션을 사용하는 SQLTokenStore를 생성한다
+    - sql(shard 사용): shard DB를 사용하는 ShardedTokenStore를 worker 프로세스에서 공유한다
+    - redis, memory: worker 프로세스에서 하나의 인스턴스를 공유한다
+    """
+
+    store: crud.TokenStore | None = None
+    client: RESPClient | None = None
+
+    @classmethod
+    def get_store(cls, session: AsyncSession) -> crud.TokenStore:
+        if settings.token_store == "sql" and not shard_engines:
+            return crud.SQLTokenStore(token_dal=crud.TokenDAL(session=session))
+
+        if cls.store is None:
+            cls.start()
+
+        return cls.store
+
+    @classmethod
+    def start(cls) -> None:
+        if cls.store is not None:
+            return
+
+        if settings.token_store == "sql":
+            cls.store = crud.ShardedTokenStore()
+        elif settings.token_store == "redis":
+            cls.client = RESPClient(url=settings.token_store_url)
+            cls.store = crud.RedisTokenStore(
+                client=cls.client, max_sessions=settings.max_active_sessions
+            )
+        elif settings.token_store == "memory":
+            cls.store = crud.MemoryTokenStore(max_sessions=settings.max_active_sessions)
+        else:
+            raise ValueError(f"unknown token store: {settings.token_store}")
+
+    @classmethod
+    async def close(cls) -> None:
+        if cls.client:
+            await cls.client.close()
+            cls.client = None
+        cls.store = None
+
+
+async def get_token_store(
+    session: AsyncSession = Depends(get_session),
+) -> crud.TokenStore:
+    return TokenStoreProvider.get_store(session=session)
@@ -33,6 +33,9 @@ else:
     if use_max_workers:
         web_concurrency = min(web_concurrency, use_max_workers)
 
+# worker 프로세스가 DB 연결 수 예산(DB_CONNECTION_BUDGET)을 나누어 pool 크기를 정할 수 있도록 실제 worker 수를 전달한다
+os.environ["WEB_WORKERS"] = str(web_concurrency)
+
 accesslog_var = os.getenv("ACCESS_LOG", "-")
 use_accesslog = accesslog_var or None
 
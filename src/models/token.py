@@ -1,17 +1,31 @@
-from sqlalchemy import Column, BigInteger, String, Text, DateTime, BINARY
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String, Text
 
 from db.base import Base
+from db.types import BigIntegerPK, FixedBinary
 from models.mixin import TimestampMixin
 
 
 class JWTToken(Base, TimestampMixin):
     __tablename__ = "jwt_token"
+    # 토큰 갱신(refresh_token_key, user_id, expires_at 조건)을 인덱스만으로 찾을 수 있도록 함께 포함한다
+    # sql/init.sql과 같은 인덱스 이름을 사용한다
+    __table_args__ = (
+        Index(
+            "idx_refresh_token_key_user_id_expires_at",
+            "refresh_token_key",
+            "user_id",
+            "expires_at",
+        ),
+    )
 
-    id = Column(BigInteger, primary_key=True, index=True)
+    id = Column(BigIntegerPK, primary_key=True)
     user_id = Column(BigInteger, index=True)
-    user_uuid = Column(BINARY(16), index=True)
-    access_token = Column(String(255), index=True)
+    user_uuid = Column(FixedBinary(16), index=True)
+    jti = Column(String(32), nullable=False, unique=True)
+    access_token = Column(String(255))
     refresh_token = Column(Text)
-    refresh_token_key = Column(String(128), index=True)
+    refresh_token_key = Column(String(128))
     issued_at = Column(DateTime)
     expires_at = Column(DateTime, index=True)
+    token_generation = Column(Integer, default=0, nullable=False)
+    user_agent = Column(String(512), nullable=True)
@@ -1,43 +1,70 @@
-from sqlalchemy import Column, BigInteger, String, SmallInteger, BINARY, DateTime, Text
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    SmallInteger,
+    String,
+    Text,
+    UniqueConstraint,
+)
 
 from db.base import Base
+from db.types import BigIntegerPK, FixedBinary
 from models.mixin import TimestampMixin
 
 
 class User(Base, TimestampMixin):
     __tablename__ = "user"
+    # 회원가입 시 중복 여부를 제약조건 이름으로 판단하므로, sql/init.sql과 같은 이름을 사용한다
+    __table_args__ = (
+        UniqueConstraint("uuid", name="uq_uuid"),
+        UniqueConstraint("email_key", "provider_id", name="uq_email_key_provider_id"),
+        UniqueConstraint("mobile_key", name="uq_mobile_key"),
+        Index("idx_token_generation", "token_generation"),
+    )
 
-    id = Column(BigInteger, primary_key=True, index=True)
-    uuid = Column(BINARY(16), unique=True)
-    email = Column(String(255), nullable=False, index=True)
-    email_key = Column(String(255), nullable=False, index=True, unique=True)
+    # email, mobile은 random IV로 암호화한 값이므로 인덱스를 만들지 않고, *_key(블라인드 인덱스)로 조회한다
+    id = Column(BigIntegerPK, primary_key=True)
+    uuid = Column(FixedBinary(16))
+    email = Column(String(255), nullable=False)
+    email_key = Column(String(255), nullable=False)
     name = Column(String(64), default=None)
-    mobile = Column(String(255), nullable=True, index=True, unique=True)
-    mobile_key = Column(String(255), nullable=True, index=True)
+    mobile = Column(String(255), nullable=True)
+    mobile_key = Column(String(255), nullable=True)
     password = Column(String(255), nullable=True)
-    salt = Column(BINARY(32))
+    salt = Column(FixedBinary(32))
     is_active = Column(SmallInteger, default=0)
-    provider_id = Column(String(64), index=True)
+    provider_id = Column(String(64))
+    token_generation = Column(Integer, default=0, nullable=False)
 
 
 class UserLoginHistory(Base, TimestampMixin):
     __tablename__ = "user_login_history"
+    # MySQL은 login_time의 월 단위 partition 테이블이며, partition 컬럼을 포함해야 하므로 PK는 (id,
+    # login_time)이다
+    # (sql/migrations/003_login_history_partition.sql) 다른 DB는 id만 PK로 생성한다
 
-    id = Column(BigInteger, primary_key=True, index=True)
+    id = Column(BigIntegerPK, primary_key=True)
     user_id = Column(BigInteger, index=True)
-    user_uuid = Column(BINARY(16), index=True)
-    login_time = Column(DateTime, default=None)
+    user_uuid = Column(FixedBinary(16))
+    login_time = Column(DateTime, nullable=False)
     login_success = Column(SmallInteger, default=0)
-    ip_address = Column(BINARY(16))
+    ip_address = Column(FixedBinary(16))
 
 
 class SocialUser(Base, TimestampMixin):
     __tablename__ = "social_user"
+    # (provider_id, sub) 조회는 unique 제약조건의 인덱스를 사용한다
+    __table_args__ = (
+        UniqueConstraint("provider_id", "sub", name="uq_provider_id_sub"),
+    )
 
-    id = Column(BigInteger, primary_key=True, index=True)
+    id = Column(BigIntegerPK, primary_key=True)
     user_id = Column(BigInteger, index=True)
-    provider_id = Column(String(64), index=True)
-    sub = Column(String(255), index=True)
+    provider_id = Column(String(64))
+    sub = Column(String(255))
     name = Column(String(128))
     nickname = Column(String(128))
     profile_picture = Column(Text)
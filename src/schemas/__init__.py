@@ -1,17 +1,26 @@
+from .history import LoginHistoryInfo, LoginHistoryListResponse
 from .login import Login, LoginHistory
+from .register import (
+    EmailAvailabilityResponse,
+    OAuthUserInsert,
+    RegisterInsert,
+    RegisterRequest,
+    RegisterResponse,
+)
+from .responses import DefaultResponse, ErrorResponse
+from .session import (
+    SessionInfo,
+    SessionListResponse,
+    SessionRevokeRequest,
+    SessionRevokeResponse,
+)
 from .token import (
-    UserToken,
+    AuthToken,
     CreateToken,
     JWTToken,
+    StoredToken,
+    TokenAccessOnly,
     TokenInsert,
     TokenUpdate,
-    TokenAccessOnly,
-    AuthToken,
-)
-from .register import (
-    RegisterRequest,
-    RegisterResponse,
-    RegisterInsert,
-    OAuthUserInsert,
+    UserToken,
 )
-from .responses import DefaultResponse, ErrorResponse
@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from schemas.responses import DefaultResponse
+
+
+class LoginHistoryInfo(BaseModel):
+    """
+    로그인 이력을 반환할 때 사용하는 스키마
+    - ip_address는 저장된 바이너리(INET6_ATON) 값을 문자열로 변환한 값이다
+    """
+
+    id: int
+    login_time: datetime
+    login_success: bool
+    ip_address: str | None
+
+
+class LoginHistoryListResponse(DefaultResponse):
+    """
+    로그인 이력 목록을 반환할 때 사용하는 스키마
+    - next_cursor가 None이라면 마지막 페이지이다
+    """
+
+    histories: list[LoginHistoryInfo]
+    next_cursor: str | None
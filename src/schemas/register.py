@@ -82,12 +82,22 @@ class RegisterResponse(DefaultResponse):
     id: int
 
 
+class EmailAvailabilityResponse(DefaultResponse):
+    """
+    이메일 주소 사용 가능 여부를 반환할 때 사용하는 스키마
+    """
+
+    available: bool
+
+
 class OAuthUserInsert(BaseModel):
     """
     OAuth 외부 유저 정보를 DB에 저장할 때 사용하는 스키마
+
+    user_id는 SocialUserDAL.get_or_create가 추가한 사용자 id로 채우므로 비워둘 수 있다
     """
 
-    user_id: int
+    user_id: int | None = None
     provider_id: str
     sub: str
     name: str
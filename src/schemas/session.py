@@ -0,0 +1,47 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+from schemas.responses import DefaultResponse
+
+
+class SessionInfo(BaseModel):
+    """
+    로그인 세션(토큰) 정보를 반환할 때 사용하는 스키마
+    - id는 accessToken의 jti claim 값이다
+    """
+
+    id: str
+    browser: str
+    os: str
+    device: str
+    issued_at: datetime
+    expires_at: datetime
+    last_active_at: datetime
+    current: bool
+
+
+class SessionListResponse(DefaultResponse):
+    """
+    세션 목록을 반환할 때 사용하는 스키마
+    - next_cursor가 None이라면 마지막 페이지이다
+    """
+
+    sessions: list[SessionInfo]
+    next_cursor: str | None
+
+
+class SessionRevokeRequest(BaseModel):
+    """
+    세션 삭제 API Request Body 스키마
+    """
+
+    session_ids: list[str] = Field(..., min_length=1, max_length=100)
+
+
+class SessionRevokeResponse(DefaultResponse):
+    """
+    세션 삭제 결과를 반환할 때 사용하는 스키마
+    """
+
+    revoked: int
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, field_validator
 
 
 class UserToken(BaseModel):
@@ -12,6 +12,8 @@ class UserToken(BaseModel):
     exp: int
     sub: str
     type: str
+    gen: int = 0
+    jti: str | None = None
     access_token: str | None
 
 
@@ -55,11 +57,49 @@ class TokenInsert(BaseModel):
 
     user_id: int
     user_uuid: bytes
+    jti: str
     access_token: str
     refresh_token: str
     refresh_token_key: str
     issued_at: datetime
     expires_at: datetime
+    token_generation: int = 0
+    user_agent: str | None = None
+
+    @field_validator("user_agent")
+    @classmethod
+    def val_user_agent(cls, v: str | None):
+        """
+        컬럼 길이를 넘는 User-Agent는 잘라서 저장한다
+        """
+        if v:
+            return v[:512]
+        return v
+
+
+class StoredToken(BaseModel):
+    """
+    TokenStore에 저장된 Token 정보를 반환할 때 사용하는 스키마
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    user_id: int
+    user_uuid: bytes
+    jti: str
+    access_token: str
+    refresh_token: str
+    refresh_token_key: str
+    issued_at: datetime
+    expires_at: datetime
+    token_generation: int = 0
+    user_agent: str | None = None
+    updated_at: datetime | None = None
+
+    # 저장소가 사용자 정보를 함께 조회한 경우에만 값이 채워진다(SQLTokenStore)
+    user_exists: bool | None = None
+    user_is_active: bool | None = None
+    user_token_generation: int | None = None
 
 
 class TokenUpdate(BaseModel):
@@ -68,6 +108,7 @@ class TokenUpdate(BaseModel):
     """
 
     user_id: int
+    jti: str
     access_token: str
     refresh_token: str
     refresh_token_key: str
@@ -96,4 +137,6 @@ class AuthToken(BaseModel):
     iat: int
     exp: int
     sub: str
+    gen: int = 0
+    jti: str | None = None
     access_token: str | None
@@ -0,0 +1,134 @@
+import hashlib
+import math
+
+
+def _hashes(key: str) -> tuple[int, int]:
+    """
+    key로부터 두 개의 64bit 해시 값을 생성한다(Kirsch-Mitzenmacher double hashing)
+    """
+
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+
+    return (
+        int.from_bytes(digest[:8], "little"),
+        int.from_bytes(digest[8:], "little") | 1,
+    )
+
+
+class BloomFilter:
+    """
+    고정 크기 Bloom filter
+
+    - capacity 개수까지 추가하였을 때 오탐률(false positive)이 error_rate 이하가 되도록 크기를 정한다
+    - 추가한 값에 대해서는 항상 True를 반환한다(false negative 없음)
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+
+        # m = -n * ln(p) / (ln 2)^2, k = (m / n) * ln 2
+        self.num_bits = max(
+            8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        )
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.count = 0
+
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, h1: int, h2: int) -> list[int]:
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def add(self, key: str) -> bool:
+        """
+        값을 추가하고, 새로 추가되었다면 True를 반환한다
+        """
+
+        return self.add_hashes(*_hashes(key))
+
+    def add_hashes(self, h1: int, h2: int) -> bool:
+        bits = self._bits
+        added = False
+        for pos in self._positions(h1, h2):
+            mask = 1 << (pos & 7)
+            if not bits[pos >> 3] & mask:
+                bits[pos >> 3] |= mask
+                added = True
+
+        if added:
+            self.count += 1
+
+        return added
+
+    def __contains__(self, key: str) -> bool:
+        return self.contains_hashes(*_hashes(key))
+
+    def contains_hashes(self, h1: int, h2: int) -> bool:
+        bits = self._bits
+        for pos in self._positions(h1, h2):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+
+        return True
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._bits)
+
+
+class ScalableBloomFilter:
+    """
+    저장할 개수를 미리 알 수 없을 때 사용하는 Bloom filter(Almeida et al., 2007)
+
+    현재 filter가 가득 차면 growth 배 크기의 filter를 추가하고, 전체 오탐률이 error_rate를 넘지 않도록
+    새로 추가하는 filter의 오탐률은 tightening 배씩 줄인다
+    """
+
+    def __init__(
+        self,
+        initial_capacity: int = 100_000,
+        error_rate: float = 0.001,
+        growth: int = 2,
+        tightening: float = 0.5,
+    ):
+        self.error_rate = error_rate
+        self._growth = growth
+        self._tightening = tightening
+        self._filters = [BloomFilter(initial_capacity, error_rate * (1 - tightening))]
+
+    def add(self, key: str) -> bool:
+        """
+        값을 추가하고, 새로 추가되었다면 True를 반환한다
+        """
+
+        h1, h2 = _hashes(key)
+        if self._contains_hashes(h1, h2):
+            return False
+
+        current = self._filters[-1]
+        if current.count >= current.capacity:
+            current = BloomFilter(
+                current.capacity * self._growth, current.error_rate * self._tightening
+            )
+            self._filters.append(current)
+
+        return current.add_hashes(h1, h2)
+
+    def _contains_hashes(self, h1: int, h2: int) -> bool:
+        # 가장 최근에 추가된(가장 큰) filter에 대부분의 값이 저장되어 있으므로 먼저 확인한다
+        for f in reversed(self._filters):
+            if f.contains_hashes(h1, h2):
+                return True
+
+        return False
+
+    def __contains__(self, key: str) -> bool:
+        return self._contains_hashes(*_hashes(key))
+
+    def __len__(self) -> int:
+        return sum(f.count for f in self._filters)
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(f.size_bytes for f in self._filters)
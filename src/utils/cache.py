@@ -0,0 +1,117 @@
+import time
+from typing import Any, Awaitable, Callable, Hashable, Iterable
+
+from core.metrics import metrics
+
+
+class TTLCache:
+    """
+    최대 개수와 유지 시간(ttl)이 정해진 프로세스 메모리 캐시
+
+    - 최대 개수를 넘어서면 가장 먼저 저장된 항목부터 제거한다
+    - 값을 저장할 때 owner(ex: 'id:1', 'uuid:...')를 함께 등록하면, owner 단위로 무효화할 수 있다
+    - None은 캐싱하지 않는다
+    - hit, miss, eviction 수와 저장된 항목 수를 {name}_cache_* Metric으로 기록한다
+    """
+
+    def __init__(self, name: str, ttl: int, max_size: int):
+        self._ttl = ttl
+        self._max_size = max_size
+        self._items: dict[Hashable, tuple[Any, float, tuple[str, ...]]] = {}
+        self._owners: dict[str, set[Hashable]] = {}
+
+        self._hits = metrics.counter(f"{name}_cache_hits_total", f"{name} 캐시 hit 수")
+        self._misses = metrics.counter(
+            f"{name}_cache_misses_total", f"{name} 캐시 miss 수"
+        )
+        self._evictions = metrics.counter(
+            f"{name}_cache_evictions_total", f"{name} 캐시에서 최대 개수를 넘어 제거된 항목 수"
+        )
+        self._invalidations = metrics.counter(
+            f"{name}_cache_invalidations_total", f"{name} 캐시에서 무효화된 항목 수"
+        )
+        self._size = metrics.gauge(f"{name}_cache_size", f"{name} 캐시에 저장된 항목 수")
+
+    def peek(self, key: Hashable) -> Any | None:
+        """
+        캐싱된 값을 반환하고, 없거나 만료되었다면 None을 반환한다(metric을 기록하지 않는다)
+        """
+
+        item = self._items.get(key)
+        if item and item[1] > time.monotonic():
+            return item[0]
+
+        return None
+
+    async def get(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        owners: Callable[[Any], Iterable[str]] | None = None,
+    ) -> Any:
+        """
+        캐싱된 값을 반환한다. 캐시에 없거나 만료되었다면 loader로 조회한 값을 저장한 후 반환한다
+
+        :param key: 캐시 key
+        :param loader: 캐시에 값이 없을 때 값을 조회하는 함수
+        :param owners: 조회한 값으로 무효화에 사용할 owner 목록을 만드는 함수
+        """
+
+        item = self._items.get(key)
+        if item and item[1] > time.monotonic():
+            self._hits.inc()
+            return item[0]
+
+        self._misses.inc()
+
+        value = await loader()
+        if value is None:
+            return None
+
+        self._set(key, value, tuple(owners(value)) if owners else ())
+
+        return value
+
+    def _set(self, key: Hashable, value: Any, owners: tuple[str, ...]) -> None:
+        self._remove(key)
+        while len(self._items) >= self._max_size:
+            self._remove(next(iter(self._items)))
+            self._evictions.inc()
+
+        self._items[key] = (value, time.monotonic() + self._ttl, owners)
+        for owner in owners:
+            self._owners.setdefault(owner, set()).add(key)
+
+        self._size.set(len(self._items))
+
+    def _remove(self, key: Hashable) -> bool:
+        item = self._items.pop(key, None)
+        if item is None:
+            return False
+
+        for owner in item[2]:
+            keys = self._owners.get(owner)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._owners[owner]
+
+        self._size.set(len(self._items))
+        return True
+
+    def invalidate(self, key: Hashable) -> None:
+        if self._remove(key):
+            self._invalidations.inc()
+
+    def invalidate_owner(self, owner: str) -> None:
+        """
+        owner로 등록된 모든 항목을 삭제한다
+        """
+
+        for key in list(self._owners.get(owner, ())):
+            self.invalidate(key)
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._owners.clear()
+        self._size.set(0)
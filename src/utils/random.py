@@ -1,6 +1,9 @@
 # 랜덤 바이트 시퀀스 생성
 import base64
 import os
+import threading
+import time
+import uuid
 
 
 def generate_random_bytes(length: int = 16):
@@ -28,3 +31,48 @@ def generate_random_state() -> str:
     random_bytes = generate_random_bytes()
 
     return bytes_to_base64(random_bytes).replace("=", "")
+
+
+_uuid7_lock = threading.Lock()
+_uuid7_last_ms = 0
+_uuid7_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    """
+    시간 순서로 정렬되는 UUID version 7(RFC 9562)을 생성한다
+
+    - 앞 48bit는 Unix time(ms)이므로 새로 생성한 값은 항상 B-tree 인덱스의 오른쪽 끝에 추가된다
+    - 같은 ms 안에서는 12bit counter(rand_a)를 증가시켜 같은 프로세스에서 생성한 값의 순서를 보장한다
+    - 나머지 62bit는 random 값이며, uuid4와 같이 16 bytes(UUID.bytes)로 저장하고 binary_to_uuid로 변환할 수
+      있다
+    """
+
+    global _uuid7_last_ms, _uuid7_counter
+
+    with _uuid7_lock:
+        now_ms = time.time_ns() // 1_000_000
+
+        if now_ms > _uuid7_last_ms:
+            _uuid7_last_ms = now_ms
+            # counter의 시작 값을 random으로 정하되, 같은 ms에 증가할 여유를 남긴다
+            _uuid7_counter = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        else:
+            _uuid7_counter += 1
+            if _uuid7_counter > 0xFFF:
+                # counter를 모두 사용했다면 다음 ms의 값으로 생성한다
+                _uuid7_last_ms += 1
+                _uuid7_counter = 0
+
+        unix_ts_ms = _uuid7_last_ms
+        rand_a = _uuid7_counter
+
+    rand_b = int.from_bytes(os.urandom(8), "big") & 0x3FFF_FFFF_FFFF_FFFF
+
+    value = (unix_ts_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76
+    value |= rand_a << 64
+    value |= 0b10 << 62
+    value |= rand_b
+
+    return uuid.UUID(int=value)
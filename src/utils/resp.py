@@ -0,0 +1,188 @@
+import asyncio
+from typing import Any
+from urllib import parse
+
+
+class RESPError(Exception):
+    """Redis 프로토콜 서버가 반환한 에러"""
+
+    pass
+
+
+def _encode_command(args: tuple) -> bytes:
+    """
+    명령어를 RESP Array of Bulk Strings 형식으로 인코딩한다
+    """
+
+    out = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, bytes):
+            value = arg
+        elif isinstance(arg, str):
+            value = arg.encode("utf-8")
+        else:
+            value = str(arg).encode("utf-8")
+        out.append(b"$%d\r\n%s\r\n" % (len(value), value))
+
+    return b"".join(out)
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    async def read_reply(self) -> Any:
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("connection closed by server")
+
+        prefix, body = line[:1], line[1:-2]
+
+        if prefix == b"+":
+            return body.decode("utf-8")
+        if prefix == b"-":
+            return RESPError(body.decode("utf-8"))
+        if prefix == b":":
+            return int(body)
+        if prefix == b"$":
+            length = int(body)
+            if length == -1:
+                return None
+            data = await self.reader.readexactly(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            length = int(body)
+            if length == -1:
+                return None
+            return [await self.read_reply() for _ in range(length)]
+
+        raise RESPError(f"unknown reply type: {line!r}")
+
+    async def execute_many(self, commands: list[tuple]) -> list[Any]:
+        self.writer.write(b"".join(_encode_command(c) for c in commands))
+        await self.writer.drain()
+
+        return [await self.read_reply() for _ in commands]
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class RESPClient:
+    """
+    Redis 프로토콜(RESP2)을 사용하는 서버를 위한 최소한의 비동기 클라이언트
+
+    - Redis, KeyDB, Dragonfly, Valkey 등 RESP 호환 서버에서 사용할 수 있다
+    - 여러 명령어를 한 번의 왕복으로 전송하는 pipeline을 지원한다
+    - url 형식: redis://[:password@]host[:port][/db]
+    """
+
+    def __init__(self, url: str, max_connections: int = 10):
+        parsed = parse.urlparse(url)
+
+        self._host = parsed.hostname or "localhost"
+        self._port = parsed.port or 6379
+        self._password = parse.unquote(parsed.password) if parsed.password else None
+        self._username = parse.unquote(parsed.username) if parsed.username else None
+        self._db = int(parsed.path.lstrip("/") or 0)
+
+        self._idle: asyncio.LifoQueue[_Connection] = asyncio.LifoQueue()
+        self._semaphore = asyncio.Semaphore(max_connections)
+
+    async def _connect(self) -> _Connection:
+        reader, writer = await asyncio.open_connection(self._host, self._port)
+        conn = _Connection(reader, writer)
+
+        commands = []
+        if self._password:
+            if self._username:
+                commands.append(("AUTH", self._username, self._password))
+            else:
+                commands.append(("AUTH", self._password))
+        if self._db:
+            commands.append(("SELECT", self._db))
+
+        if commands:
+            for reply in await conn.execute_many(commands):
+                if isinstance(reply, RESPError):
+                    conn.close()
+                    raise reply
+
+        return conn
+
+    async def pipeline(self, commands: list[tuple]) -> list[Any]:
+        """
+        여러 명령어를 한 번에 전송하고 결과 목록을 반환한다
+
+        명령어 중 하나라도 에러가 발생하면 RESPError를 발생시킨다
+        """
+
+        async with self._semaphore:
+            for attempt in range(2):
+                try:
+                    conn, reused = self._idle.get_nowait(), True
+                except asyncio.QueueEmpty:
+                    conn, reused = await self._connect(), False
+
+                try:
+                    replies = await conn.execute_many(commands)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    conn.close()
+                    # 서버가 이미 끊은 유휴 연결이었다면 새 연결로 한 번 더 시도한다
+                    if reused and attempt == 0:
+                        continue
+                    raise
+                except BaseException:
+                    # 응답을 모두 읽지 못한 연결은 재사용하지 않는다
+                    conn.close()
+                    raise
+
+                self._idle.put_nowait(conn)
+                break
+
+        for reply in replies:
+            if isinstance(reply, RESPError):
+                raise reply
+
+        return replies
+
+    async def subscribe(self, channel: str):
+        """
+        channel을 구독하고, 수신한 메시지를 순서대로 반환하는 async generator
+
+        구독 중인 연결은 다른 명령어를 실행할 수 없으므로 pipeline 연결과 별도로 생성한다
+        """
+
+        conn = await self._connect()
+        try:
+            for reply in await conn.execute_many([("SUBSCRIBE", channel)]):
+                if isinstance(reply, RESPError):
+                    raise reply
+
+            while True:
+                reply = await conn.read_reply()
+                if not isinstance(reply, list) or len(reply) != 3:
+                    continue
+
+                kind = (
+                    reply[0].decode("utf-8")
+                    if isinstance(reply[0], bytes)
+                    else reply[0]
+                )
+                if kind == "message":
+                    yield reply[2]
+        finally:
+            conn.close()
+
+    async def execute(self, *args) -> Any:
+        """
+        하나의 명령어를 전송하고 결과를 반환한다
+        """
+
+        replies = await self.pipeline([args])
+        return replies[0]
+
+    async def close(self) -> None:
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
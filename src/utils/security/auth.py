@@ -1,10 +1,36 @@
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+from core.metrics import metrics
 from utils.security.encryption import Hasher
 
+password_verify_cost = metrics.gauge(
+    "password_verify_cpu_seconds", "비밀번호 확인(PBKDF2) 한 번의 CPU 시간(초, 지수 이동 평균)"
+)
+
+
+def _verify_password(plain_password: str, hashed_password: str, salt: bytes) -> bool:
+    started = time.thread_time()
+    verified = Hasher.verify_password(
+        plain_password=plain_password, hashed_password=hashed_password, salt=salt
+    )
+    elapsed = time.thread_time() - started
+
+    previous = password_verify_cost.snapshot()
+    password_verify_cost.set(
+        elapsed if not previous else previous * 0.9 + elapsed * 0.1
+    )
+
+    return verified
+
 
 async def authenticate(plain_password: str, user_password: str, salt: bytes) -> bool:
     """
     사용자 비밀번호를 인증 후 결과를 반환한다
 
+    PBKDF2 해싱은 event loop를 막지 않도록 threadpool에서 실행한다
+
     :param plain_password: 로그인 요청 시에 사용자가 전달한 비밀번호
     :param user_password: Database에 저장된 사용자의 비밀번호
     :param salt: Database에 저장된 사용자의 비밀번호 Salt
@@ -15,9 +41,24 @@ async def authenticate(plain_password: str, user_password: str, salt: bytes) ->
     if not plain_password or not user_password:
         return False
 
-    if not Hasher.verify_password(
-        plain_password=plain_password, hashed_password=user_password, salt=salt
+    if not await run_in_threadpool(
+        _verify_password,
+        plain_password=plain_password,
+        hashed_password=user_password,
+        salt=salt,
     ):
         return False
 
     return True
+
+
+async def hash_password(password: str, salt: bytes) -> str:
+    """
+    회원가입 시 저장할 비밀번호 해시를 threadpool에서 생성한다
+
+    :param password: 사용자가 입력한 비밀번호
+    :param salt: 비밀번호 Salt
+    :return: PBKDF2로 해싱된 비밀번호
+    """
+
+    return await run_in_threadpool(Hasher.get_password_hash, password, salt)
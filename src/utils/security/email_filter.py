@@ -0,0 +1,110 @@
+import time
+
+from core.config import settings
+from core.invalidation import invalidation_bus
+from utils.bloom import ScalableBloomFilter
+from utils.constants.oauth import ProviderID
+
+
+class RegisteredEmailFilter:
+    """
+    가입된 로컬(LOCAL) 계정 email_key의 Bloom filter
+
+    - filter에 없는 이메일은 가입되지 않은 이메일이므로 DB를 조회하지 않고 로그인을 거절할 수 있다
+    - filter에 있는 이메일은 오탐일 수 있으므로 DB에서 확인해야 한다
+    - 가입 이벤트(user_inserted)를 invalidation_bus로 수신하여 추가한다
+    - local bus라면 다른 worker에서 가입한 이메일은 다음 동기화(email_filter_sync_seconds) 이후에 반영된다
+    - filter를 새로 만드는 동안 수신한 이메일은 새 filter에도 추가하여 교체할 때 유실되지 않도록 한다
+    - filter가 만들어지기 전에는 모든 이메일이 존재할 수 있다고 판단한다
+    """
+
+    def __init__(self, enabled: bool, error_rate: float):
+        self.enabled = enabled
+        self.error_rate = error_rate
+        # 동기화된 user.id의 최댓값으로, 이후 가입된 사용자만 추가로 조회한다
+        self.synced_id = 0
+        self.synced_at: float | None = None
+
+        self._filter: ScalableBloomFilter | None = None
+        # 새로 만들고 있는 filter로, 교체되기 전까지 가입 이벤트를 함께 추가한다
+        self._building: ScalableBloomFilter | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.enabled and self._filter is not None
+
+    def might_exist(self, email_key: str) -> bool:
+        """
+        가입된 이메일일 수 있다면 True를, 가입되지 않은 이메일이 확실하다면 False를 반환한다
+        """
+
+        if not self.ready:
+            return True
+
+        return email_key in self._filter
+
+    def add(self, email_key: str) -> None:
+        if self._filter is not None:
+            self._filter.add(email_key)
+        if self._building is not None:
+            self._building.add(email_key)
+
+    def begin_build(self, new_filter: ScalableBloomFilter) -> None:
+        """
+        새로 만들 filter를 등록하여, 교체(replace)하기 전까지 가입한 이메일도 추가되도록 한다
+        """
+
+        self._building = new_filter
+
+    def end_build(self) -> None:
+        self._building = None
+
+    def extend(self, email_keys: list[str], synced_id: int) -> None:
+        """
+        동기화 이후에 가입한 사용자의 email_key를 추가한다
+        """
+
+        if self._filter is None:
+            return
+
+        for email_key in email_keys:
+            self._filter.add(email_key)
+
+        self.synced_id = max(self.synced_id, synced_id)
+        self.synced_at = time.monotonic()
+
+    def replace(self, new_filter: ScalableBloomFilter, synced_id: int) -> None:
+        """
+        새로 만든 filter로 교체한다(탈퇴 등으로 삭제된 이메일은 다시 만들 때 반영된다)
+        """
+
+        self._filter = new_filter
+        self._building = None
+        self.synced_id = synced_id
+        self.synced_at = time.monotonic()
+
+    @property
+    def count(self) -> int:
+        return len(self._filter) if self._filter is not None else 0
+
+    @property
+    def size_bytes(self) -> int:
+        return self._filter.size_bytes if self._filter is not None else 0
+
+
+registered_email_filter = RegisteredEmailFilter(
+    enabled=settings.email_filter_enabled,
+    error_rate=settings.email_filter_error_rate,
+)
+
+
+def _on_invalidation(event: dict) -> None:
+    if (
+        event.get("type") == "user_inserted"
+        and event.get("provider_id") == ProviderID.LOCAL.name
+        and event.get("email_key")
+    ):
+        registered_email_filter.add(event["email_key"])
+
+
+invalidation_bus.subscribe(_on_invalidation)
@@ -0,0 +1,69 @@
+import time
+from typing import Awaitable, Callable
+
+from core.config import settings
+from core.invalidation import invalidation_bus
+
+
+class TokenGenerationCache:
+    """
+    사용자별 토큰 세대(token_generation)를 프로세스 메모리에 캐싱한다
+
+    - accessToken을 검증할 때마다 DB를 조회하지 않도록 ttl(초) 동안 값을 유지한다
+    - 전체 로그아웃 시 invalidation_bus로 무효화되며, local bus라면 다른 worker에는 ttl 이후에 반영된다
+    """
+
+    def __init__(self, ttl: int, max_size: int = 100_000):
+        self._ttl = ttl
+        self._max_size = max_size
+        self._items: dict[str, tuple[int, float]] = {}
+
+    async def get(
+        self, uuid: str, loader: Callable[[str], Awaitable[int | None]]
+    ) -> int | None:
+        """
+        캐싱된 토큰 세대를 반환한다. 캐시에 없거나 만료되었다면 loader로 조회한다
+
+        :param uuid: 문자열 타입의 사용자 UUID
+        :param loader: 캐시에 값이 없을 때 토큰 세대를 조회하는 함수
+        :return: 사용자의 토큰 세대를 반환하고, 사용자가 없다면 None을 반환한다
+        """
+
+        now = time.monotonic()
+
+        item = self._items.get(uuid)
+        if item and item[1] > now:
+            return item[0]
+
+        generation = await loader(uuid)
+        if generation is None:
+            return None
+
+        # 최대 크기를 넘어서면 가장 먼저 저장된 항목부터 제거한다
+        self._items.pop(uuid, None)
+        while len(self._items) >= self._max_size:
+            self._items.pop(next(iter(self._items)))
+
+        self._items[uuid] = (generation, now + self._ttl)
+
+        return generation
+
+    def invalidate(self, uuid: str) -> None:
+        """
+        사용자의 캐싱된 토큰 세대를 삭제한다
+        """
+
+        self._items.pop(uuid, None)
+
+
+token_generation_cache = TokenGenerationCache(
+    ttl=settings.token_generation_cache_seconds
+)
+
+
+def _on_invalidation(event: dict) -> None:
+    if event.get("type") == "user_changed" and event.get("uuid"):
+        token_generation_cache.invalidate(event["uuid"])
+
+
+invalidation_bus.subscribe(_on_invalidation)
@@ -0,0 +1,356 @@
+import math
+import time
+from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from loguru import logger
+
+from core.config import settings
+from core.metrics import metrics
+from utils.resp import RESPClient
+from utils.security.auth import password_verify_cost
+
+lockout_rejects = metrics.counter(
+    "login_lockout_rejects_total", "잠금 상태여서 비밀번호를 확인하지 않고 거절한 로그인 요청 수"
+)
+lockout_saved_cpu = metrics.counter(
+    "login_lockout_saved_cpu_seconds_total",
+    "잠금으로 거절하여 실행하지 않은 비밀번호 해싱(PBKDF2)의 CPU 시간 추정치(초)",
+)
+lockouts = metrics.counter("login_lockouts_total", "로그인 실패로 계정 또는 IP를 잠근 횟수")
+lockout_errors = metrics.counter(
+    "login_lockout_errors_total", "저장소 오류로 잠금을 확인/기록하지 못한 횟수(잠금 없이 처리한다)"
+)
+
+
+class FailureStore(metaclass=ABCMeta):
+    """
+    로그인 실패 횟수와 잠금 상태를 저장하는 저장소
+
+    - MemoryFailureStore: 현재 프로세스의 메모리에 저장한다(기본값)
+    - RESPFailureStore: Redis 프로토콜 서버에 저장하여 다른 worker, node와 공유한다
+
+    실패 횟수는 sliding window counter(직전 window의 횟수를 지나간 비율만큼 줄여서 더한 값)로 계산하므로
+    키마다 두 개의 값만 유지한다
+    """
+
+    def __init__(self, window: int):
+        self._window = window
+
+    def _weighted(self, now: float, previous: int, current: int) -> float:
+        elapsed = (now % self._window) / self._window
+        return previous * (1 - elapsed) + current
+
+    @abstractmethod
+    async def record_failures(self, keys: list[str]) -> list[float]:
+        """
+        키별 실패 횟수를 하나씩 증가시키고, 증가된 sliding window 실패 횟수를 반환한다
+        """
+        pass
+
+    @abstractmethod
+    async def lock(self, key: str, seconds: float) -> None:
+        pass
+
+    @abstractmethod
+    async def locked_for(self, keys: list[str]) -> float:
+        """
+        키 중 가장 오래 남은 잠금 시간(초)을 반환한다, 잠겨있지 않다면 0을 반환한다
+        """
+        pass
+
+    @abstractmethod
+    async def reset(self, keys: list[str]) -> None:
+        """
+        키의 실패 횟수와 잠금을 삭제한다
+        """
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+@dataclass(slots=True)
+class _Entry:
+    window: int
+    previous: int
+    current: int
+
+
+class MemoryFailureStore(FailureStore):
+    """
+    현재 프로세스의 메모리에 저장하는 FailureStore
+
+    - 다른 worker와 공유하지 않으므로 worker 수만큼 더 시도할 수 있다
+    - 많은 IP에서 시도하더라도 실패 횟수는 max_keys 개까지만 유지하며, 오래 갱신되지 않은 키부터 삭제한다
+    - 잠금은 실패 횟수와 따로 유지하여, 많은 키로 실패 횟수를 밀어내더라도 잠금이 풀리지 않도록 한다
+      잠금이 max_keys 개를 넘으면 잠금 시간이 지난 키만 삭제한다
+    """
+
+    def __init__(self, window: int, max_keys: int):
+        super().__init__(window)
+        self._max_keys = max_keys
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        # 키별 잠금 해제 시각
+        self._locks: dict[str, float] = {}
+        self._prune_locks_at = max_keys
+
+    def _entry(self, key: str, now: float) -> _Entry:
+        window = int(now // self._window)
+
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = _Entry(window=window, previous=0, current=0)
+            self._entries[key] = entry
+            if len(self._entries) > self._max_keys:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+
+        if entry.window != window:
+            entry.previous = entry.current if entry.window == window - 1 else 0
+            entry.current = 0
+            entry.window = window
+
+        return entry
+
+    async def record_failures(self, keys: list[str]) -> list[float]:
+        now = time.time()
+
+        counts = []
+        for key in keys:
+            entry = self._entry(key, now)
+            entry.current += 1
+            counts.append(self._weighted(now, entry.previous, entry.current))
+
+        return counts
+
+    async def lock(self, key: str, seconds: float) -> None:
+        now = time.time()
+        self._locks[key] = max(self._locks.get(key, 0), now + seconds)
+
+        if len(self._locks) > self._prune_locks_at:
+            self._locks = {k: until for k, until in self._locks.items() if until > now}
+            # 잠금 중인 키가 많다면 매번 전체를 확인하지 않도록 다음 확인 시점을 늘린다
+            self._prune_locks_at = max(self._max_keys, len(self._locks) * 2)
+
+    async def locked_for(self, keys: list[str]) -> float:
+        now = time.time()
+
+        remaining = 0.0
+        for key in keys:
+            locked_until = self._locks.get(key)
+            if locked_until is not None:
+                remaining = max(remaining, locked_until - now)
+
+        return remaining
+
+    async def reset(self, keys: list[str]) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+            self._locks.pop(key, None)
+
+
+class RESPFailureStore(FailureStore):
+    """
+    Redis 프로토콜 서버에 저장하는 FailureStore
+
+    - {prefix}fail:{key}:{window}: window별 실패 횟수(STRING), 두 window가 지나면 자동으로 삭제된다
+    - {prefix}lock:{key}: 잠금(STRING), 잠금 시간이 지나면 자동으로 삭제된다
+    - 실패 기록과 잠금 확인은 각각 한 번의 왕복(pipeline)으로 처리한다
+    """
+
+    def __init__(self, client: RESPClient, window: int, prefix: str = "auth:"):
+        super().__init__(window)
+        self._client = client
+        self._prefix = prefix
+
+    def _fail_key(self, key: str, window: int) -> str:
+        return f"{self._prefix}fail:{key}:{window}"
+
+    def _lock_key(self, key: str) -> str:
+        return f"{self._prefix}lock:{key}"
+
+    async def record_failures(self, keys: list[str]) -> list[float]:
+        now = time.time()
+        window = int(now // self._window)
+
+        commands = []
+        for key in keys:
+            commands.append(("INCR", self._fail_key(key, window)))
+            commands.append(("EXPIRE", self._fail_key(key, window), self._window * 2))
+            commands.append(("GET", self._fail_key(key, window - 1)))
+        replies = await self._client.pipeline(commands)
+
+        return [
+            self._weighted(now, int(replies[i + 2] or 0), int(replies[i]))
+            for i in range(0, len(replies), 3)
+        ]
+
+    async def lock(self, key: str, seconds: float) -> None:
+        await self._client.execute(
+            "SET", self._lock_key(key), 1, "PX", max(int(seconds * 1000), 1)
+        )
+
+    async def locked_for(self, keys: list[str]) -> float:
+        replies = await self._client.pipeline(
+            [("PTTL", self._lock_key(key)) for key in keys]
+        )
+
+        # 키가 없다면 -2, 만료 시간이 없다면 -1을 반환한다
+        return max([int(r) for r in replies] + [0]) / 1000
+
+    async def reset(self, keys: list[str]) -> None:
+        window = int(time.time() // self._window)
+
+        names = []
+        for key in keys:
+            names.extend(
+                (
+                    self._fail_key(key, window),
+                    self._fail_key(key, window - 1),
+                    self._lock_key(key),
+                )
+            )
+        await self._client.execute("DEL", *names)
+
+    async def close(self) -> None:
+        await self._client.close()
+
+
+class LoginLockout:
+    """
+    로그인 실패 횟수에 따라 계정과 IP의 로그인을 점진적으로 잠근다
+
+    - 계정(email_key)과 IP별로 window 초 동안의 실패 횟수를 센다
+    - 실패 횟수가 threshold 이상이면 base_seconds부터 실패할 때마다 두 배씩(최대 max_seconds) 잠근다
+    - 잠긴 계정/IP의 로그인은 사용자 조회와 비밀번호 해싱(PBKDF2) 전에 거절한다
+    - 한 IP에서 여러 사용자가 접속할 수 있으므로(NAT 등) IP의 threshold는 계정보다 크게 설정한다
+    - 로그인에 성공하면 계정의 실패 횟수를 초기화한다, IP의 실패 횟수는 유지한다
+    - 저장소 오류는 로그인을 막지 않도록 잠금이 없는 것으로 처리한다
+    """
+
+    def __init__(
+        self,
+        store: FailureStore,
+        account_threshold: int,
+        ip_threshold: int,
+        base_seconds: float,
+        max_seconds: float,
+    ):
+        self._store = store
+        self._thresholds = {"account": account_threshold, "ip": ip_threshold}
+        self._base_seconds = base_seconds
+        self._max_seconds = max_seconds
+
+    @staticmethod
+    def _keys(email_key: str | None, ip_address: str | None) -> dict[str, str]:
+        keys = {}
+        if email_key:
+            keys["account"] = f"account:{email_key}"
+        if ip_address:
+            keys["ip"] = f"ip:{ip_address}"
+        return keys
+
+    async def check(self, email_key: str, ip_address: str | None) -> float:
+        """
+        계정 또는 IP가 잠겨있다면 남은 잠금 시간(초)을, 아니라면 0을 반환한다
+
+        잠겨있다면 실행하지 않은 비밀번호 해싱의 CPU 시간을 metric에 더한다
+        """
+
+        try:
+            remaining = await self._store.locked_for(
+                list(self._keys(email_key, ip_address).values())
+            )
+        except Exception as e:
+            lockout_errors.inc()
+            logger.warning(f"로그인 잠금을 확인하지 못했습니다. { {'error': repr(e)} }")
+            return 0
+
+        if remaining > 0:
+            lockout_rejects.inc()
+            lockout_saved_cpu.inc(password_verify_cost.snapshot())
+
+        return remaining
+
+    async def fail(self, email_key: str | None, ip_address: str | None) -> None:
+        """
+        로그인 실패를 기록하고, 실패 횟수가 threshold 이상이면 잠근다
+
+        :param email_key: 비밀번호가 일치하지 않은 계정의 email_key, 가입되지 않은 이메일이라면 None(IP만 기록)
+        :param ip_address: 요청 IP
+        """
+
+        keys = self._keys(email_key, ip_address)
+        if not keys:
+            return
+
+        try:
+            counts = await self._store.record_failures(list(keys.values()))
+
+            for (kind, key), count in zip(keys.items(), counts):
+                excess = int(count) - self._thresholds[kind]
+                if excess < 0:
+                    continue
+
+                seconds = min(
+                    self._base_seconds * 2 ** min(excess, 32), self._max_seconds
+                )
+                await self._store.lock(key, seconds)
+                lockouts.inc()
+                logger.info(
+                    f"로그인 실패가 반복되어 잠금합니다. { {'kind': kind, 'failures': math.floor(count), 'seconds': seconds} }"
+                )
+        except Exception as e:
+            lockout_errors.inc()
+            logger.warning(f"로그인 실패를 기록하지 못했습니다. { {'error': repr(e)} }")
+
+    async def succeed(self, email_key: str) -> None:
+        try:
+            await self._store.reset(list(self._keys(email_key, None).values()))
+        except Exception as e:
+            lockout_errors.inc()
+            logger.warning(f"로그인 실패 횟수를 초기화하지 못했습니다. { {'error': repr(e)} }")
+
+    async def close(self) -> None:
+        await self._store.close()
+
+
+def create_login_lockout() -> LoginLockout | None:
+    """
+    설정(login_lockout_enabled)이 켜져 있다면 LoginLockout을 생성하고, 아니라면 None을 반환한다
+    """
+
+    if not settings.login_lockout_enabled:
+        return None
+
+    if settings.login_lockout_backend == "redis":
+        if not settings.login_lockout_url:
+            raise ValueError("login_lockout_url is required for redis login lockout")
+
+        store = RESPFailureStore(
+            client=RESPClient(settings.login_lockout_url),
+            window=settings.login_lockout_window_seconds,
+        )
+    elif settings.login_lockout_backend == "memory":
+        store = MemoryFailureStore(
+            window=settings.login_lockout_window_seconds,
+            max_keys=settings.login_lockout_max_keys,
+        )
+    else:
+        raise ValueError(
+            f"unknown login lockout backend: {settings.login_lockout_backend}"
+        )
+
+    return LoginLockout(
+        store=store,
+        account_threshold=settings.login_lockout_account_threshold,
+        ip_threshold=settings.login_lockout_ip_threshold,
+        base_seconds=settings.login_lockout_base_seconds,
+        max_seconds=settings.login_lockout_max_seconds,
+    )
+
+
+login_lockout = create_login_lockout()
@@ -4,18 +4,38 @@ from datetime import datetime, timedelta
 from jose import jwt
 
 from core.config import settings
+from db.shard import SHARD_SEPARATOR, add_shard_prefix, shard_for
 from schemas import token
+from utils.security.encryption import Hasher
 
 
-async def create_new_jwt_token(*, sub: str) -> token.JWTToken:
+def generate_jti() -> str:
+    """
+    Token 식별자(jti)를 생성한다
+
+    jti는 로그인 세션을 식별하며, 토큰을 갱신하더라도 같은 값을 사용한다
+    """
+
+    return secrets.token_hex(16)
+
+
+async def create_new_jwt_token(
+    *, sub: str, jti: str, generation: int = 0
+) -> token.JWTToken:
     """
     사용자에게 반환할 JWT 토큰을 생성한다
+
+    :param sub: 사용자 UUID
+    :param jti: 로그인 세션 식별자로, accessToken의 'jti' claim에 저장된다
+    :param generation: 사용자의 현재 토큰 세대로, accessToken의 'gen' claim에 저장된다
     """
     # token 발급 시간
     iat = int(datetime.now().timestamp())
 
-    access_token: token.CreateToken = await create_access_token(sub=sub, iat=iat)
-    refresh_token: token.CreateToken = await create_refresh_token()
+    access_token: token.CreateToken = await create_access_token(
+        sub=sub, iat=iat, jti=jti, generation=generation
+    )
+    refresh_token: token.CreateToken = await create_refresh_token(sub=sub)
 
     return token.JWTToken(
         token_type="Bearer",
@@ -29,7 +49,9 @@ async def create_new_jwt_token(*, sub: str) -> token.JWTToken:
     )
 
 
-async def create_access_token(*, sub: str, iat: int = None) -> token.CreateToken:
+async def create_access_token(
+    *, sub: str, iat: int = None, jti: str = None, generation: int = 0
+) -> token.CreateToken:
     """
     AccessToken을 생성한다
     """
@@ -38,11 +60,18 @@ async def create_access_token(*, sub: str, iat: int = None) -> token.CreateToken
         expires_in=timedelta(minutes=settings.jwt_access_token_expire_minutes),
         sub=sub,
         iat=iat,
+        jti=jti,
+        generation=generation,
     )
 
 
 def _create_token(
-    token_type: str, expires_in: timedelta, sub: str, iat: int
+    token_type: str,
+    expires_in: timedelta,
+    sub: str,
+    iat: int,
+    jti: str = None,
+    generation: int = 0,
 ) -> token.CreateToken:
     """
     Token을 생성한다
@@ -57,6 +86,9 @@ def _create_token(
     payload["exp"] = exp
     payload["sub"] = sub
     payload["type"] = token_type
+    payload["gen"] = generation
+    if jti:
+        payload["jti"] = jti
 
     jwt_token = jwt.encode(
         payload, key=settings.jwt_access_secret_key, algorithm=settings.jwt_algorithm
@@ -65,13 +97,35 @@ def _create_token(
     return token.CreateToken(token=jwt_token, expires_in=exp)
 
 
-async def create_refresh_token() -> token.CreateToken:
+async def create_refresh_token(sub: str | None = None) -> token.CreateToken:
     """
     RefreshToken을 생성한다
+
+    shard를 사용한다면 토큰 갱신 시 저장된 shard를 바로 찾을 수 있도록 사용자의 shard id를 앞에 붙인다
+
+    :param sub: 사용자 UUID
     """
 
     random_token = secrets.token_hex(80)
+    if sub is not None:
+        random_token = add_shard_prefix(random_token, shard_for(sub))
     t = timedelta(minutes=settings.jwt_refresh_token_expire_minutes)
     exp = int((datetime.now() + t).timestamp())
 
     return token.CreateToken(token=random_token, expires_in=exp)
+
+
+def refresh_token_key(refresh_token: str) -> str:
+    """
+    refreshToken을 저장소의 조회 키(HMAC-SHA256)로 변환한다
+
+    refreshToken에 shard id가 있다면 조회 키에도 유지하여, 저장소가 키만으로 shard를 찾을 수 있도록 한다
+    """
+
+    key = Hasher.hmac_sha256(refresh_token)
+
+    shard_id, separator, _ = refresh_token.partition(SHARD_SEPARATOR)
+    if separator and shard_id.isdigit():
+        return f"{shard_id}{separator}{key}"
+
+    return key
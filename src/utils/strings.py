@@ -1,3 +1,4 @@
+import ipaddress
 import math
 import uuid
 
@@ -22,3 +23,47 @@ def masking_str(s: str, percent: float = 0.3) -> str:
 
 def binary_to_uuid(s: bytes) -> str:
     return str(uuid.UUID(bytes=s))
+
+
+def uuid_to_binary(s: str) -> bytes:
+    """
+    문자열 UUID를 BINARY(16) 컬럼에 저장하는 값으로 변환한다
+
+    MySQL의 UUID_TO_BIN(s)(swap_flag 없음)과 같은 값을 반환한다
+    """
+
+    return uuid.UUID(s).bytes
+
+
+def ip_to_binary(ip: str | None) -> bytes | None:
+    """
+    IP 주소 문자열을 BINARY(16) 컬럼에 저장하는 값으로 변환한다
+
+    MySQL의 INET6_ATON(ip)과 같이 IPv4는 4 bytes, IPv6는 16 bytes를 반환하며, IP 주소가 아니라면 None을
+    반환한다
+    """
+
+    if not ip:
+        return None
+
+    try:
+        return ipaddress.ip_address(ip).packed
+    except ValueError:
+        return None
+
+
+def binary_to_ip(value: bytes | None) -> str | None:
+    """
+    BINARY(16) 컬럼에 저장된 IP 주소를 문자열로 변환한다
+
+    MySQL의 INET6_NTOA(value)와 같이 4 bytes는 IPv4, 16 bytes는 IPv6 주소로 변환하며, 그 외의 값은 None을
+    반환한다
+    """
+
+    if not value:
+        return None
+
+    try:
+        return str(ipaddress.ip_address(bytes(value)))
+    except ValueError:
+        return None
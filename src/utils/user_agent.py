@@ -0,0 +1,81 @@
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+
+class DeviceInfo(NamedTuple):
+    """User-Agent에서 파싱한 기기 정보"""
+
+    browser: str
+    os: str
+    device: str
+
+
+# 먼저 일치하는 규칙을 사용하므로, 다른 브라우저의 토큰을 함께 포함하는 규칙을 앞에 둔다
+# ex) Edge, Whale, Samsung Internet의 User-Agent에는 'Chrome/'와 'Safari/'가 함께 포함된다
+_BROWSER_RULES = (
+    ("Edge", re.compile(r"Edg(?:e|A|iOS)?/([\d.]+)")),
+    ("Whale", re.compile(r"Whale/([\d.]+)")),
+    ("Samsung Internet", re.compile(r"SamsungBrowser/([\d.]+)")),
+    ("KakaoTalk", re.compile(r"KAKAOTALK[ /]([\d.]+)", re.IGNORECASE)),
+    ("NAVER", re.compile(r"NAVER\(inapp;[^)]*?([\d.]+)\)")),
+    ("Opera", re.compile(r"(?:OPR|Opera)/([\d.]+)")),
+    ("Firefox", re.compile(r"(?:Firefox|FxiOS)/([\d.]+)")),
+    ("Chrome", re.compile(r"(?:Chrome|CriOS)/([\d.]+)")),
+    ("Safari", re.compile(r"Version/([\d.]+).*Safari/")),
+    ("okhttp", re.compile(r"okhttp/([\d.]+)")),
+    ("curl", re.compile(r"curl/([\d.]+)")),
+)
+
+_OS_RULES = (
+    ("iOS", re.compile(r"(?:iPhone|iPad|iPod).*? OS ([\d_]+)")),
+    ("Android", re.compile(r"Android ([\d.]+)")),
+    ("Windows", re.compile(r"Windows NT ([\d.]+)")),
+    ("macOS", re.compile(r"Mac OS X ([\d_.]+)")),
+    ("Chrome OS", re.compile(r"CrOS \S+ ([\d.]+)")),
+    ("Linux", re.compile(r"Linux()")),
+)
+
+_TABLET_PATTERN = re.compile(r"iPad|Tablet|Android(?!.*Mobile)")
+_MOBILE_PATTERN = re.compile(r"Mobi|iPhone|iPod|Android")
+_BOT_PATTERN = re.compile(r"bot|crawler|spider|okhttp|curl", re.IGNORECASE)
+
+
+def _match(rules, user_agent: str) -> str:
+    for name, pattern in rules:
+        m = pattern.search(user_agent)
+        if m:
+            version = m.group(1).replace("_", ".")
+            return f"{name} {version}" if version else name
+
+    return "Unknown"
+
+
+@lru_cache(maxsize=1024)
+def parse_user_agent(user_agent: str | None) -> DeviceInfo:
+    """
+    User-Agent 문자열을 파싱하여 브라우저, OS, 기기 종류를 반환한다
+
+    같은 앱/브라우저의 User-Agent는 반복해서 요청되므로 파싱 결과를 LRU 캐시에 저장한다
+
+    :param user_agent: HTTP User-Agent 헤더 값
+    :return: 브라우저, OS, 기기 종류(Desktop, Mobile, Tablet, Other)를 반환한다
+    """
+
+    if not user_agent:
+        return DeviceInfo(browser="Unknown", os="Unknown", device="Unknown")
+
+    if _TABLET_PATTERN.search(user_agent):
+        device = "Tablet"
+    elif _MOBILE_PATTERN.search(user_agent):
+        device = "Mobile"
+    elif _BOT_PATTERN.search(user_agent):
+        device = "Other"
+    else:
+        device = "Desktop"
+
+    return DeviceInfo(
+        browser=_match(_BROWSER_RULES, user_agent),
+        os=_match(_OS_RULES, user_agent),
+        device=device,
+    )
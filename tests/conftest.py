@@ -0,0 +1,124 @@
+"""
+테스트는 모델 정의로 생성한 SQLite(aiosqlite) DB를 사용한다
+
+src의 설정(core.config.settings)과 engine은 import 할 때 만들어지므로, 환경 변수를 먼저 설정한 이후에 불러온다
+
+실행 방법(저장소 루트에서 실행한다)
+    $ python -m pytest -q
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+
+TEST_DIR = tempfile.mkdtemp(prefix="fastapi-simple-auth-test-")
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")
+
+os.environ.update(
+    {
+        "ENV": "testing",
+        "DB_URL": f"sqlite+aiosqlite:///{TEST_DIR}/auth.db",
+        "PASSWORD_SECRET_KEY": "test-password-secret",
+        "INDEX_HASH_KEY": "test-index-hash",
+        "AES_ENCRYPT_KEY": "test-aes-encrypt-key",
+        "JWT_ACCESS_SECRET_KEY": "test-access-secret",
+        "JWT_REFRESH_SECRET_KEY": "test-refresh-secret",
+        "INTERNAL_API_TOKEN": "test-internal-token",
+        # 테스트마다 DB를 다시 만들므로 이전 테스트의 사용자 정보가 캐시에 남지 않도록 한다
+        "USER_CACHE_SECONDS": "0",
+        "TOKEN_GENERATION_CACHE_SECONDS": "0",
+        "LOGIN_HISTORY_SPILL_DIR": os.path.join(TEST_DIR, "spill"),
+        "LOGIN_HISTORY_ARCHIVE_DIR": os.path.join(TEST_DIR, "archive"),
+    }
+)
+sys.path.insert(0, SRC_DIR)
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import models  # noqa: E402, F401
+from db.base import Base, engine  # noqa: E402
+
+PASSWORD = "abcd1234!"
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def db():
+    """
+    테스트마다 테이블을 다시 생성한다
+
+    event loop마다 연결을 새로 만들도록 테스트 전후로 connection pool을 비운다
+    """
+
+    async def reset():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        await engine.dispose()
+
+    asyncio.run(reset())
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture(scope="session")
+def redis_url():
+    """
+    Redis 프로토콜 서버(fakeredis)를 별도 thread에서 실행하고 주소를 반환한다
+    """
+
+    fakeredis = pytest.importorskip("fakeredis")
+
+    server = fakeredis.TcpFakeServer(("127.0.0.1", 0), server_type="redis")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    host, port = server.server_address
+    yield f"redis://{host}:{port}/0"
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    from app.factory import create_app
+
+    # app은 작업 디렉토리의 static 디렉토리를 사용한다
+    monkeypatch.chdir(TEST_DIR)
+    os.makedirs("static", exist_ok=True)
+
+    with TestClient(create_app()) as c:
+        yield c
+
+
+def register(client: TestClient, email: str, name: str = "홍길동") -> None:
+    response = client.post(
+        "/auth/register",
+        json={
+            "name": name,
+            "email": email,
+            "mobile": None,
+            "password1": PASSWORD,
+            "password2": PASSWORD,
+        },
+    )
+    assert response.status_code == 200, response.json()
+
+
+def login(client: TestClient, email: str, **kwargs) -> dict:
+    response = client.post(
+        "/auth/api/login", json={"email": email, "password": PASSWORD}, **kwargs
+    )
+    assert response.status_code == 200, response.json()
+    return response.json()
+
+
+def bearer(token: dict) -> dict:
+    return {"Authorization": f"Bearer {token['access_token']}"}
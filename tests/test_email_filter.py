@@ -0,0 +1,103 @@
+import asyncio
+import uuid
+
+import pytest
+
+import crud
+import schemas
+from app.tasks.email_filter_sync import EmailFilterSync
+from db.base import async_session
+from utils.constants.oauth import ProviderID
+from utils.security.email_filter import registered_email_filter
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def email_filter(monkeypatch):
+    """
+    가입 이벤트를 수신하는 registered_email_filter를 비어있는 상태로 사용한다
+    """
+
+    monkeypatch.setattr(registered_email_filter, "enabled", True)
+    monkeypatch.setattr(registered_email_filter, "synced_id", 0)
+    monkeypatch.setattr(registered_email_filter, "synced_at", None)
+    monkeypatch.setattr(registered_email_filter, "_filter", None)
+    monkeypatch.setattr(registered_email_filter, "_building", None)
+
+    return registered_email_filter
+
+
+async def _register(email_key: str) -> None:
+    async with async_session() as session:
+        user_dal = crud.UserDAL(session=session)
+        await user_dal.insert_user(
+            new_user=schemas.RegisterInsert(
+                name="홍길동",
+                email=email_key,
+                email_key=email_key,
+                uuid=uuid.uuid4().bytes,
+                mobile=None,
+                mobile_key=None,
+                password=None,
+                salt=None,
+                provider_id=ProviderID.LOCAL.name,
+                is_active=1,
+            )
+        )
+        await session.commit()
+
+
+async def test_build_and_sync(db, email_filter):
+    sync = EmailFilterSync(
+        email_filter=email_filter, sync_interval=60, rebuild_interval=60, batch_size=2
+    )
+
+    for n in range(3):
+        await _register(f"email-{n}")
+
+    assert email_filter.might_exist("unregistered") is True
+    await sync.build()
+    assert all(email_filter.might_exist(f"email-{n}") for n in range(3))
+    assert email_filter.might_exist("unregistered") is False
+    assert email_filter.synced_id == 3
+
+    await _register("email-3")
+    assert email_filter.might_exist("email-3") is True
+
+    await sync.sync()
+    assert email_filter.synced_id == 4
+
+
+async def test_register_during_build_is_not_lost(db, email_filter, monkeypatch):
+    sync = EmailFilterSync(
+        email_filter=email_filter, sync_interval=60, rebuild_interval=60, batch_size=10
+    )
+    await _register("email-0")
+    await sync.build()
+
+    loaded = asyncio.Event()
+    resume = asyncio.Event()
+    get_email_keys = crud.UserDAL.get_email_keys
+
+    async def suspended_get_email_keys(self, *args, **kwargs):
+        rows = await get_email_keys(self, *args, **kwargs)
+        # 마지막 batch를 조회한 후, filter를 교체하기 전에 멈춘다
+        loaded.set()
+        await resume.wait()
+        return rows
+
+    monkeypatch.setattr(crud.UserDAL, "get_email_keys", suspended_get_email_keys)
+
+    build = asyncio.create_task(sync.build())
+    await loaded.wait()
+
+    await _register("email-1")
+    assert email_filter.might_exist("email-1") is True
+
+    resume.set()
+    await build
+
+    assert email_filter.might_exist("email-0") is True
+    assert email_filter.might_exist("email-1") is True
+    assert email_filter._building is None
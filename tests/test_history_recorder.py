@@ -0,0 +1,150 @@
+import os
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+
+import schemas
+from crud.history_recorder import (
+    LoginHistoryRecorder,
+    _encode,
+    _pid_alive,
+    history_dropped,
+)
+from db.base import async_session
+from models import UserLoginHistory
+
+pytestmark = pytest.mark.anyio
+
+USER_UUID = uuid.UUID("0190c5a0-0000-7000-8000-000000000001").bytes
+
+
+def _login_history(n: int = 0) -> schemas.LoginHistory:
+    return schemas.LoginHistory(
+        user_id=1,
+        user_uuid=USER_UUID,
+        login_time=datetime(2026, 1, 1, 0, 0, n),
+        login_success=True,
+        ip_address="10.0.0.1",
+    )
+
+
+def _recorder(spill_dir, max_queue_size: int = 100) -> LoginHistoryRecorder:
+    return LoginHistoryRecorder(
+        flush_interval=60,
+        flush_size=2,
+        max_queue_size=max_queue_size,
+        spill_dir=str(spill_dir),
+    )
+
+
+def _dead_pid() -> int:
+    pid = 999_999
+    while _pid_alive(pid):
+        pid -= 1
+    return pid
+
+
+async def _saved_count() -> int:
+    async with async_session() as session:
+        return await session.scalar(select(func.count()).select_from(UserLoginHistory))
+
+
+async def test_spill_when_queue_is_full_and_replay(db, tmp_path):
+    recorder = _recorder(tmp_path, max_queue_size=3)
+
+    for n in range(5):
+        recorder.record(_login_history(n))
+    await recorder._overflow_task
+
+    assert await recorder.flush() is True
+    assert await _saved_count() == 3
+
+    spill_files = os.listdir(tmp_path)
+    assert spill_files == [f"login_history.{os.getpid()}.jsonl"]
+
+    assert await recorder.replay() == 2
+    assert await _saved_count() == 5
+    assert os.listdir(tmp_path) == []
+
+
+async def test_overflow_is_capped_while_spill_is_pending(db, tmp_path):
+    recorder = _recorder(tmp_path, max_queue_size=2)
+    dropped = history_dropped.value
+
+    # spill 파일 기록이 끝나기 전에 대기열과 spill 대기 이력이 모두 가득 찬다
+    for n in range(7):
+        recorder.record(_login_history(n))
+    assert len(recorder._overflow) == 2
+    assert history_dropped.value - dropped == 3
+
+    await recorder._overflow_task
+    assert await recorder.replay() == 2
+    assert await recorder.flush() is True
+    assert await _saved_count() == 4
+
+
+async def test_failed_flush_spills_queue(db, tmp_path, monkeypatch):
+    recorder = _recorder(tmp_path)
+
+    async def broken_insert(session_factory, login_histories):
+        raise ConnectionError("down")
+
+    monkeypatch.setattr(recorder, "_insert", broken_insert)
+    for n in range(3):
+        recorder.record(_login_history(n))
+
+    assert await recorder.flush() is False
+    assert await _saved_count() == 0
+
+    # 저장에 실패한 이력은 다시 spill 파일에 남긴다
+    assert await recorder.replay() == 0
+    assert len(os.listdir(tmp_path)) == 1
+
+    monkeypatch.undo()
+    assert await recorder.replay() == 3
+    assert await _saved_count() == 3
+    assert os.listdir(tmp_path) == []
+
+
+async def test_replay_quarantines_undecodable_lines(db, tmp_path):
+    # 기록 중에 종료된 worker의 spill 파일로, 마지막 줄이 잘려있다
+    path = tmp_path / f"login_history.{_dead_pid()}.jsonl"
+    path.write_text(
+        _encode(_login_history(0)) + "\n" + _encode(_login_history(1))[:20],
+        encoding="utf-8",
+    )
+
+    recorder = _recorder(tmp_path)
+    assert await recorder.replay() == 1
+    assert await _saved_count() == 1
+
+    corrupt_path = tmp_path / f"login_history.corrupt.{os.getpid()}.jsonl"
+    assert os.listdir(tmp_path) == [corrupt_path.name]
+    assert (
+        corrupt_path.read_text(encoding="utf-8")
+        == _encode(_login_history(1))[:20] + "\n"
+    )
+
+    # 격리한 파일은 다시 저장하지 않는다
+    assert await recorder.replay() == 0
+
+
+async def test_replay_reclaims_unfinished_replay_file(db, tmp_path):
+    # 이전 replay 도중에 실패하여 남아있는 현재 worker의 replay 파일
+    path = tmp_path / f"login_history.{os.getpid()}.1.replay"
+    path.write_text(_encode(_login_history(0)) + "\n", encoding="utf-8")
+
+    recorder = _recorder(tmp_path)
+    assert await recorder.replay() == 1
+    assert os.listdir(tmp_path) == []
+
+
+async def test_replay_skips_files_of_running_workers(db, tmp_path):
+    path = tmp_path / f"login_history.{os.getppid()}.jsonl"
+    path.write_text(_encode(_login_history(0)) + "\n", encoding="utf-8")
+
+    recorder = _recorder(tmp_path)
+    assert await recorder.replay() == 0
+    assert os.listdir(tmp_path) == [path.name]
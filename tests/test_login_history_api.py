@@ -0,0 +1,95 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from conftest import bearer, login, register
+
+INTERNAL_HEADERS = {"Authorization": "Bearer test-internal-token"}
+
+
+@pytest.fixture
+def token(client) -> dict:
+    """
+    로그인 성공 3번과 실패 1번의 이력이 있는 사용자의 토큰
+    """
+
+    register(client, "a@example.com")
+    login(client, "a@example.com")
+    response = client.post(
+        "/auth/api/login", json={"email": "a@example.com", "password": "wrong1234!"}
+    )
+    assert response.status_code == 403
+    login(client, "a@example.com")
+
+    return login(client, "a@example.com")
+
+
+def _ndjson(body: str) -> list[dict]:
+    return [json.loads(line) for line in body.splitlines()]
+
+
+def test_list_login_history_pages_newest_first(client, token):
+    response = client.get("/auth/login-history?limit=3", headers=bearer(token))
+    assert response.status_code == 200
+    first = response.json()
+    assert [h["login_success"] for h in first["histories"]] == [True, True, False]
+    assert first["next_cursor"] is not None
+
+    response = client.get(
+        f"/auth/login-history?limit=3&cursor={first['next_cursor']}",
+        headers=bearer(token),
+    )
+    second = response.json()
+    assert [h["login_success"] for h in second["histories"]] == [True]
+    assert second["next_cursor"] is None
+
+    ids = [h["id"] for h in first["histories"] + second["histories"]]
+    assert ids == sorted(ids, reverse=True)
+
+
+def test_list_login_history_rejects_invalid_cursor(client, token):
+    response = client.get("/auth/login-history?cursor=abc", headers=bearer(token))
+    assert response.status_code == 400
+    assert response.json()["error_code"] == 1400
+
+
+def test_export_login_history_streams_ndjson_oldest_first(client, token):
+    response = client.get("/auth/login-history/export", headers=bearer(token))
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+    histories = _ndjson(response.text)
+    assert [h["login_success"] for h in histories] == [True, False, True, True]
+    assert [h["id"] for h in histories] == sorted(h["id"] for h in histories)
+    assert set(histories[0]) == {"id", "login_time", "login_success", "ip_address"}
+
+    since = (datetime.now() + timedelta(days=1)).isoformat()
+    response = client.get(
+        "/auth/login-history/export", params={"since": since}, headers=bearer(token)
+    )
+    assert response.text == ""
+
+
+def test_internal_login_history_requires_internal_token(client, token):
+    assert client.get("/internal/users/1/login-history").status_code == 401
+    response = client.get(
+        "/internal/users/1/login-history",
+        headers={"Authorization": "Bearer wrong-token"},
+    )
+    assert response.status_code == 401
+
+    response = client.get(
+        "/internal/users/1/login-history?limit=2", headers=INTERNAL_HEADERS
+    )
+    assert response.status_code == 200
+    message = response.json()["message"]
+    assert len(message["histories"]) == 2
+    assert message["next_cursor"] is not None
+
+    response = client.get(
+        "/internal/users/1/login-history/export", headers=INTERNAL_HEADERS
+    )
+    assert len(_ndjson(response.text)) == 4
+
+    response = client.get("/internal/users/999/login-history", headers=INTERNAL_HEADERS)
+    assert response.status_code == 404
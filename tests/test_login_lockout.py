@@ -0,0 +1,121 @@
+import pytest
+from conftest import PASSWORD, register
+
+from utils.resp import RESPClient
+from utils.security.lockout import (
+    FailureStore,
+    LoginLockout,
+    MemoryFailureStore,
+    RESPFailureStore,
+)
+
+EMAIL_KEY = "email-key"
+IP_ADDRESS = "10.0.0.1"
+
+
+def _lockout(store: FailureStore) -> LoginLockout:
+    return LoginLockout(
+        store=store,
+        account_threshold=3,
+        ip_threshold=5,
+        base_seconds=10,
+        max_seconds=40,
+    )
+
+
+@pytest.fixture(params=["memory", "redis"])
+async def failure_store(request):
+    if request.param == "memory":
+        yield MemoryFailureStore(window=900, max_keys=100)
+    else:
+        client = RESPClient(url=request.getfixturevalue("redis_url"))
+        await client.execute("FLUSHALL")
+        yield RESPFailureStore(client=client, window=900)
+        await client.close()
+
+
+@pytest.mark.anyio
+async def test_account_is_locked_from_threshold_with_backoff(failure_store):
+    lockout = _lockout(failure_store)
+
+    for _ in range(2):
+        await lockout.fail(EMAIL_KEY, None)
+    assert await lockout.check(EMAIL_KEY, None) == 0
+
+    await lockout.fail(EMAIL_KEY, None)
+    assert 9 < await lockout.check(EMAIL_KEY, None) <= 10
+
+    # 실패할 때마다 잠금 시간을 두 배씩 늘리며, max_seconds를 넘지 않는다
+    await lockout.fail(EMAIL_KEY, None)
+    assert 19 < await lockout.check(EMAIL_KEY, None) <= 20
+    for _ in range(3):
+        await lockout.fail(EMAIL_KEY, None)
+    assert 39 < await lockout.check(EMAIL_KEY, None) <= 40
+
+    # 다른 계정은 잠기지 않는다
+    assert await lockout.check("other-email-key", None) == 0
+
+
+@pytest.mark.anyio
+async def test_success_resets_account_but_not_ip(failure_store):
+    lockout = _lockout(failure_store)
+
+    for _ in range(5):
+        await lockout.fail(EMAIL_KEY, IP_ADDRESS)
+    assert await lockout.check(EMAIL_KEY, None) > 0
+    assert await lockout.check("other-email-key", IP_ADDRESS) > 0
+
+    await lockout.succeed(EMAIL_KEY)
+    assert await lockout.check(EMAIL_KEY, None) == 0
+    assert await lockout.check("other-email-key", IP_ADDRESS) > 0
+
+
+@pytest.mark.anyio
+async def test_memory_store_keeps_locks_when_keys_are_evicted():
+    lockout = _lockout(MemoryFailureStore(window=900, max_keys=10))
+
+    for _ in range(3):
+        await lockout.fail(EMAIL_KEY, None)
+    assert await lockout.check(EMAIL_KEY, None) > 0
+
+    # 많은 IP에서 실패하여 실패 횟수가 max_keys를 넘더라도 잠금은 유지된다
+    for n in range(100):
+        await lockout.fail(f"other-email-key-{n}", f"10.0.1.{n}")
+    assert await lockout.check(EMAIL_KEY, None) > 0
+
+
+@pytest.mark.anyio
+async def test_store_errors_do_not_lock():
+    class BrokenStore(MemoryFailureStore):
+        async def record_failures(self, keys):
+            raise ConnectionError("down")
+
+        async def locked_for(self, keys):
+            raise ConnectionError("down")
+
+    lockout = _lockout(BrokenStore(window=900, max_keys=100))
+
+    await lockout.fail(EMAIL_KEY, IP_ADDRESS)
+    assert await lockout.check(EMAIL_KEY, IP_ADDRESS) == 0
+
+
+def test_login_is_rejected_while_locked(client, monkeypatch):
+    monkeypatch.setattr(
+        "app.api.auth.login_lockout",
+        _lockout(MemoryFailureStore(window=900, max_keys=100)),
+    )
+    register(client, "a@example.com")
+
+    for _ in range(3):
+        response = client.post(
+            "/auth/api/login", json={"email": "a@example.com", "password": "wrong1234!"}
+        )
+        assert response.status_code == 403
+
+    # 잠긴 동안에는 비밀번호가 일치하더라도 거절한다
+    response = client.post(
+        "/auth/api/login", json={"email": "a@example.com", "password": PASSWORD}
+    )
+    assert response.status_code == 429
+    assert response.json()["error_code"] == 1429
+    assert response.headers["Retry-After"] == "10"
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+from conftest import bearer, login, register
+from sqlalchemy import func, select
+
+import crud
+from core.config import settings
+from db.base import async_session
+from models import JWTToken
+
+
+@pytest.fixture
+def session_cap(monkeypatch):
+    monkeypatch.setattr(settings, "max_active_sessions", 2)
+
+
+def _session_count(user_id: int) -> int:
+    async def count():
+        async with async_session() as session:
+            return await session.scalar(
+                select(func.count())
+                .select_from(JWTToken)
+                .where(JWTToken.user_id == user_id)
+            )
+
+    return asyncio.run(count())
+
+
+def _refresh_status(client, token: dict) -> int:
+    response = client.post(
+        "/token/refresh/api", json={"refresh_token": token["refresh_token"]}
+    )
+    return response.status_code
+
+
+def test_login_evicts_oldest_session_over_cap(session_cap, client):
+    register(client, "a@example.com")
+    register(client, "b@example.com")
+    other = login(client, "b@example.com")
+    tokens = [login(client, "a@example.com") for _ in range(3)]
+
+    assert _session_count(user_id=1) == 2
+    # 삭제된 세션의 refreshToken은 저장소에서 찾을 수 없다
+    assert [_refresh_status(client, t) for t in tokens] == [404, 200, 200]
+    # 다른 사용자의 세션은 삭제하지 않는다
+    assert _refresh_status(client, other) == 200
+
+
+def test_sessions_are_not_limited_by_default(client):
+    assert settings.max_active_sessions == 0
+
+    register(client, "a@example.com")
+    for _ in range(3):
+        login(client, "a@example.com")
+
+    assert _session_count(user_id=1) == 3
+
+
+def test_evict_oldest_sessions_keeps_most_recent(session_cap, client):
+    register(client, "a@example.com")
+    tokens = [login(client, "a@example.com") for _ in range(2)]
+
+    async def evict(keep: int) -> int:
+        async with async_session() as session:
+            deleted = await crud.TokenDAL(session=session).evict_oldest_sessions(
+                user_id=1, keep=keep
+            )
+            await session.commit()
+            return deleted
+
+    assert asyncio.run(evict(keep=2)) == 0
+    assert asyncio.run(evict(keep=1)) == 1
+
+    response = client.get("/auth/sessions", headers=bearer(tokens[1]))
+    assert [s["current"] for s in response.json()["sessions"]] == [True]
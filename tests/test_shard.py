@@ -0,0 +1,178 @@
+import asyncio
+import base64
+import json
+
+import pytest
+from conftest import bearer, login, register
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from core.config import settings
+from db import shard
+from db.base import async_session
+from db.schema import SHARD_TABLES, create_schema
+from dependencies.token_store import TokenStoreProvider
+from models import JWTToken, UserLoginHistory
+
+SHARD_COUNT = 3
+
+
+@pytest.fixture
+def shards(db, monkeypatch, tmp_path):
+    """
+    DB_SHARD_URLS를 임시 SQLite 파일 3개로 설정한 shard engine
+
+    engine 목록은 import 할 때 만들어지고 다른 모듈에서도 같은 list를 사용하므로 내용을 바꾼다
+    """
+
+    urls = [
+        f"sqlite+aiosqlite:///{tmp_path}/shard{shard_id}.db"
+        for shard_id in range(SHARD_COUNT)
+    ]
+    monkeypatch.setattr(settings, "db_shard_urls", urls)
+
+    engines = [
+        shard._create_shard_engine(shard_id, url) for shard_id, url in enumerate(urls)
+    ]
+    sessions = [
+        sessionmaker(
+            bind=shard_engine,
+            class_=AsyncSession,
+            autocommit=False,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+        for shard_engine in engines
+    ]
+
+    async def setup():
+        for shard_engine in engines:
+            await create_schema(shard_engine, tables=list(SHARD_TABLES))
+            await shard_engine.dispose()
+
+    asyncio.run(setup())
+
+    shard.shard_engines[:] = engines
+    shard.shard_sessions[:] = sessions
+    monkeypatch.setattr(TokenStoreProvider, "store", None)
+
+    yield engines
+
+    shard.shard_engines.clear()
+    shard.shard_sessions.clear()
+
+    async def teardown():
+        for shard_engine in engines:
+            await shard_engine.dispose()
+
+    asyncio.run(teardown())
+
+
+@pytest.fixture
+def sharded_client(shards, client):
+    return client
+
+
+def _user_uuid(token: dict) -> str:
+    payload = token["access_token"].split(".")[1]
+    payload += "=" * (-len(payload) % 4)
+    return json.loads(base64.urlsafe_b64decode(payload))["sub"]
+
+
+def _row_counts(model) -> tuple[int, list[int]]:
+    """
+    Primary와 각 shard에 저장된 행 수를 반환한다
+    """
+
+    async def count(session_factory) -> int:
+        async with session_factory() as session:
+            return await session.scalar(select(func.count()).select_from(model))
+
+    async def count_all():
+        primary = await count(async_session)
+        return primary, [await count(s) for s in shard.shard_sessions]
+
+    return asyncio.run(count_all())
+
+
+def _register_on_shards(client) -> list[tuple[int, dict]]:
+    """
+    서로 다른 shard에 저장되는 사용자를 shard마다 한 명씩 가입시키고 (shard id, 토큰)을 반환한다
+    """
+
+    users: dict[int, dict] = {}
+    n = 0
+    while len(users) < SHARD_COUNT:
+        email = f"user{n}@example.com"
+        register(client, email)
+        token = login(client, email)
+        users.setdefault(shard.shard_for(_user_uuid(token)), token)
+        n += 1
+
+    return sorted(users.items())
+
+
+def test_tokens_and_histories_are_stored_on_user_shard(sharded_client):
+    client = sharded_client
+    register(client, "a@example.com")
+    token = login(client, "a@example.com")
+    shard_id = shard.shard_for(_user_uuid(token))
+
+    expected = [1 if i == shard_id else 0 for i in range(SHARD_COUNT)]
+    assert _row_counts(JWTToken) == (0, expected)
+    assert _row_counts(UserLoginHistory) == (0, expected)
+
+    response = client.get("/auth/login-history", headers=bearer(token))
+    assert response.status_code == 200
+    assert len(response.json()["histories"]) == 1
+
+
+def test_refresh_token_resolves_shard_from_prefix(sharded_client):
+    client = sharded_client
+
+    for shard_id, token in _register_on_shards(client):
+        assert token["refresh_token"].startswith(f"{shard_id}{shard.SHARD_SEPARATOR}")
+
+        response = client.post(
+            "/token/refresh/api", json={"refresh_token": token["refresh_token"]}
+        )
+        assert response.status_code == 200
+        refreshed = response.json()
+        assert refreshed["refresh_token"].startswith(
+            f"{shard_id}{shard.SHARD_SEPARATOR}"
+        )
+
+        response = client.post(
+            "/token/refresh/api", json={"refresh_token": refreshed["refresh_token"]}
+        )
+        assert response.status_code == 200
+
+
+def test_sessions_and_logout_all_across_shards(sharded_client):
+    client = sharded_client
+    users = _register_on_shards(client)
+
+    for _, token in users:
+        response = client.get("/auth/sessions", headers=bearer(token))
+        assert response.status_code == 200
+        sessions = response.json()["sessions"]
+        assert len(sessions) == 1
+        assert sessions[0]["current"] is True
+
+    (_, revoked), *others = users
+    response = client.post("/auth/api/logout/all", headers=bearer(revoked))
+    assert response.status_code == 200
+
+    response = client.post(
+        "/token/refresh/api", json={"refresh_token": revoked["refresh_token"]}
+    )
+    assert response.status_code == 401
+
+    # 다른 shard의 사용자는 로그아웃 되지 않는다
+    for _, token in others:
+        assert client.get("/auth/sessions", headers=bearer(token)).status_code == 200
+        response = client.post(
+            "/token/refresh/api", json={"refresh_token": token["refresh_token"]}
+        )
+        assert response.status_code == 200
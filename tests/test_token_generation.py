@@ -0,0 +1,87 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+from conftest import bearer, login, register
+from sqlalchemy import func, select
+
+import crud
+import schemas
+from app.tasks.token_reaper import TokenReaper
+from db.base import async_session
+from models import JWTToken
+
+
+def _token_count() -> int:
+    async def count():
+        async with async_session() as session:
+            return await session.scalar(select(func.count()).select_from(JWTToken))
+
+    return asyncio.run(count())
+
+
+def test_logout_all_revokes_tokens_of_previous_generation(client):
+    register(client, "a@example.com")
+    old = login(client, "a@example.com")
+    other = login(client, "a@example.com")
+
+    response = client.post("/auth/api/logout/all", headers=bearer(other))
+    assert response.status_code == 200
+
+    # 이전 세대로 발급된 accessToken, refreshToken은 사용할 수 없다
+    assert client.post("/auth/api/logout", headers=bearer(old)).status_code == 401
+    response = client.post(
+        "/token/refresh/api", json={"refresh_token": old["refresh_token"]}
+    )
+    assert response.status_code == 401
+
+    # 전체 로그아웃 이후에 발급된 토큰은 사용할 수 있다
+    new = login(client, "a@example.com")
+    response = client.post(
+        "/token/refresh/api", json={"refresh_token": new["refresh_token"]}
+    )
+    assert response.status_code == 200
+
+
+def test_token_reaper_deletes_expired_and_stale_generation_tokens(client):
+    register(client, "a@example.com")
+    register(client, "b@example.com")
+    revoked = login(client, "a@example.com")
+    login(client, "a@example.com")
+    kept = login(client, "b@example.com")
+
+    client.post("/auth/api/logout/all", headers=bearer(revoked))
+    current = login(client, "a@example.com")
+
+    async def insert_expired():
+        async with async_session() as session:
+            token_dal = crud.TokenDAL(session=session)
+            # b@example.com 사용자
+            user = await crud.UserDAL(session=session).get_by_user_id(user_id=2)
+            await token_dal.insert_token(
+                schemas.TokenInsert(
+                    user_id=user.id,
+                    user_uuid=user.uuid,
+                    jti=uuid.uuid4().hex,
+                    access_token="expired",
+                    refresh_token="expired",
+                    refresh_token_key="expired",
+                    issued_at=datetime.now() - timedelta(days=2),
+                    expires_at=datetime.now() - timedelta(days=1),
+                )
+            )
+            await session.commit()
+
+    asyncio.run(insert_expired())
+    assert _token_count() == 5
+
+    # batch 크기보다 삭제할 토큰이 많아도 모두 삭제한다
+    deleted = asyncio.run(TokenReaper(interval=60, batch_size=1).reap())
+    assert deleted == 3
+    assert _token_count() == 2
+
+    for token in (current, kept):
+        response = client.post(
+            "/token/refresh/api", json={"refresh_token": token["refresh_token"]}
+        )
+        assert response.status_code == 200
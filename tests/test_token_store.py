@@ -0,0 +1,173 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+import crud
+import models
+import schemas
+from core.config import settings
+from db.base import async_session
+from utils.resp import RESPClient
+
+pytestmark = pytest.mark.anyio
+
+USER_UUID = "0190c5a0-0000-7000-8000-000000000001"
+OTHER_UUID = "0190c5a0-0000-7000-8000-000000000002"
+
+
+@pytest.fixture(params=["memory", "sql", "redis"])
+async def token_store(request, db, monkeypatch):
+    """
+    최대 세션 수가 2인 TokenStore
+    """
+
+    monkeypatch.setattr(settings, "max_active_sessions", 2)
+
+    if request.param == "memory":
+        yield crud.MemoryTokenStore(max_sessions=2)
+    elif request.param == "sql":
+        async with async_session() as session:
+            # SQLTokenStore는 토큰을 갱신할 때 사용자의 활성화 여부와 토큰 세대를 확인한다
+            for user_id, user_uuid in ((1, USER_UUID), (2, OTHER_UUID)):
+                session.add(
+                    models.User(
+                        id=user_id,
+                        uuid=uuid.UUID(user_uuid).bytes,
+                        email=f"user{user_id}",
+                        email_key=f"user{user_id}",
+                        name="홍길동",
+                        is_active=1,
+                        provider_id="LOCAL",
+                    )
+                )
+            await session.commit()
+
+            yield crud.SQLTokenStore(token_dal=crud.TokenDAL(session=session))
+    else:
+        client = RESPClient(url=request.getfixturevalue("redis_url"))
+        await client.execute("FLUSHALL")
+        yield crud.RedisTokenStore(client=client, max_sessions=2)
+        await client.close()
+
+
+def _new_token(
+    user_uuid: str = USER_UUID,
+    generation: int = 0,
+    expires_in: timedelta = timedelta(days=1),
+) -> schemas.TokenInsert:
+    refresh_token_key = uuid.uuid4().hex
+    now = datetime.now().replace(microsecond=0)
+
+    return schemas.TokenInsert(
+        user_id=1 if user_uuid == USER_UUID else 2,
+        user_uuid=uuid.UUID(user_uuid).bytes,
+        jti=uuid.uuid4().hex,
+        access_token=f"access-{refresh_token_key}",
+        refresh_token=f"refresh-{refresh_token_key}",
+        refresh_token_key=refresh_token_key,
+        issued_at=now,
+        expires_at=now + expires_in,
+        token_generation=generation,
+        user_agent="pytest",
+    )
+
+
+async def test_insert_and_get(token_store):
+    new_token = _new_token()
+    await token_store.insert(new_token)
+
+    stored = await token_store.get(new_token.refresh_token_key)
+    assert stored.jti == new_token.jti
+    assert stored.user_uuid == new_token.user_uuid
+    assert stored.refresh_token == new_token.refresh_token
+    assert stored.expires_at == new_token.expires_at
+    assert stored.user_agent == "pytest"
+
+    assert await token_store.get("unknown") is None
+
+
+async def test_touch_extends_existing_token_only(token_store):
+    new_token = _new_token()
+    await token_store.insert(new_token)
+
+    expires_at = new_token.expires_at + timedelta(days=1)
+    update_token = schemas.TokenUpdate(
+        user_id=new_token.user_id,
+        jti=new_token.jti,
+        access_token="renewed",
+        refresh_token=new_token.refresh_token,
+        refresh_token_key=new_token.refresh_token_key,
+        expires_at=expires_at,
+    )
+    assert await token_store.touch(update_token) is True
+
+    stored = await token_store.get(new_token.refresh_token_key)
+    assert stored.access_token == "renewed"
+    assert stored.expires_at == expires_at
+
+    update_token.refresh_token_key = "unknown"
+    assert await token_store.touch(update_token) is False
+
+
+async def test_delete_only_own_session(token_store):
+    new_token = _new_token()
+    await token_store.insert(new_token)
+
+    assert await token_store.delete(user_uuid=OTHER_UUID, jti=new_token.jti) is False
+    assert await token_store.delete(user_uuid=USER_UUID, jti=new_token.jti) is True
+    assert await token_store.delete(user_uuid=USER_UUID, jti=new_token.jti) is False
+    assert await token_store.get(new_token.refresh_token_key) is None
+
+
+async def test_insert_evicts_oldest_sessions_over_max(token_store):
+    tokens = [_new_token() for _ in range(3)]
+    other = _new_token(user_uuid=OTHER_UUID)
+    await token_store.insert(other)
+    for new_token in tokens:
+        await token_store.insert(new_token)
+
+    assert await token_store.get(tokens[0].refresh_token_key) is None
+    for new_token in (*tokens[1:], other):
+        assert await token_store.get(new_token.refresh_token_key) is not None
+
+
+async def test_list_sessions_pages_newest_first(token_store, monkeypatch):
+    monkeypatch.setattr(settings, "max_active_sessions", 0)
+    if isinstance(token_store, (crud.MemoryTokenStore, crud.RedisTokenStore)):
+        monkeypatch.setattr(token_store, "_max_sessions", 0)
+
+    tokens = [_new_token(generation=1) for _ in range(3)]
+    await token_store.insert(_new_token(generation=0))
+    await token_store.insert(_new_token(generation=1, expires_in=timedelta(seconds=-1)))
+    for new_token in tokens:
+        await token_store.insert(new_token)
+
+    # 만료되었거나 이전 세대의 세션은 제외한다
+    sessions, cursor = await token_store.list_sessions(
+        user_uuid=USER_UUID, min_generation=1, cursor=None, limit=2
+    )
+    assert [s.jti for s in sessions] == [tokens[2].jti, tokens[1].jti]
+    assert cursor is not None
+
+    sessions, cursor = await token_store.list_sessions(
+        user_uuid=USER_UUID, min_generation=1, cursor=cursor, limit=2
+    )
+    assert [s.jti for s in sessions] == [tokens[0].jti]
+    assert cursor is None
+
+
+async def test_revoke_user_and_delete_sessions(token_store):
+    tokens = [_new_token() for _ in range(2)]
+    other = _new_token(user_uuid=OTHER_UUID)
+    for new_token in (*tokens, other):
+        await token_store.insert(new_token)
+
+    deleted = await token_store.delete_sessions(
+        user_uuid=USER_UUID, jtis=[tokens[0].jti, other.jti]
+    )
+    assert deleted == 1
+
+    assert await token_store.revoke_user(USER_UUID) == 1
+    assert await token_store.get(tokens[1].refresh_token_key) is None
+    assert await token_store.get(other.refresh_token_key) is not None